@@ -31,6 +31,7 @@
 import __future__
 from ast import PyCF_ONLY_AST
 import codeop
+from collections import OrderedDict
 import functools
 import hashlib
 import linecache
@@ -70,6 +71,10 @@ class CachingCompiler(codeop.Compile):
     """A compiler that caches code compiled from interactive statements.
     """
 
+    # The maximum number of blocks of code kept in the linecache; the least
+    # recently cached ones are dropped first.  0 means no limit.
+    linecache_size = 0
+
     def __init__(self):
         codeop.Compile.__init__(self)
         
@@ -83,8 +88,9 @@ def __init__(self):
         # separate caches (one in each CachingCompiler instance), any call made
         # by Python itself to linecache.checkcache() would obliterate the
         # cached data from the other IPython instances.
-        if not hasattr(linecache, '_ipython_cache'):
-            linecache._ipython_cache = {}
+        if not isinstance(getattr(linecache, '_ipython_cache', None), OrderedDict):
+            linecache._ipython_cache = OrderedDict(
+                getattr(linecache, '_ipython_cache', {}))
         if not hasattr(linecache, '_checkcache_ori'):
             linecache._checkcache_ori = linecache.checkcache
         # Now, we must monkeypatch the linecache directly so that parts of the
@@ -130,8 +136,15 @@ def cache(self, code, number=0):
         name = code_name(code, number)
         entry = (len(code), time.time(),
                  [line+'\n' for line in code.splitlines()], name)
+        ipython_cache = linecache._ipython_cache
+        # re-insert, to mark the entry as the most recently used one
+        ipython_cache.pop(name, None)
         linecache.cache[name] = entry
-        linecache._ipython_cache[name] = entry
+        ipython_cache[name] = entry
+        if self.linecache_size:
+            while len(ipython_cache) > self.linecache_size:
+                old_name, _ = ipython_cache.popitem(last=False)
+                linecache.cache.pop(old_name, None)
         return name
 
 def check_linecache_ipython(*args):
@@ -67,6 +67,7 @@
 #-----------------------------------------------------------------------------
 
 import __main__
+import bisect
 import glob
 import inspect
 import itertools
@@ -74,6 +75,9 @@
 import os
 import re
 import sys
+import threading
+import time
+from collections import OrderedDict
 
 from IPython.config.configurable import Configurable
 from IPython.core.error import TryNext
@@ -84,7 +88,7 @@
 from IPython.utils.dir2 import dir2
 from IPython.utils.process import arg_split
 from IPython.utils.py3compat import builtin_mod, string_types
-from IPython.utils.traitlets import CBool, Enum
+from IPython.utils.traitlets import CBool, Enum, Float, Integer
 
 #-----------------------------------------------------------------------------
 # Globals
@@ -221,6 +225,67 @@ def penalize_magics_key(word):
 class Bunch(object): pass
 
 
+class NamespaceIndex(object):
+    """A sorted index of the names in a namespace, for prefix matching.
+
+    Finding the names starting with a prefix takes O(log n + k) time, for k
+    matches.  The index is brought up to date by :meth:`update`, which only
+    inserts and removes the names that changed since the last update.
+    """
+
+    # When more names than this changed, the index is rebuilt from scratch
+    rebuild_threshold = 1000
+
+    def __init__(self):
+        self.namespace = None
+        # whether the namespace may have changed since the last update
+        self.stale = True
+        self._keys = set()
+        self._sorted = []
+
+    def update(self, namespace):
+        """Update the index for the current names of namespace.
+
+        This does nothing if the index is up to date: the namespace is the
+        same object, it hasn't been marked stale, and its size is unchanged.
+        """
+        if (namespace is self.namespace and not self.stale and
+                len(namespace) == len(self._keys)):
+            return
+        keys = set(namespace)
+        if namespace is not self.namespace:
+            self._rebuild(keys)
+        else:
+            added = keys - self._keys
+            removed = self._keys - keys
+            if len(added) + len(removed) > self.rebuild_threshold:
+                self._rebuild(keys)
+            else:
+                names = self._sorted
+                for name in removed:
+                    if isinstance(name, string_types):
+                        del names[bisect.bisect_left(names, name)]
+                for name in added:
+                    if isinstance(name, string_types):
+                        bisect.insort(names, name)
+        self.namespace = namespace
+        self._keys = keys
+        self.stale = False
+
+    def _rebuild(self, keys):
+        self._sorted = sorted(k for k in keys if isinstance(k, string_types))
+
+    def matches(self, prefix):
+        """Return the sorted list of names starting with prefix"""
+        names = self._sorted
+        i = bisect.bisect_left(names, prefix)
+        end = i
+        n = len(names)
+        while end < n and names[end].startswith(prefix):
+            end += 1
+        return names[i:end]
+
+
 DELIMS = ' \t\n`!@#$^&*()=+[{]}\\|;:\'",<>?'
 GREEDY_DELIMS = ' =\r\n'
 
@@ -287,6 +352,15 @@ class Completer(Configurable):
     )
     
 
+    attr_cache_size = Integer(32, config=True,
+        help="""The number of objects whose attribute lists are cached.
+
+        The cache is only used when the completer is notified of changes to
+        the namespaces, and is cleared on each change (e.g. after each
+        execution in IPython).
+        """
+    )
+
     def __init__(self, namespace=None, global_namespace=None, **kwargs):
         """Create a new completer for the command line.
 
@@ -321,6 +395,16 @@ def __init__(self, namespace=None, global_namespace=None, **kwargs):
         else:
             self.global_namespace = global_namespace
 
+        # Indexes of the builtin, local and global names, see global_matches
+        self._builtin_index = NamespaceIndex()
+        self._namespace_index = NamespaceIndex()
+        self._global_namespace_index = NamespaceIndex()
+        # Set when namespace_changed() gets called after each change, so
+        # the indexes don't have to be checked on each completion.
+        self.namespace_change_notify = False
+        # {(id(obj), type(obj)): (obj, words)}, see _attr_words
+        self._attr_cache = OrderedDict()
+
         super(Completer, self).__init__(**kwargs)
 
     def complete(self, text, state):
@@ -351,18 +435,29 @@ def global_matches(self, text):
 
         """
         #print 'Completer->global_matches, txt=%r' % text # dbg
-        matches = []
-        match_append = matches.append
-        n = len(text)
-        for lst in [keyword.kwlist,
-                    builtin_mod.__dict__.keys(),
-                    self.namespace.keys(),
-                    self.global_namespace.keys()]:
-            for word in lst:
-                if word[:n] == text and word != "__builtins__":
-                    match_append(word)
+        matches = _keyword_index.matches(text)
+        for index, ns in [(self._builtin_index, builtin_mod.__dict__),
+                          (self._namespace_index, self.namespace),
+                          (self._global_namespace_index, self.global_namespace)]:
+            index.update(ns)
+            if not self.namespace_change_notify:
+                index.stale = True
+            matches.extend(word for word in index.matches(text)
+                           if word != "__builtins__")
         return matches
 
+    def namespace_changed(self):
+        """Notify the completer that names may have been added or removed.
+
+        Call this after each change of the namespaces, e.g. after executing
+        user code, and set :attr:`namespace_change_notify`; otherwise, the
+        namespaces are checked for changes on each completion.
+        """
+        self._builtin_index.stale = True
+        self._namespace_index.stale = True
+        self._global_namespace_index.stale = True
+        self._attr_cache.clear()
+
     def attr_matches(self, text):
         """Compute matches when text contains a dot.
 
@@ -399,7 +494,28 @@ def attr_matches(self, text):
             except:
                 return []
 
-        if self.limit_to__all__ and hasattr(obj, '__all__'):
+        words = self._attr_words(obj)
+        # Build match list to return
+        n = len(attr)
+        res = ["%s.%s" % (expr, w) for w in words if w[:n] == attr ]
+        return res
+
+    def _attr_words(self, obj):
+        """Return the attribute names to complete on obj.
+
+        Computing these can be slow (e.g. dir() of proxy objects), so they are
+        cached until the namespaces change, when we are told about changes.
+        """
+        use_cache = self.namespace_change_notify and self.attr_cache_size
+        key = (id(obj), type(obj))
+        if use_cache:
+            entry = self._attr_cache.pop(key, None)
+            # the identity check guards against reuse of ids
+            if entry is not None and entry[0] is obj:
+                self._attr_cache[key] = entry
+                return entry[1]
+
+        if getattr(self, 'limit_to__all__', False) and hasattr(obj, '__all__'):
             words = get__all__entries(obj)
         else: 
             words = dir2(obj)
@@ -412,10 +528,85 @@ def attr_matches(self, text):
             # Silence errors from completion function
             #raise # dbg
             pass
-        # Build match list to return
-        n = len(attr)
-        res = ["%s.%s" % (expr, w) for w in words if w[:n] == attr ]
-        return res
+
+        if use_cache:
+            self._attr_cache[key] = (obj, words)
+            while len(self._attr_cache) > self.attr_cache_size:
+                self._attr_cache.popitem(last=False)
+        return words
+
+
+class DirectoryCache(object):
+    """Cached listings of directories, for completing file names.
+
+    A listing is reused while the modification time of its directory is
+    unchanged. Once it changed, the directory is listed again in a background
+    thread, and the stale listing is returned if that takes more than
+    ``wait`` seconds (stale-while-revalidate).
+    """
+
+    # Listings taken within this many seconds of the last modification of
+    # their directory aren't trusted, as the directory may have been modified
+    # again without changing its modification time.
+    racy_interval = 2.0
+
+    def __init__(self, size=64, wait=0.1):
+        self.size = size
+        self.wait = wait
+        # {path: (mtime, trusted, [(name, isdir)])}
+        self._listings = OrderedDict()
+        self._lock = threading.Lock()
+        # {path: thread} for the listings being refreshed
+        self._refreshing = {}
+
+    def listing(self, path):
+        """Return the list of (name, isdir) for the entries of path"""
+        # relative paths are keyed by their absolute path,
+        # as the working directory can change
+        path = os.path.abspath(path)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return []
+        with self._lock:
+            entry = self._listings.get(path)
+        if entry is not None and entry[0] == mtime and entry[1]:
+            return entry[2]
+        thread = self._refresh(path, mtime)
+        thread.join(self.wait if entry is not None else None)
+        with self._lock:
+            entry = self._listings.get(path, entry)
+        return entry[2] if entry is not None else []
+
+    def _refresh(self, path, mtime):
+        with self._lock:
+            thread = self._refreshing.get(path)
+            if thread is None:
+                thread = threading.Thread(target=self._list,
+                                          args=(path, mtime))
+                thread.daemon = True
+                self._refreshing[path] = thread
+                thread.start()
+        return thread
+
+    def _list(self, path, mtime):
+        try:
+            names = os.listdir(path)
+        except OSError:
+            names = []
+        isdir = os.path.isdir
+        listing = [ (name, isdir(os.path.join(path, name))) for name in names ]
+        trusted = time.time() - mtime > self.racy_interval
+        with self._lock:
+            self._listings.pop(path, None)
+            self._listings[path] = (mtime, trusted, listing)
+            while len(self._listings) > self.size:
+                self._listings.popitem(last=False)
+            del self._refreshing[path]
+
+
+_keyword_index = NamespaceIndex()
+_keyword_index.update(dict.fromkeys(keyword.kwlist))
 
 
 def get__all__entries(obj):
@@ -518,6 +709,15 @@ def _greedy_changed(self, name, old, new):
         When 0: nothing will be excluded.
         """
     )
+    matcher_timeout = Float(0.5, config=True,
+        help="""The time budget of each matcher, in seconds.
+
+        Matchers that go over their budget return the matches they found so
+        far. The budget is checked between steps of a matcher, so a single
+        slow step (such as calling dir() on an object) can't be interrupted.
+        Set to 0 for no limit.
+        """
+    )
     limit_to__all__ = CBool(default_value=False, config=True,
         help="""Instruct the completer to use __all__ for the completion
         
@@ -529,6 +729,9 @@ def _greedy_changed(self, name, old, new):
         """
     )
 
+    def _limit_to__all___changed(self, name, old, new):
+        self._attr_cache.clear()
+
     def __init__(self, shell=None, namespace=None, global_namespace=None,
                  use_readline=True, config=None, **kwargs):
         """IPCompleter() -> completer
@@ -570,11 +773,23 @@ def __init__(self, shell=None, namespace=None, global_namespace=None,
 
         # List where completion matches will be stored
         self.matches = []
+        # The time spent by each matcher in the last completion, and the
+        # names of the matchers that ran out of time
+        self.matcher_times = {}
+        self.matchers_timed_out = []
+        self._matcher_deadline = None
         self.shell = shell
+        # Update the namespace indexes after each execution
+        events = getattr(shell, 'events', None)
+        if events is not None:
+            events.register('post_execute', self.namespace_changed)
+            self.namespace_change_notify = True
         # Regexp to split filenames with spaces in them
         self.space_name_re = re.compile(r'([^\\] )')
         # Hold a local ref. to glob.glob for speed
         self.glob = glob.glob
+        # Listings of the directories we complete file names in
+        self.dir_cache = DirectoryCache()
 
         # Determine if we are running on 'dumb' terminals, like (X)Emacs
         # buffers, to avoid completion problems.
@@ -615,6 +830,27 @@ def _clean_glob_win32(self,text):
         return [f.replace("\\","/")
                 for f in self.glob("%s*" % text)]
 
+    def _file_listing(self, text):
+        """Return [(path, isdir)] for the files matching ``text + '*'``.
+
+        Listings of directories are cached; text with glob patterns is
+        globbed, and isdir is None for those.
+        """
+        if glob.has_magic(text):
+            return [ (f, None) for f in self.clean_glob(text) ]
+        dirname, basename = os.path.split(text)
+        listing = self.dir_cache.listing(dirname or os.curdir)
+        normcase = os.path.normcase
+        prefix = normcase(basename)
+        show_hidden = basename.startswith('.')
+        paths = [ (os.path.join(dirname, name), isdir)
+                  for name, isdir in listing
+                  if normcase(name).startswith(prefix) and
+                  (show_hidden or not name.startswith('.')) ]
+        if sys.platform == "win32":
+            paths = [ (f.replace("\\","/"), isdir) for f, isdir in paths ]
+        return sorted(paths)
+
     def file_matches(self, text):
         """Match filenames, expanding ~USER type strings.
 
@@ -670,10 +906,12 @@ def file_matches(self, text):
             text = os.path.expanduser(text)
 
         if text == "":
-            return [text_prefix + protect_filename(f) for f in self.glob("*")]
+            return [text_prefix + protect_filename(f)
+                    for f, _ in self._file_listing("")]
 
         # Compute the matches from the filesystem
-        m0 = self.clean_glob(text.replace('\\',''))
+        listing = self._file_listing(text.replace('\\',''))
+        m0 = [ f for f, _ in listing ]
 
         if has_protectables:
             # If we had protectables, we need to revert our changes to the
@@ -695,8 +933,14 @@ def file_matches(self, text):
         #io.rprint('mm', matches)  # dbg
 
         # Mark directories in input list by appending '/' to their names.
-        matches = [x+'/' if os.path.isdir(x) else x for x in matches]
-        return matches
+        marked = []
+        for x, (_, isdir) in zip(matches, listing):
+            if isdir is None:
+                if self.out_of_time():
+                    break
+                isdir = os.path.isdir(x)
+            marked.append(x+'/' if isdir else x)
+        return marked
 
     def magic_matches(self, text):
         """Match magics"""
@@ -808,6 +1052,8 @@ def python_func_kw_matches(self,text):
         
         if "." in text: # a parameter cannot be dotted
             return []
+        if '(' not in self.text_until_cursor: # not in a call
+            return []
         try: regexp = self.__funcParamsRegex
         except AttributeError:
             regexp = self.__funcParamsRegex = re.compile(r'''
@@ -854,6 +1100,8 @@ def python_func_kw_matches(self,text):
             callableMatches = self.attr_matches('.'.join(ids[::-1]))
         argMatches = []
         for callableMatch in callableMatches:
+            if self.out_of_time():
+                break
             try:
                 namedArgs = self._default_arguments(eval(callableMatch,
                                                         self.namespace))
@@ -879,6 +1127,9 @@ def get_keys(obj):
                 return obj.dtype.names or []
             return []
 
+        if '[' not in self.text_until_cursor: # not in a subscript
+            return []
+
         try:
             regexps = self.__dict_key_regexps
         except AttributeError:
@@ -1060,6 +1311,8 @@ def complete(self, text=None, line_buffer=None, cursor_pos=None):
 
         # Start with a clean slate of completions
         self.matches[:] = []
+        self.matcher_times = {}
+        self.matchers_timed_out = []
         custom_res = self.dispatch_custom_completer(text)
         if custom_res is not None:
             # did custom completers produce something?
@@ -1072,14 +1325,14 @@ def complete(self, text=None, line_buffer=None, cursor_pos=None):
                 self.matches = []
                 for matcher in self.matchers:
                     try:
-                        self.matches.extend(matcher(text))
+                        self.matches.extend(self._run_matcher(matcher, text))
                     except:
                         # Show the ugly traceback if the matcher causes an
                         # exception, but do NOT crash the kernel!
                         sys.excepthook(*sys.exc_info())
             else:
                 for matcher in self.matchers:
-                    self.matches = matcher(text)
+                    self.matches = self._run_matcher(matcher, text)
                     if self.matches:
                         break
         # FIXME: we should extend our api to return a dict with completions for
@@ -1093,6 +1346,30 @@ def complete(self, text=None, line_buffer=None, cursor_pos=None):
         #io.rprint('COMP TEXT, MATCHES: %r, %r' % (text, self.matches)) # dbg
         return text, self.matches
 
+    def _run_matcher(self, matcher, text):
+        """Run a matcher within its time budget, recording the time it took"""
+        start = time.time()
+        if self.matcher_timeout:
+            self._matcher_deadline = start + self.matcher_timeout
+        try:
+            return matcher(text)
+        finally:
+            self._matcher_deadline = None
+            name = getattr(matcher, '__name__', repr(matcher))
+            elapsed = time.time() - start
+            self.matcher_times[name] = elapsed
+            if self.matcher_timeout and elapsed > self.matcher_timeout:
+                self.matchers_timed_out.append(name)
+
+    def out_of_time(self):
+        """Whether the running matcher has used up its time budget.
+
+        Matchers doing many steps should check this between steps, and
+        return the matches found so far when it is True.
+        """
+        return (self._matcher_deadline is not None and
+                time.time() > self._matcher_deadline)
+
     def rlcomplete(self, text, state):
         """Return the state-th possible completion for 'text'.
 
@@ -21,6 +21,7 @@
 import os
 import re
 import sys
+import threading
 
 try:
     # Python >= 3.3
@@ -38,6 +39,7 @@
 from IPython.core.completer import expand_user, compress_user
 from IPython.core.error import TryNext
 from IPython.utils._process_common import arg_split
+from IPython.utils import py3compat
 from IPython.utils.py3compat import string_types
 
 # FIXME: this should be pulled in with the right call via the component system
@@ -51,8 +53,13 @@
 # ipython ip.db database (kept in the user's .ipython dir).
 TIMEOUT_STORAGE = 2
 
-# Time in seconds after which we give up
-TIMEOUT_GIVEUP = 20
+# Time in seconds a completion waits for folders of sys.path that were never
+# listed; the folders still being listed are left out of the completions.
+TIMEOUT_WAIT = 2
+
+# Time in seconds after which the folders of sys.path are checked for changes
+# again, in the background.
+RECHECK_INTERVAL = 5
 
 # Regular expression for the python import statement
 import_re = re.compile(r'(?P<name>[a-zA-Z_][a-zA-Z0-9_]*?)'
@@ -107,43 +114,130 @@ def module_list(path):
     return list(set(modules))
 
 
-def get_root_modules():
+def _path_key(path):
+    """The key of a sys.path entry in the module index
+
+    The current directory is keyed by its absolute path, as it can change.
     """
-    Returns a list containing the names of all the modules available in the
-    folders of the pythonpath.
+    if path in ('', '.'):
+        return py3compat.getcwd()
+    return path
+
 
-    ip.db['rootmodules_cache'] maps sys.path entries to list of modules.
+def _path_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class RootModuleIndex(object):
+    """The names of the modules in the folders of sys.path.
+
+    The module lists are served from memory, and refreshed in a background
+    thread (stale-while-revalidate): folders are listed again when their
+    modification time changed, checked at most every RECHECK_INTERVAL
+    seconds. Only folders that were never listed are waited for, for at most
+    TIMEOUT_WAIT seconds.
+
+    If listing all the folders takes more than TIMEOUT_STORAGE seconds, the
+    lists are also stored in ip.db['rootmodules_cache'], which maps sys.path
+    entries to lists of modules, and is used to start the next sessions.
     """
-    ip = get_ipython()
-    rootmodules_cache = ip.db.get('rootmodules_cache', {})
-    rootmodules = list(sys.builtin_module_names)
-    start_time = time()
-    store = False
-    for path in sys.path:
-        try:
-            modules = rootmodules_cache[path]
-        except KeyError:
-            modules = module_list(path)
+
+    def __init__(self):
+        # {path: (mtime, modules)}, mtime is None for lists loaded from db
+        self._modules = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_check = 0
+
+    def reset(self):
+        """Forget all the module lists"""
+        with self._lock:
+            self._modules.clear()
+        self._last_check = 0
+
+    def get(self, paths, db=None):
+        """Return the list of root modules in the folders of paths"""
+        keys = [ _path_key(path) for path in paths ]
+        missing = [ key for key in keys if key not in self._modules ]
+        if missing and db is not None:
+            stored = db.get('rootmodules_cache', {})
+            with self._lock:
+                for key in missing:
+                    if key in stored:
+                        self._modules[key] = (None, stored[key])
+            missing = [ key for key in missing if key not in self._modules ]
+
+        if missing or time() - self._last_check > RECHECK_INTERVAL:
+            self._last_check = time()
+            self.refresh(keys, db, first=missing)
+        if missing:
+            self._thread.join(TIMEOUT_WAIT)
+
+        rootmodules = list(sys.builtin_module_names)
+        with self._lock:
+            for key in keys:
+                if key in self._modules:
+                    rootmodules.extend(self._modules[key][1])
+        return list(set(rootmodules))
+
+    def refresh(self, keys, db=None, first=()):
+        """Start listing the folders of keys which changed, in the background
+
+        The folders in first are listed first.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            if not first:
+                return
+            # the running update may not list the new folders
+            self._thread.join(TIMEOUT_WAIT)
+            if self._thread.is_alive():
+                return
+        keys = list(first) + [ key for key in keys if key not in first ]
+        self._thread = threading.Thread(target=self._update, args=(keys, db))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _update(self, keys, db):
+        start_time = time()
+        for key in keys:
+            mtime = _path_mtime(key)
+            entry = self._modules.get(key)
+            if entry is not None and mtime is not None and entry[0] == mtime:
+                continue
+            modules = module_list(key)
             try:
                 modules.remove('__init__')
             except ValueError:
                 pass
-            if path not in ('', '.'): # cwd modules should not be cached
-                rootmodules_cache[path] = modules
-            if time() - start_time > TIMEOUT_STORAGE and not store:
-                store = True
-                print("\nCaching the list of root modules, please wait!")
-                print("(This will only be done once - type '%rehashx' to "
-                      "reset cache!)\n")
-                sys.stdout.flush()
-            if time() - start_time > TIMEOUT_GIVEUP:
-                print("This is taking too long, we give up.\n")
-                return []
-        rootmodules.extend(modules)
-    if store:
-        ip.db['rootmodules_cache'] = rootmodules_cache
-    rootmodules = list(set(rootmodules))
-    return rootmodules
+            with self._lock:
+                self._modules[key] = (mtime, modules)
+
+        if db is not None and time() - start_time > TIMEOUT_STORAGE:
+            cwd = py3compat.getcwd()
+            with self._lock:
+                # cwd modules should not be stored
+                db['rootmodules_cache'] = dict(
+                    (key, modules) for key, (_, modules)
+                    in self._modules.items() if key != cwd
+                )
+
+
+root_module_index = RootModuleIndex()
+
+
+def get_root_modules():
+    """
+    Returns a list containing the names of all the modules available in the
+    folders of the pythonpath.
+
+    The lists of modules are kept up to date in the background by
+    :data:`root_module_index`.
+    """
+    ip = get_ipython()
+    return root_module_index.get(sys.path, ip.db)
 
 
 def is_importable(module, attr, only_modules):
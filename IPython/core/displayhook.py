@@ -23,15 +23,59 @@
 #-----------------------------------------------------------------------------
 from __future__ import print_function
 
+import numbers
 import sys
+import weakref
+from collections import OrderedDict
+from itertools import islice
 
 from IPython.core.formatters import _safe_get_formatter_method
 from IPython.config.configurable import Configurable
+from IPython.lib.pretty import _safe_getattr
 from IPython.utils import io
-from IPython.utils.py3compat import builtin_mod
-from IPython.utils.traitlets import Instance
+from IPython.utils.py3compat import builtin_mod, iteritems
+from IPython.utils.traitlets import Instance, Integer, Bool
 from IPython.utils.warn import warn
 
+#-----------------------------------------------------------------------------
+# Size estimates
+#-----------------------------------------------------------------------------
+
+# number of items of a container whose size is measured, to estimate the
+# size of the whole container
+_SIZE_SAMPLE = 100
+
+def _shallow_size(obj):
+    """The size of an object, using the nbytes of arrays"""
+    nbytes = _safe_getattr(obj, 'nbytes', None)
+    if isinstance(nbytes, numbers.Integral):
+        return int(nbytes)
+    try:
+        return sys.getsizeof(obj, 0)
+    except Exception:
+        return 0
+
+def estimate_size(obj):
+    """Estimate the memory used by an object, in bytes.
+
+    This is the ``nbytes`` of arrays, or :func:`sys.getsizeof`. For builtin
+    containers, the size of their items is added, extrapolated from the first
+    items of large containers. Objects referenced by the items are not
+    counted.
+    """
+    size = _shallow_size(obj)
+    if isinstance(obj, dict):
+        items = [ x for kv in islice(iteritems(obj), _SIZE_SAMPLE) for x in kv ]
+        n = 2 * len(obj)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = list(islice(obj, _SIZE_SAMPLE))
+        n = len(obj)
+    else:
+        return size
+    if items:
+        size += sum(_shallow_size(item) for item in items) * n // len(items)
+    return size
+
 #-----------------------------------------------------------------------------
 # Main displayhook class
 #-----------------------------------------------------------------------------
@@ -49,6 +93,22 @@ class DisplayHook(Configurable):
 
     shell = Instance('IPython.core.interactiveshell.InteractiveShellABC')
 
+    cache_max_bytes = Integer(0, config=True, help=
+        """
+        The approximate memory, in bytes, that the outputs kept in the output
+        cache (Out and _N) may use.  When it is exceeded, the oldest outputs
+        are dropped one by one.  Sizes are estimated with the nbytes of
+        arrays, or sys.getsizeof.  0 means no limit.
+        """
+    )
+    cache_weakrefs = Bool(False, config=True, help=
+        """
+        Keep weak references to the outputs dropped from the output cache,
+        so that %outcache can report those that are still kept alive
+        by other references.
+        """
+    )
+
     def __init__(self, shell=None, cache_size=1000, **kwargs):
         super(DisplayHook, self).__init__(shell=shell, **kwargs)
 
@@ -66,6 +126,12 @@ def __init__(self, shell=None, cache_size=1000, **kwargs):
 
         self.cache_size = cache_size
 
+        # {N: estimated size} of the outputs in the cache, oldest first
+        self.output_sizes = OrderedDict()
+        self.cached_bytes = 0
+        # {N: weakref} of the outputs dropped from the cache
+        self.dropped_outputs = {}
+
         # we need a reference to the user-level namespace
         self.shell = shell
         
@@ -192,14 +258,6 @@ def update_user_ns(self, result):
 
         # Avoid recursive reference when displaying _oh/Out
         if result is not self.shell.user_ns['_oh']:
-            if len(self.shell.user_ns['_oh']) >= self.cache_size and self.do_full_cache:
-                warn('Output cache limit (currently '+
-                      repr(self.cache_size)+' entries) hit.\n'
-                     'Flushing cache and resetting history counter...\n'
-                     'The only history variables available will be _,__,___ and _1\n'
-                     'with the current result.')
-
-                self.flush()
             # Don't overwrite '_' and friends if '_' is in __builtin__ (otherwise
             # we cause buggy behavior for things like gettext).
 
@@ -218,6 +276,64 @@ def update_user_ns(self, result):
                 to_main[new_result] = result
                 self.shell.push(to_main, interactive=False)
                 self.shell.user_ns['_oh'][self.prompt_count] = result
+                self.add_cached_output(self.prompt_count, result)
+
+    def add_cached_output(self, n, result):
+        """Account for the output n in the output cache, and prune it."""
+        size = estimate_size(result)
+        self.cached_bytes += size - self.output_sizes.pop(n, 0)
+        self.output_sizes[n] = size
+        self.prune_cache()
+
+    def prune_cache(self):
+        """Drop the oldest outputs until the cache is within its limits.
+
+        The most recent output is always kept.
+        """
+        while len(self.output_sizes) > 1 and (
+                len(self.output_sizes) > self.cache_size or
+                self.cache_max_bytes and
+                self.cached_bytes > self.cache_max_bytes):
+            n, size = self.output_sizes.popitem(last=False)
+            self.cached_bytes -= size
+            self.drop_output(n)
+
+    def drop_output(self, n):
+        """Remove output n from Out and the user namespace."""
+        user_ns = self.shell.user_ns
+        oh = user_ns.get('_oh', {})
+        if n not in oh:
+            return
+        result = oh.pop(n)
+        key = '_%i' % n
+        if user_ns.get(key) is result:
+            del user_ns[key]
+        if self.cache_weakrefs:
+            try:
+                self.dropped_outputs[n] = weakref.ref(result)
+            except TypeError:
+                pass
+
+    def cached_outputs(self):
+        """Return a list of (N, output, estimated size) in the output cache.
+
+        Outputs deleted by other means (e.g. %xdel) are forgotten.
+        """
+        oh = self.shell.user_ns.get('_oh', {})
+        for n in [ n for n in self.output_sizes if n not in oh ]:
+            self.cached_bytes -= self.output_sizes.pop(n)
+        return [ (n, oh[n], size) for n, size in self.output_sizes.items() ]
+
+    def alive_dropped_outputs(self):
+        """Return a list of (N, output) for the dropped outputs still alive."""
+        alive = []
+        for n, ref in sorted(self.dropped_outputs.items()):
+            obj = ref()
+            if obj is None:
+                del self.dropped_outputs[n]
+            else:
+                alive.append((n, obj))
+        return alive
 
     def log_output(self, format_dict):
         """Log the output."""
@@ -272,6 +388,10 @@ def flush(self):
         if oh is not None:
             oh.clear()
 
+        self.output_sizes.clear()
+        self.cached_bytes = 0
+        self.dropped_outputs.clear()
+
         # Release our own references to objects:
         self._, self.__, self.___ = '', '', ''
 
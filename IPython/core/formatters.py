@@ -29,6 +29,7 @@
 import sys
 import types
 import warnings
+import weakref
 
 from IPython.external.decorator import decorator
 
@@ -36,7 +37,7 @@
 from IPython.config.configurable import Configurable
 from IPython.lib import pretty
 from IPython.utils.traitlets import (
-    Bool, Dict, Integer, Unicode, CUnicode, ObjectName, List,
+    Bool, Dict, Instance, Integer, Unicode, CUnicode, ObjectName, List,
 )
 from IPython.utils.py3compat import (
     unicode_to_str, with_metaclass, PY3, string_types, unicode_type,
@@ -142,6 +143,15 @@ def _formatters_default(self):
             d[f.format_type] = f
         return d
 
+    def clear_cache(self):
+        """Forget the cached printer lookups of all the formatters
+
+        The shell calls this after each execution, so that classes given
+        a print method by the code run are picked up.
+        """
+        for formatter in self.formatters.values():
+            formatter.clear_cache()
+
     def format(self, obj, include=None, exclude=None):
         """Return a format data dict for an object.
 
@@ -290,6 +300,21 @@ def _get_type(obj):
     """Return the type of an instance (old and new-style)"""
     return getattr(obj, '__class__', None) or type(obj)
 
+
+def _lacks_method(typ, name):
+    """Return whether instances of typ can only get attribute name
+    from their own __dict__.
+
+    This is False if the class defines the attribute, or computes attributes
+    dynamically with __getattr__ or __getattribute__.
+    """
+    if pretty._safe_getattr(typ, '__getattr__', None) is not None:
+        return False
+    if pretty._safe_getattr(typ, '__getattribute__',
+                            object.__getattribute__) is not object.__getattribute__:
+        return False
+    return pretty._safe_getattr(typ, name, None) is None
+
 _raise_key_error = object()
 
 
@@ -336,7 +361,19 @@ class BaseFormatter(Configurable):
     # The deferred-import type-specific printers.
     # Map (modulename, classname) pairs to the format functions.
     deferred_printers = Dict(config=True)
-    
+
+    # Cache of lookup_by_type: maps types to the class of their MRO that has
+    # a registered printer, or None.
+    # It is cleared when printers are added to or removed from the registries,
+    # or when they are replaced.
+    _lookup_cache = Instance(weakref.WeakKeyDictionary, ())
+    _lookup_cache_state = None
+
+    # Types whose instances have no print_method (see _lacks_method).
+    # Cleared by for_type and pop, so that a type that gets a print_method
+    # later on can be picked up after registering a printer.
+    _no_method_types = Instance(weakref.WeakKeyDictionary, ())
+
     @warn_format_error
     def __call__(self, obj):
         """Compute the format for an object."""
@@ -349,6 +386,8 @@ def __call__(self, obj):
             else:
                 return printer(obj)
             # Finally look for special method names
+            if not self._may_have_method(obj):
+                return None
             method = _safe_get_formatter_method(obj, self.print_method)
             if method is not None:
                 return method()
@@ -415,13 +454,78 @@ def lookup_by_type(self, typ):
             else:
                 return self.deferred_printers[typ_key]
         else:
-            for cls in pretty._get_mro(typ):
-                if cls in self.type_printers or self._in_deferred_types(cls):
-                    return self.type_printers[cls]
+            cls = self._registered_class(typ)
+            if cls is not None:
+                return self.type_printers[cls]
         
         # If we have reached here, the lookup failed.
         raise KeyError("No registered printer for {0!r}".format(typ))
 
+    def _registry_state(self):
+        return len(self.type_printers), len(self.deferred_printers)
+
+    def _type_printers_changed(self, name, old, new):
+        self.clear_cache()
+
+    _deferred_printers_changed = _type_printers_changed
+
+    def _registered_class(self, typ):
+        """Return the first class in the MRO of typ with a registered printer
+
+        Returns None if there is none. Results are cached, until printers
+        are added to or removed from type_printers or deferred_printers.
+        """
+        cache = self._lookup_cache
+        if self._lookup_cache_state != self._registry_state():
+            cache.clear()
+        try:
+            cls = cache[typ]
+        except (KeyError, TypeError):
+            pass
+        else:
+            if cls is None or cls in self.type_printers:
+                return cls
+
+        cls = None
+        for c in pretty._get_mro(typ):
+            if c in self.type_printers or self._in_deferred_types(c):
+                cls = c
+                break
+        # _in_deferred_types may have moved a printer, which doesn't change
+        # the results already cached.
+        self._lookup_cache_state = self._registry_state()
+        try:
+            cache[typ] = cls
+        except TypeError:
+            pass
+        return cls
+
+    def _may_have_method(self, obj):
+        """Return False if obj certainly has no print_method"""
+        typ = _get_type(obj)
+        try:
+            if typ in self._no_method_types:
+                return self.print_method in getattr(obj, '__dict__', ())
+        except TypeError:
+            return True
+        if _lacks_method(typ, self.print_method):
+            try:
+                self._no_method_types[typ] = True
+            except TypeError:
+                pass
+            return self.print_method in getattr(obj, '__dict__', ())
+        return True
+
+    def clear_cache(self):
+        """Forget the cached printer lookups
+
+        Call this after adding a print method to an existing class
+        which was already displayed. The shell does this after each execution,
+        see :meth:`DisplayFormatter.clear_cache`.
+        """
+        self._lookup_cache.clear()
+        self._no_method_types.clear()
+
     def for_type(self, typ, func=None):
         """Add a format function for a given type.
         
@@ -458,6 +562,7 @@ def for_type(self, typ, func=None):
         
         if func is not None:
             self.type_printers[typ] = func
+            self.clear_cache()
         
         return oldfunc
 
@@ -498,6 +603,7 @@ def for_type_by_name(self, type_module, type_name, func=None):
         
         if func is not None:
             self.deferred_printers[key] = func
+            self.clear_cache()
         return oldfunc
     
     def pop(self, typ, default=_raise_key_error):
@@ -539,6 +645,7 @@ def pop(self, typ, default=_raise_key_error):
                 old = self.deferred_printers.pop(_mod_name_key(typ), default)
         if old is _raise_key_error:
             raise KeyError("No registered value for {0!r}".format(typ))
+        self.clear_cache()
         return old
 
     def _in_deferred_types(self, cls):
@@ -601,6 +708,20 @@ def dtype_pprinter(obj, p, cycle):
     # The maximum width.
     max_width = Integer(79, config=True)
 
+    max_seq_length = Integer(pretty.MAX_SEQ_LENGTH, config=True,
+        help="""Truncate large collections (lists, dicts, tuples, sets) to this size.
+        
+        Set to 0 to disable truncation.
+        """
+    )
+
+    max_output_length = Integer(1000000, config=True,
+        help="""Truncate the pretty-printed output after about this many characters.
+        
+        Set to 0 to disable truncation.
+        """
+    )
+
     # The newline character.
     newline = Unicode('\n', config=True)
 
@@ -683,7 +804,9 @@ def __call__(self, obj):
                 self.max_width, unicode_to_str(self.newline),
                 singleton_pprinters=self.singleton_printers,
                 type_pprinters=self.type_printers,
-                deferred_pprinters=self.deferred_printers)
+                deferred_pprinters=self.deferred_printers,
+                max_seq_length=self.max_seq_length,
+                max_output_length=self.max_output_length)
             printer.pretty(obj)
             printer.flush()
             return stream.getvalue()
@@ -511,6 +511,13 @@ def reset(self):
                 pass
     
     def flush_transformers(self):
+        out = self._flush_transformers()
+        if out is not None:
+            self._store(out)
+
+    def _flush_transformers(self):
+        """Flush the transformers in use, returning the final output or None
+        """
         def _flush(transform, out):
             if out is not None:
                 tmp = transform.push(out)
@@ -521,9 +528,7 @@ def _flush(transform, out):
         out = None
         for t in self.transforms_in_use:
             out = _flush(t, out)
-        
-        if out is not None:
-            self._store(out)
+        return out
 
     def raw_reset(self):
         """Return raw input only and perform a full reset.
@@ -547,12 +552,24 @@ def push_accepts_more(self):
 
     def transform_cell(self, cell):
         """Process and translate a cell of input.
+
+        The lines of the cell are passed through the transformers in a single
+        pass. Unlike :meth:`push`, the accumulated source is neither joined nor
+        compiled after each line, so this takes time linear in the size of
+        the cell.
         """
         self.reset()
         try:
-            self.push(cell)
-            self.flush_transformers()
-            return self.source
+            cell = cast_unicode(cell, self.encoding)
+            out = []
+            for line in cell.splitlines() or [u'']:
+                line = self._transform_line(line)
+                if line is not None:
+                    out.append(line)
+            line = self._flush_transformers()
+            if line is not None:
+                out.append(line)
+            return u''.join(l if l.endswith('\n') else l + '\n' for l in out)
         finally:
             self.reset()
 
@@ -599,12 +616,21 @@ def push(self, lines):
         return out
     
     def push_line(self, line):
-        buf = self._buffer
-        
+        line = self._transform_line(line)
+        if line is None:
+            return False
+        return super(IPythonInputSplitter, self).push(line)
+
+    def _transform_line(self, line):
+        """Pass one line through the transformers in use.
+
+        Returns the transformed line, or None if a transformer is accumulating
+        input.
+        """
         def _accumulating(dbg):
             #print(dbg)
             self.transformer_accumulating = True
-            return False
+            return None
         
         for transformer in self.physical_line_transforms:
             line = transformer.push(line)
@@ -635,4 +661,4 @@ def _accumulating(dbg):
 
         #print("transformers clear") #debug
         self.transformer_accumulating = False
-        return super(IPythonInputSplitter, self).push(line)
+        return line
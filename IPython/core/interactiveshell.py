@@ -16,6 +16,7 @@
 import abc
 import ast
 import atexit
+from collections import OrderedDict
 import functools
 import os
 import re
@@ -243,12 +244,29 @@ class InteractiveShell(SingletonConfigurable):
         """
         Set the size of the output cache.  The default is 1000, you can
         change it permanently in your config file.  Setting it to 0 completely
-        disables the caching system, and the minimum value accepted is 20 (if
-        you provide a value less than 20, it is reset to 0 and a warning is
-        issued).  This limit is defined because otherwise you'll spend more
-        time re-flushing a too small cache than working
+        disables the caching system, and the minimum value accepted is 3 (if
+        you provide a value less than 3, it is reset to 0 and a warning is
+        issued).  When the cache is full, the oldest outputs are dropped.
+        See also DisplayHook.cache_max_bytes.
         """
     )
+    compile_cache_size = Integer(128, config=True, help=
+        """
+        The number of cells whose compiled code is kept, so that running the
+        same cell again skips parsing and compiling it.  Set to 0 to disable.
+        """
+    )
+    linecache_size = Integer(10000, config=True, help=
+        """
+        The number of cells whose source is kept in the linecache, for
+        displaying tracebacks.  The least recently run cells are dropped
+        first.  Set to 0 to keep the source of every cell.
+        """
+    )
+    def _linecache_size_changed(self, name, old, new):
+        if hasattr(self, 'compile'):
+            self.compile.linecache_size = new
+
     color_info = CBool(True, config=True, help=
         """
         Use colors for displaying information about objects. Because this
@@ -577,6 +595,9 @@ def init_instance_attrs(self):
 
         # command compiler
         self.compile = CachingCompiler()
+        self.compile.linecache_size = self.linecache_size
+        # compiled code of recent cells, see run_cell
+        self._compile_cache = OrderedDict()
 
         # Make an empty namespace, which extension writers can rely on both
         # existing and NEVER being used by ipython itself.  This gives them a
@@ -687,6 +708,8 @@ def init_prompts(self):
     def init_display_formatter(self):
         self.display_formatter = DisplayFormatter(parent=self)
         self.configurables.append(self.display_formatter)
+        # the code run may give print methods to classes already displayed
+        self.events.register('post_execute', self.display_formatter.clear_cache)
 
     def init_display_pub(self):
         self.display_pub = self.display_pub_class(parent=self)
@@ -2765,33 +2788,69 @@ def run_cell(self, raw_cell, store_history=False, silent=False, shell_futures=Tr
         # run code with a separate __future__ environment, use the default
         # compiler
         compiler = self.compile if shell_futures else CachingCompiler()
+        interactivity = "none" if silent else self.ast_node_interactivity
+
+        # Code compiled by the shell's compiler is cached, keyed on everything
+        # that determines it.
+        cache_key = None
+        cached = None
+        if shell_futures and self.compile_cache_size:
+            cache_key = (cell, compiler.flags, interactivity,
+                         tuple(self.ast_transformers))
+            try:
+                cached = self._compile_cache.pop(cache_key, None)
+            except TypeError:
+                # unhashable AST transformers
+                cache_key = None
 
         with self.builtin_trap:
-            cell_name = self.compile.cache(cell, self.execution_count)
+            if cached is None:
+                cell_name = self.compile.cache(cell, self.execution_count)
+            else:
+                # reuse the name the code objects were compiled with
+                self._compile_cache[cache_key] = cached
+                number, code_objects, flags = cached
+                cell_name = self.compile.cache(cell, number)
 
             with self.display_trap:
-                # Compile to bytecode
-                try:
-                    code_ast = compiler.ast_parse(cell, filename=cell_name)
-                except IndentationError:
-                    self.showindentationerror()
-                    if store_history:
-                        self.execution_count += 1
-                    return None
-                except (OverflowError, SyntaxError, ValueError, TypeError,
-                        MemoryError):
-                    self.showsyntaxerror()
-                    if store_history:
-                        self.execution_count += 1
-                    return None
-
-                # Apply AST transformations
-                code_ast = self.transform_ast(code_ast)
-
-                # Execute the user code
-                interactivity = "none" if silent else self.ast_node_interactivity
-                self.run_ast_nodes(code_ast.body, cell_name,
-                                   interactivity=interactivity, compiler=compiler)
+                if cached is None:
+                    # Compile to bytecode
+                    try:
+                        code_ast = compiler.ast_parse(cell, filename=cell_name)
+                    except IndentationError:
+                        self.showindentationerror()
+                        if store_history:
+                            self.execution_count += 1
+                        return None
+                    except (OverflowError, SyntaxError, ValueError, TypeError,
+                            MemoryError):
+                        self.showsyntaxerror()
+                        if store_history:
+                            self.execution_count += 1
+                        return None
+
+                    # Apply AST transformations
+                    code_ast = self.transform_ast(code_ast)
+
+                    # Execute the user code, recording the code objects
+                    code_objects = []
+                    def recording_compiler(source, filename, symbol):
+                        code = compiler(source, filename, symbol)
+                        code_objects.append(code)
+                        return code
+                    self.run_ast_nodes(code_ast.body, cell_name,
+                                       interactivity=interactivity,
+                                       compiler=recording_compiler)
+
+                    # Only cache cells whose nodes all compiled
+                    if (cache_key is not None and
+                            len(code_objects) == len(code_ast.body)):
+                        self._store_compiled(cache_key, (self.execution_count,
+                                             code_objects, compiler.flags))
+                else:
+                    # Compiling may have updated the __future__ flags
+                    compiler.flags = flags
+                    self.run_code_objects(code_objects)
                 
                 self.events.trigger('post_execute')
                 if not silent:
@@ -2904,6 +2963,30 @@ def run_ast_nodes(self, nodelist, cell_name, interactivity='last_expr',
 
         return False
 
+    def _store_compiled(self, key, entry):
+        """Store an entry in the compile cache, dropping the oldest ones"""
+        self._compile_cache[key] = entry
+        while len(self._compile_cache) > self.compile_cache_size:
+            self._compile_cache.popitem(last=False)
+
+    def run_code_objects(self, code_objects):
+        """Run a sequence of code objects, stopping at the first error.
+
+        This is how :meth:`run_ast_nodes` runs the code it compiles.
+
+        Returns
+        -------
+        True if an error occurred, False otherwise.
+        """
+        for code in code_objects:
+            if self.run_code(code):
+                return True
+
+        # Flush softspace
+        if softspace(sys.stdout, 0):
+            print()
+        return False
+
     def run_code(self, code_obj):
         """Execute a code object.
 
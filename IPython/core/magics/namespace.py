@@ -20,6 +20,7 @@
 
 # Our own packages
 from IPython.core import page
+from IPython.core.displayhook import estimate_size
 from IPython.core.error import StdinNotImplementedError, UsageError
 from IPython.core.magic import Magics, magics_class, line_magic
 from IPython.testing.skipdoctest import skip_doctest
@@ -702,3 +703,72 @@ def xdel(self, parameter_s=''):
             self.shell.del_var(varname, ('n' in opts))
         except (NameError, ValueError) as e:
             print(type(e).__name__ +": "+ str(e))
+
+    @line_magic
+    def outcache(self, parameter_s=''):
+        """Show the outputs kept in the output cache, and their size.
+
+        The outputs are listed from the oldest, which are the first to be
+        dropped when the cache exceeds ``InteractiveShell.cache_size`` entries
+        or ``DisplayHook.cache_max_bytes`` bytes. Sizes are estimates, see
+        :func:`IPython.core.displayhook.estimate_size`.
+
+        If ``DisplayHook.cache_weakrefs`` is enabled, the dropped outputs
+        which are still alive (because something else references them) are
+        also listed.
+
+        Examples
+        --------
+        ::
+
+          In [1]: list(range(1000))
+          ...
+
+          In [2]: %outcache
+          Out    Type    Size
+          -------------------------
+          1      list    35.2 kB
+          1 outputs, 35.2 kB (limit: 1000 outputs)
+        """
+        displayhook = self.shell.displayhook
+        if not displayhook.do_full_cache:
+            print('The output cache is disabled.')
+            return
+        outputs = displayhook.cached_outputs()
+        if outputs:
+            rows = [ (str(n), type(obj).__name__, _format_bytes(size))
+                     for n, obj, size in outputs ]
+            _print_table(('Out', 'Type', 'Size'), rows)
+        limit = '%i outputs' % displayhook.cache_size
+        if displayhook.cache_max_bytes:
+            limit += ', ' + _format_bytes(displayhook.cache_max_bytes)
+        print('%i outputs, %s (limit: %s)' % (len(outputs),
+            _format_bytes(displayhook.cached_bytes), limit))
+
+        alive = displayhook.alive_dropped_outputs()
+        if alive:
+            print('\nDropped outputs still referenced elsewhere:')
+            rows = [ (str(n), type(obj).__name__,
+                      _format_bytes(estimate_size(obj))) for n, obj in alive ]
+            _print_table(('Out', 'Type', 'Size'), rows)
+
+
+def _format_bytes(n):
+    """Format a number of bytes for humans"""
+    for unit in ('bytes', 'kB', 'MB', 'GB'):
+        if n < 1024 or unit == 'GB':
+            break
+        n /= 1024.
+    if unit == 'bytes':
+        return '%i bytes' % n
+    return '%.1f %s' % (n, unit)
+
+
+def _print_table(labels, rows):
+    colsep = 3
+    widths = [ max(len(label), *[len(row[i]) for row in rows]) + colsep
+               for i, label in enumerate(labels) ]
+    print(''.join(label.ljust(w) for label, w in zip(labels, widths)).rstrip())
+    print('-' * (sum(widths) - colsep))
+    for row in rows:
+        print(''.join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip())
@@ -159,9 +159,11 @@ def rehashx(self, parameter_s=''):
         used on slow filesystems.
         """
         from IPython.core.alias import InvalidAliasError
+        from IPython.core.completerlib import root_module_index
 
         # for the benefit of module completer in ipy_completers.py
         del self.shell.db['rootmodules_cache']
+        root_module_index.reset()
 
         path = [os.path.abspath(os.path.expanduser(p)) for p in
             os.environ.get('PATH','').split(os.pathsep)]
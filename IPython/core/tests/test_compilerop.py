@@ -49,6 +49,27 @@ def test_cache():
     cp.cache('x=1')
     nt.assert_true(len(linecache.cache) > ncache)
 
+def test_cache_size():
+    """Test that the least recently cached code is dropped from the linecache
+    """
+    cp = compilerop.CachingCompiler()
+    cp.linecache_size = 2
+    saved = linecache._ipython_cache.copy()
+    try:
+        names = [ cp.cache('x=%i' % i) for i in range(3) ]
+        # refresh the second entry
+        cp.cache('x=1')
+        cp.cache('x=3')
+        nt.assert_not_in(names[0], linecache.cache)
+        nt.assert_not_in(names[2], linecache.cache)
+        nt.assert_in(names[1], linecache.cache)
+        linecache.checkcache()
+        nt.assert_in(names[1], linecache.cache)
+        nt.assert_equal(len(linecache._ipython_cache), 2)
+    finally:
+        linecache._ipython_cache.update(saved)
+        linecache.checkcache()
+
 def setUp():
     # Check we're in a proper Python 2 environment (some imports, such
     # as GTK, can change the default encoding, which can hide bugs.)
@@ -207,6 +207,51 @@ def test_local_file_completions():
         nt.assert_equal(c, comp)
 
 
+def test_directory_cache():
+    class CountingCache(completer.DirectoryCache):
+        calls = 0
+        def _list(self, path, mtime):
+            self.calls += 1
+            super(CountingCache, self)._list(path, mtime)
+
+    cache = CountingCache(wait=10)
+    cache.racy_interval = -1
+    with TemporaryDirectory() as tmpdir:
+        open(os.path.join(tmpdir, 'a'), 'w').close()
+        os.mkdir(os.path.join(tmpdir, 'b'))
+        nt.assert_equal(sorted(cache.listing(tmpdir)),
+                        [('a', False), ('b', True)])
+        nt.assert_equal(sorted(cache.listing(tmpdir)),
+                        [('a', False), ('b', True)])
+        nt.assert_equal(cache.calls, 1)
+        os.remove(os.path.join(tmpdir, 'a'))
+        # make sure the modification time changes
+        mtime = os.stat(tmpdir).st_mtime
+        os.utime(tmpdir, (mtime + 10, mtime + 10))
+        nt.assert_equal(cache.listing(tmpdir), [('b', True)])
+        nt.assert_equal(cache.calls, 2)
+    nt.assert_equal(cache.listing(tmpdir), [])
+
+
+def test_directory_cache_chdir():
+    cache = completer.DirectoryCache(wait=10)
+    cache.racy_interval = -1
+    with TemporaryDirectory() as tmpdir:
+        for name, filename in (('a', 'apple.py'), ('b', 'banana.py')):
+            os.mkdir(os.path.join(tmpdir, name))
+            open(os.path.join(tmpdir, name, filename), 'w').close()
+            # the same modification time for both directories
+            os.utime(os.path.join(tmpdir, name), (1000000000, 1000000000))
+        cwd = py3compat.getcwd()
+        try:
+            os.chdir(os.path.join(tmpdir, 'a'))
+            nt.assert_equal(cache.listing('.'), [('apple.py', False)])
+            os.chdir(os.path.join(tmpdir, 'b'))
+            nt.assert_equal(cache.listing('.'), [('banana.py', False)])
+        finally:
+            os.chdir(cwd)
+
+
 def test_greedy_completions():
     ip = get_ipython()
     ip.ex('a=list(range(5))')
@@ -299,6 +344,83 @@ def test_func_kw_completions():
     nt.assert_in('key=', matches)
 
 
+def test_namespace_index():
+    index = completer.NamespaceIndex()
+    ns = dict(abc=1, abd=2, b=3)
+    ns[1] = 'not a name'
+    index.update(ns)
+    nt.assert_equal(index.matches('ab'), ['abc', 'abd'])
+    nt.assert_equal(index.matches(''), ['abc', 'abd', 'b'])
+    nt.assert_equal(index.matches('x'), [])
+    del ns['abc']
+    ns['abe'] = 4
+    # the same size, so the change is only seen once marked stale
+    index.update(ns)
+    nt.assert_equal(index.matches('ab'), ['abc', 'abd'])
+    index.stale = True
+    index.update(ns)
+    nt.assert_equal(index.matches('ab'), ['abd', 'abe'])
+    index.update(dict(ab=1))
+    nt.assert_equal(index.matches('ab'), ['ab'])
+
+
+def test_global_completions_after_execution():
+    ip = get_ipython()
+    ip.run_cell('index_test_a = index_test_b = 1')
+    _, matches = ip.complete('index_test_')
+    nt.assert_equal(matches, ['index_test_a', 'index_test_b'])
+    ip.run_cell('del index_test_a; index_test_c = 1')
+    _, matches = ip.complete('index_test_')
+    nt.assert_equal(matches, ['index_test_b', 'index_test_c'])
+    ip.run_cell('del index_test_b, index_test_c')
+
+
+def test_attr_completion_cache():
+    ip = get_ipython()
+    ip.run_cell("""
+class AttrCacheTest(object):
+    dir_calls = 0
+    def __dir__(self):
+        AttrCacheTest.dir_calls += 1
+        return ['spam']
+attr_cache_test = AttrCacheTest()
+""")
+    try:
+        cls = ip.user_ns['AttrCacheTest']
+        for i in range(3):
+            _, matches = ip.complete('attr_cache_test.sp')
+            nt.assert_equal(matches, ['attr_cache_test.spam'])
+        nt.assert_equal(cls.dir_calls, 1)
+        # executing code invalidates the cache
+        ip.run_cell('pass')
+        _, matches = ip.complete('attr_cache_test.sp')
+        nt.assert_equal(cls.dir_calls, 2)
+    finally:
+        ip.run_cell('del AttrCacheTest, attr_cache_test')
+
+
+def test_matcher_timeout():
+    ip = get_ipython()
+    c = ip.Completer
+    def slow_matcher(text):
+        matches = []
+        while not c.out_of_time():
+            matches = ['slow_match']
+        return matches
+    c.matchers.insert(0, slow_matcher)
+    timeout = c.matcher_timeout
+    c.matcher_timeout = 0.01
+    try:
+        _, matches = c.complete('slow')
+        nt.assert_in('slow_match', matches)
+        nt.assert_equal(c.matchers_timed_out, ['slow_matcher'])
+        nt.assert_greater_equal(c.matcher_times['slow_matcher'], 0.01)
+        nt.assert_in('python_matches', c.matcher_times)
+    finally:
+        c.matchers.remove(slow_matcher)
+        c.matcher_timeout = timeout
+
+
 def test_default_arguments_from_docstring():
     doc = min.__doc__
     ip = get_ipython()
@@ -17,7 +17,8 @@
 
 import nose.tools as nt
 
-from IPython.core.completerlib import magic_run_completer, module_completion
+from IPython.core.completerlib import (magic_run_completer, module_completion,
+                                       RootModuleIndex)
 from IPython.utils import py3compat
 from IPython.utils.tempdir import TemporaryDirectory
 from IPython.testing.decorators import onlyif_unicode_paths
@@ -145,3 +146,27 @@ def test_import_invalid_module():
         nt.assert_equal(intersection, set())
 
         assert valid_module_names.issubset(s), valid_module_names.intersection(s)
+
+
+def test_root_module_index():
+    index = RootModuleIndex()
+    with TemporaryDirectory() as tmpdir:
+        open(os.path.join(tmpdir, 'modindex_a.py'), 'w').close()
+        modules = index.get([tmpdir])
+        nt.assert_in('modindex_a', modules)
+        nt.assert_in('sys', modules)
+
+        open(os.path.join(tmpdir, 'modindex_b.py'), 'w').close()
+        mtime = os.stat(tmpdir).st_mtime
+        os.utime(tmpdir, (mtime + 10, mtime + 10))
+        # changes are picked up in the background
+        index.refresh([tmpdir])
+        index._thread.join()
+        modules = index.get([tmpdir])
+        nt.assert_in('modindex_b', modules)
+
+        index.reset()
+        # stored lists are used until the folders are checked again
+        index._last_check = float('inf')
+        db = {'rootmodules_cache': {tmpdir: ['modindex_stored']}}
+        nt.assert_in('modindex_stored', index.get([tmpdir], db))
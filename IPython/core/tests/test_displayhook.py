@@ -0,0 +1,29 @@
+"""Tests for the output cache size estimates of the displayhook."""
+
+import sys
+
+import nose.tools as nt
+
+from IPython.core.displayhook import estimate_size
+
+
+class Array(object):
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+
+def test_estimate_size():
+    nt.assert_equal(estimate_size(Array(1000)), 1000)
+    obj = object()
+    nt.assert_equal(estimate_size(obj), sys.getsizeof(obj))
+    arrays = [Array(1000)] * 10
+    nt.assert_equal(estimate_size(arrays), sys.getsizeof(arrays) + 10000)
+    d = dict(a=Array(1000))
+    nt.assert_equal(estimate_size(d),
+                    sys.getsizeof(d) + sys.getsizeof('a') + 1000)
+
+
+def test_estimate_size_sampled():
+    # the items of large containers are sampled
+    arrays = [Array(10)] * 1000
+    nt.assert_equal(estimate_size(arrays), sys.getsizeof(arrays) + 10000)
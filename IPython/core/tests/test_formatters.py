@@ -320,3 +320,48 @@ def test_format_config():
         result = f(Config)
     nt.assert_is(result, None)
     nt.assert_equal(captured.stderr, "")
+
+def test_lookup_cache():
+    f = PlainTextFormatter()
+    nt.assert_not_in(B, f)
+    f.for_type(A, foo_printer)
+    nt.assert_is(f.lookup_by_type(B), foo_printer)
+    nt.assert_equal(f(B()), 'foo')
+    # a more specific printer, added directly to the registry
+    f.type_printers[B] = lambda obj, p, cycle: p.text('B')
+    nt.assert_equal(f(B()), 'B')
+    f.pop(B)
+    nt.assert_equal(f(B()), 'foo')
+    f.pop(A)
+    nt.assert_equal(f(B()), 'B()')
+
+def test_no_method_cache():
+    class NoHTML(object):
+        pass
+    f = HTMLFormatter()
+    nt.assert_is(f(NoHTML()), None)
+    nt.assert_in(NoHTML, f._no_method_types)
+    # methods set on instances are still found
+    obj = NoHTML()
+    obj._repr_html_ = lambda : 'html'
+    nt.assert_equal(f(obj), 'html')
+    # a method added to the class is found after clearing the cache
+    NoHTML._repr_html_ = lambda self: 'class html'
+    f.clear_cache()
+    nt.assert_equal(f(NoHTML()), 'class html')
+
+def test_no_method_cache_cleared_after_execution():
+    ip = get_ipython()
+    f = ip.display_formatter.formatters['text/html']
+    enabled = f.enabled
+    f.enabled = True
+    try:
+        ip.run_cell('class NoHTML(object): pass')
+        ip.run_cell('obj = NoHTML()')
+        nt.assert_is(f(ip.user_ns['obj']), None)
+        # a method added to the class in a later cell is found
+        ip.run_cell("NoHTML._repr_html_ = lambda self: 'class html'")
+        nt.assert_equal(f(ip.user_ns['obj']), 'class html')
+    finally:
+        f.enabled = enabled
+        ip.run_cell('del NoHTML, obj')
@@ -451,6 +451,25 @@ def test_syntax_multiline_cell(self):
                 # Match ignoring trailing whitespace
                 self.assertEqual(out.rstrip(), out_t.rstrip())
     
+    def test_transform_cell_matches_push(self):
+        isp = self.isp
+        cells = [ '\n'.join(r for r, _ in line_pairs if r is not None)
+                  for example in syntax_ml.values() for line_pairs in example ]
+        cells.extend([
+            "",
+            "x = 1\n\n\ny = 2",
+            "a = (1,\n     2)\nb = !ls\n",
+            "for i in range(3):\n    %time i\n",
+            "x = '''\n%notamagic\n'''",
+            "%%cellm a\nline1\n\nline2\n",
+        ])
+        for cell in cells:
+            isp.push(cell)
+            isp.flush_transformers()
+            expected = isp.source
+            isp.reset()
+            self.assertEqual(isp.transform_cell(cell), expected)
+
     def test_cellmagic_preempt(self):
         isp = self.isp
         for raw, name, line, cell in [
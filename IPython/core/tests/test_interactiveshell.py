@@ -462,6 +462,42 @@ def test_future_environment(self):
         ip.run_cell("d = 1/2", shell_futures=True)
         self.assertEqual(ip.user_ns['d'], 0)
 
+    def test_compile_cache(self):
+        "Running the same cell again reuses its compiled code"
+        cell = "compile_cache_x = compile_cache_x + 1 if 'compile_cache_x' in dir() else 1"
+        ip.run_cell(cell)
+        parse = ip.compile.ast_parse
+        def fail_parse(*args, **kwargs):
+            raise AssertionError("cell parsed again")
+        ip.compile.ast_parse = fail_parse
+        try:
+            ip.run_cell(cell)
+        finally:
+            ip.compile.ast_parse = parse
+        self.assertEqual(ip.user_ns['compile_cache_x'], 2)
+
+    def test_compile_cache_future_flags(self):
+        "The __future__ flags set by a cached cell are restored"
+        cell = "from __future__ import division"
+        try:
+            ip.run_cell(cell)
+            ip.compile.reset_compiler_flags()
+            ip.run_cell(cell)
+            ip.run_cell("compile_cache_div = 1/2")
+            self.assertEqual(ip.user_ns['compile_cache_div'], 0.5)
+        finally:
+            ip.compile.reset_compiler_flags()
+
+    def test_compile_cache_size(self):
+        size = ip.compile_cache_size
+        ip.compile_cache_size = 2
+        try:
+            for i in range(4):
+                ip.run_cell("compile_cache_y = %i" % i)
+            self.assertEqual(len(ip._compile_cache), 2)
+        finally:
+            ip.compile_cache_size = size
+
     def test_mktempfile(self):
         filename = ip.mktempfile()
         # Check that we can open the file again on Windows
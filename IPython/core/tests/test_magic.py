@@ -297,6 +297,39 @@ def test_numpy_reset_array_undec():
     _ip.magic('reset -f array')
     nt.assert_not_in('a', _ip.user_ns)
 
+def test_outcache():
+    "Test %outcache and the limits of the output cache"
+    dh = _ip.displayhook
+    _ip.magic('reset -f out')
+    class Big(object):
+        nbytes = 10000
+    try:
+        dh.cache_max_bytes = 25000
+        dh.cache_weakrefs = True
+        _ip.user_ns['Big'] = Big
+        _ip.run_cell("big = Big()", store_history=True)
+        with capture_output():
+            for i in range(3):
+                _ip.run_cell("big if %i == 0 else Big()" % i, store_history=True)
+        # the oldest output was dropped, to stay within 25000 bytes
+        nt.assert_equal(len(_ip.user_ns['Out']), 2)
+        nt.assert_equal(dh.cached_bytes, 20000)
+        first = _ip.execution_count - 3
+        nt.assert_not_in(first, _ip.user_ns['Out'])
+        nt.assert_not_in('_%i' % first, _ip.user_ns)
+        with capture_output() as captured:
+            _ip.magic('outcache')
+        nt.assert_in('2 outputs, 19.5 kB (limit: 1000 outputs, 24.4 kB)',
+                     captured.stdout)
+        # big is still alive
+        nt.assert_in('still referenced', captured.stdout)
+    finally:
+        dh.cache_max_bytes = 0
+        dh.cache_weakrefs = False
+        _ip.magic('reset -f out')
+        _ip.user_ns.pop('big', None)
+        _ip.user_ns.pop('Big', None)
+
 def test_reset_out():
     "Test '%reset out' magic"
     _ip.run_cell("parrot = 'dead'", store_history=True)
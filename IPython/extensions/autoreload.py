@@ -48,6 +48,10 @@
     Reload all modules (except those excluded by ``%aimport``) every
     time before executing the Python code typed.
 
+``%autoreload stats``
+
+    Show how files are checked for changes, and the time it takes.
+
 ``%aimport``
 
     List modules which are to be automatically imported or not to be imported.
@@ -86,6 +90,16 @@
   before it is reloaded are not upgraded.
 
 - C extension modules cannot be reloaded, and so cannot be autoreloaded.
+
+Change detection
+================
+
+On Linux, the directories of the modules are watched with inotify, and only
+the files reported as changed are checked before running code. Elsewhere,
+or if inotify is not available, the modification time of every module is
+checked. ``%autoreload stats`` shows the time spent checking for changes.
+Changes made on another host to files on a network filesystem are not reported
+by inotify; use ``%autoreload`` to check every module explicitly.
 """
 from __future__ import print_function
 
@@ -107,8 +121,11 @@
 # Imports
 #-----------------------------------------------------------------------------
 
+import errno
 import os
+import struct
 import sys
+import time
 import traceback
 import types
 import weakref
@@ -122,6 +139,168 @@
 from IPython.utils import openpy
 from IPython.utils.py3compat import PY3
 
+#------------------------------------------------------------------------------
+# Change detection
+#------------------------------------------------------------------------------
+
+class PollingWatcher(object):
+    """Report every file as possibly changed, to be checked with os.stat"""
+
+    name = 'polling'
+
+    def changed(self, filenames):
+        """Return the subset of filenames which may have changed.
+
+        Files that are not watched yet are always returned, and are watched
+        from then on.
+        """
+        return set(filenames)
+
+    def close(self):
+        pass
+
+
+# inotify flags, from <sys/inotify.h>
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x1000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+_inotify_event = struct.Struct('iIII')
+
+
+class InotifyWatcher(object):
+    """Watch the directories of files with Linux's inotify.
+
+    Files are reported as changed when an event was received for them,
+    or when their directory could not be watched.
+    """
+
+    name = 'inotify'
+    mask = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE |
+            IN_ONLYDIR)
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._get_errno = ctypes.get_errno
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # {directory: watch descriptor or None if it couldn't be watched}
+        self._watches = {}
+        # {watch descriptor: {basename: set(filenames)}}
+        self._files = {}
+        # the files watched, and those reported as changed
+        self._watched = set()
+        self._dirty = set()
+        self._overflow = False
+
+    def _watch(self, filename):
+        directory, basename = os.path.split(filename)
+        directory = directory or os.curdir
+        try:
+            wd = self._watches[directory]
+        except KeyError:
+            path = directory
+            if not isinstance(path, bytes):
+                path = path.encode(sys.getfilesystemencoding())
+            wd = self._add_watch(self.fd, path, self.mask)
+            if wd < 0:
+                wd = None
+            self._watches[directory] = wd
+        if wd is None:
+            return False
+        self._files.setdefault(wd, {}).setdefault(basename, set()).add(filename)
+        self._watched.add(filename)
+        return True
+
+    def _read_events(self):
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EINTR):
+                    return
+                raise
+            if not data:
+                return
+            pos = 0
+            while pos < len(data):
+                wd, mask, cookie, length = _inotify_event.unpack_from(data, pos)
+                pos += _inotify_event.size
+                name = data[pos:pos + length].rstrip(b'\0')
+                pos += length
+                if mask & IN_Q_OVERFLOW:
+                    self._overflow = True
+                elif mask & IN_IGNORED:
+                    # the directory was removed: check its files from now on
+                    for filenames in self._files.pop(wd, {}).values():
+                        self._dirty.update(filenames)
+                        self._watched.difference_update(filenames)
+                    for directory, w in list(self._watches.items()):
+                        if w == wd:
+                            del self._watches[directory]
+                else:
+                    files = self._files.get(wd, {})
+                    if not isinstance(name, str):
+                        name = name.decode(sys.getfilesystemencoding(), 'replace')
+                    self._dirty.update(files.get(name, ()))
+
+    def changed(self, filenames):
+        """Return the subset of filenames which may have changed.
+
+        Files that are not watched yet are always returned, and are watched
+        from then on. The other files are returned if a change was reported
+        since the last time they were returned.
+        """
+        self._read_events()
+        changed = set()
+        for filename in filenames:
+            if filename not in self._watched:
+                self._watch(filename)
+                changed.add(filename)
+        if self._overflow:
+            self._overflow = False
+            self._dirty.update(self._watched)
+        for filename in self._dirty.intersection(filenames):
+            self._dirty.discard(filename)
+            changed.add(filename)
+        # files whose directory couldn't be watched
+        changed.update(f for f in filenames if f not in self._watched)
+        return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def default_watcher():
+    """Return an InotifyWatcher if possible, or a PollingWatcher"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher()
+        except Exception:
+            pass
+    return PollingWatcher()
+
 #------------------------------------------------------------------------------
 # Autoreload functionality
 #------------------------------------------------------------------------------
@@ -133,7 +312,7 @@ class ModuleReloader(object):
     check_all = True
     """Autoreload all modules, not just those listed in 'modules'"""
 
-    def __init__(self):
+    def __init__(self, watcher=None):
         # Modules that failed to reload: {module: mtime-on-failed-reload, ...}
         self.failed = {}
         # Modules specially marked as autoreloadable.
@@ -144,6 +323,17 @@ def __init__(self):
         self.old_objects = {}
         # Module modification timestamps
         self.modules_mtimes = {}
+        # {module.__file__: source filename or None}
+        self._source_filenames = {}
+
+        # Detects which files need to be checked
+        if watcher is None:
+            watcher = default_watcher()
+        self.watcher = watcher
+
+        # Statistics of the checks: number of checks and files stat'ed,
+        # total and last duration of a check
+        self.stats = dict(checks=0, stats=0, total_time=0., last_time=0.)
 
         # Cache module modification times
         self.check(check_all=True, do_reload=False)
@@ -182,15 +372,17 @@ def aimport_module(self, module_name):
         top_module = sys.modules[top_name]
         return top_module, top_name
 
-    def filename_and_mtime(self, module):
-        if not hasattr(module, '__file__'):
-            return None, None
-
-        if module.__name__ == '__main__':
+    def source_filename(self, module):
+        """Return the .py file of a module, or None"""
+        filename = getattr(module, '__file__', None)
+        if not filename or module.__name__ == '__main__':
             # we cannot reload(__main__)
-            return None, None
+            return None
+        try:
+            return self._source_filenames[filename]
+        except KeyError:
+            pass
 
-        filename = module.__file__
         path, ext = os.path.splitext(filename)
 
         if ext.lower() == '.py':
@@ -199,8 +391,17 @@ def filename_and_mtime(self, module):
             try:
                 py_filename = openpy.source_from_cache(filename)
             except ValueError:
-                return None, None
+                py_filename = None
+        self._source_filenames[filename] = py_filename
+        return py_filename
 
+    def filename_and_mtime(self, module):
+        py_filename = self.source_filename(module)
+        if py_filename is None:
+            return None, None
+
+        self.watcher.changed([py_filename])
+        self.stats['stats'] += 1
         try:
             pymtime = os.stat(py_filename).st_mtime
         except OSError:
@@ -208,25 +409,46 @@ def filename_and_mtime(self, module):
 
         return py_filename, pymtime
 
-    def check(self, check_all=False, do_reload=True):
-        """Check whether some modules need to be reloaded."""
+    def check(self, check_all=False, do_reload=True, force=False):
+        """Check whether some modules need to be reloaded.
+
+        If force is True, the modification time of every module is checked,
+        including the files that the watcher didn't report as changed.
+        """
 
         if not self.enabled and not check_all:
             return
 
+        start = time.time()
         if check_all or self.check_all:
             modules = list(sys.modules.keys())
         else:
             modules = list(self.modules.keys())
 
+        candidates = []
         for modname in modules:
             m = sys.modules.get(modname, None)
 
             if modname in self.skip_modules:
                 continue
 
-            py_filename, pymtime = self.filename_and_mtime(m)
-            if py_filename is None:
+            py_filename = self.source_filename(m)
+            if py_filename is not None:
+                candidates.append((modname, m, py_filename))
+
+        # only stat the files which may have changed, and the new ones
+        changed = self.watcher.changed([c[2] for c in candidates])
+        if force:
+            changed = set(c[2] for c in candidates)
+
+        for modname, m, py_filename in candidates:
+            if py_filename not in changed and modname in self.modules_mtimes:
+                continue
+
+            self.stats['stats'] += 1
+            try:
+                pymtime = os.stat(py_filename).st_mtime
+            except OSError:
                 continue
 
             try:
@@ -252,6 +474,11 @@ def check(self, check_all=False, do_reload=True):
                             modname, traceback.format_exc(1)), file=sys.stderr)
                     self.failed[py_filename] = pymtime
 
+        elapsed = time.time() - start
+        self.stats['checks'] += 1
+        self.stats['total_time'] += elapsed
+        self.stats['last_time'] = elapsed
+
 #------------------------------------------------------------------------------
 # superreload
 #------------------------------------------------------------------------------
@@ -439,6 +666,9 @@ def autoreload(self, parameter_s=''):
         Reload all modules (except those excluded by %aimport) every time
         before executing the Python code typed.
 
+        %autoreload stats
+        Show how files are checked for changes, and the time it takes.
+
         Reloading Python modules in a reliable way is in general
         difficult, and unexpected things may occur. %autoreload tries to
         work around common pitfalls by replacing function code objects and
@@ -466,7 +696,7 @@ def autoreload(self, parameter_s=''):
 
         """
         if parameter_s == '':
-            self._reloader.check(True)
+            self._reloader.check(True, force=True)
         elif parameter_s == '0':
             self._reloader.enabled = False
         elif parameter_s == '1':
@@ -475,6 +705,14 @@ def autoreload(self, parameter_s=''):
         elif parameter_s == '2':
             self._reloader.check_all = True
             self._reloader.enabled = True
+        elif parameter_s == 'stats':
+            stats = self._reloader.stats
+            print("Changes detected by: %s" % self._reloader.watcher.name)
+            print("Last check: %.1f ms" % (1e3 * stats['last_time']))
+            if stats['checks']:
+                print("Average check: %.1f ms over %i checks, %i files stat'ed"
+                      % (1e3 * stats['total_time'] / stats['checks'],
+                         stats['checks'], stats['stats']))
 
     @line_magic
     def aimport(self, parameter_s='', stream=None):
@@ -21,8 +21,10 @@
 
 import nose.tools as nt
 import IPython.testing.tools as tt
+from IPython.testing import decorators as dec
 
-from IPython.extensions.autoreload import AutoreloadMagics
+from IPython.extensions.autoreload import (AutoreloadMagics, PollingWatcher,
+                                           InotifyWatcher)
 from IPython.core.events import EventManager, pre_run_cell
 from IPython.utils.py3compat import PY3
 
@@ -319,3 +321,57 @@ def test_smoketest_aimport(self):
 
     def test_smoketest_autoreload(self):
         self._check_smoketest(use_aimport=False)
+
+
+class SilentWatcher(PollingWatcher):
+    """A watcher missing every change, like inotify on a network filesystem"""
+
+    name = 'silent'
+
+    def changed(self, filenames):
+        return set()
+
+
+class TestWatchers(Fixture):
+
+    def test_polling_watcher(self):
+        watcher = PollingWatcher()
+        nt.assert_equal(watcher.changed(['a.py']), set(['a.py']))
+        nt.assert_equal(watcher.changed(['a.py']), set(['a.py']))
+
+    @dec.skip_without('ctypes')
+    @dec.onlyif(sys.platform.startswith('linux'), "inotify is Linux only")
+    def test_inotify_watcher(self):
+        watcher = InotifyWatcher()
+        mod_name, mod_fn = self.new_module("x = 1\n")
+        other_name, other_fn = self.new_module("x = 1\n")
+        try:
+            nt.assert_equal(watcher.changed([mod_fn, other_fn]),
+                            set([mod_fn, other_fn]))
+            nt.assert_equal(watcher.changed([mod_fn, other_fn]), set())
+            self.write_file(mod_fn, "x = 2\n")
+            # changes of files that aren't asked about are kept
+            nt.assert_equal(watcher.changed([other_fn]), set())
+            nt.assert_equal(watcher.changed([mod_fn, other_fn]), set([mod_fn]))
+            nt.assert_equal(watcher.changed([mod_fn, other_fn]), set())
+        finally:
+            watcher.close()
+
+    def test_explicit_check_ignores_watcher(self):
+        """%autoreload stats every module, even if the watcher missed changes"""
+        mod_name, mod_fn = self.new_module("x = 1\n")
+        self.shell.run_code("import %s" % mod_name)
+        self.shell.magic_autoreload("2")
+        self.shell.run_code("pass")
+        self.shell.auto_magics._reloader.watcher = SilentWatcher()
+        self.write_file(mod_fn, "x = 2\n")
+        self.shell.run_code("pass")
+        nt.assert_equal(sys.modules[mod_name].x, 1)
+        self.shell.magic_autoreload("")
+        nt.assert_equal(sys.modules[mod_name].x, 2)
+
+    def test_stats(self):
+        self.shell.magic_autoreload("2")
+        self.shell.run_code("pass")
+        with tt.AssertPrints("Average check:"):
+            self.shell.magic_autoreload("stats")
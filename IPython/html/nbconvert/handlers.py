@@ -3,11 +3,17 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import hashlib
 import io
+import json
 import os
+import signal
+import time
 import zipfile
+from collections import OrderedDict
 
-from tornado import web
+from tornado import stack_context, web
+from zmq.eventloop import ioloop
 
 from ..base.handlers import (
     IPythonHandler, FilesRedirectHandler,
@@ -71,25 +77,165 @@ def get_exporter(format, **kwargs):
     except Exception as e:
         raise web.HTTPError(500, "Could not construct Exporter: %s" % e)
 
-class NbconvertFileHandler(IPythonHandler):
+# Exporters are reused across conversions, keyed by format and config hash.
+# Each nbconvert worker process has its own.
+_exporters = {}
+
+def config_hash(config):
+    """hash a config object, for use in cache keys"""
+    s = json.dumps(config, sort_keys=True, default=repr)
+    return hashlib.sha1(s.encode('utf-8')).hexdigest()
+
+def get_cached_exporter(format, config):
+    """get an exporter for format and config, reusing a previous instance"""
+    key = (format, config_hash(config))
+    if key not in _exporters:
+        _exporters[key] = get_exporter(format, config=config)
+    return _exporters[key]
+
+def convert_notebook(format, config, nb):
+    """Convert a notebook with a cached exporter
+
+    This is run in the nbconvert worker processes, so errors are returned
+    rather than raised.
+
+    Returns
+    -------
+    error : (int, str) or None
+        HTTP status code and message, if the conversion failed
+    result : (str, dict, str) or None
+        The output, resources and mimetype of the conversion
+    """
+    try:
+        exporter = get_cached_exporter(format, config)
+    except web.HTTPError as e:
+        return (e.status_code, e.log_message), None
+    try:
+        output, resources = exporter.from_notebook_node(nb)
+    except Exception as e:
+        return (500, "nbconvert failed: %s" % e), None
+    return None, (output, dict(resources), exporter.output_mimetype)
+
+def apply_in_pool(pool, args, callback, timeout=None, loop=None):
+    """Run convert_notebook(*args) in pool, and call callback(error, result)
+    on the IOLoop
+
+    The pool only reports successful results, so the result is also polled
+    from the IOLoop: if the conversion raises, its result can't be sent
+    back, or it doesn't finish within timeout seconds (e.g. because its
+    worker was killed), callback is called with a 500 error.
+    There is no timeout if timeout is 0 or None.
+    """
+    if loop is None:
+        loop = ioloop.IOLoop.instance()
+    deadline = time.time() + timeout if timeout else None
+    done = []
+
+    def finish(error, result):
+        if not done:
+            done.append(True)
+            callback(error, result)
+
+    def poll():
+        if done:
+            return
+        if async_result.ready():
+            try:
+                reply = async_result.get(0)
+            except Exception as e:
+                reply = (500, "nbconvert failed: %s" % e), None
+            finish(*reply)
+        elif deadline is not None and time.time() >= deadline:
+            finish((500, "nbconvert timed out after %ss" % timeout), None)
+        else:
+            loop.add_timeout(time.time() + _poll_interval, poll)
+
+    async_result = pool.apply_async(convert_notebook, args,
+        # called in the pool's result thread, on success
+        callback=lambda reply: loop.add_callback(finish, *reply),
+    )
+    loop.add_timeout(time.time() + _poll_interval, poll)
+
+# how often the results of conversions in the worker pool are polled
+_poll_interval = 1
+
+def init_worker():
+    """initialize an nbconvert worker process
+
+    ^C is handled by the notebook server, workers are stopped with it.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+# The most recent conversions of notebook files, keyed by path, name,
+# modification time, format and config hash.
+_conversion_cache = OrderedDict()
+_conversion_cache_size = 16
+
+class NbconvertHandler(IPythonHandler):
+    """Base class for handlers that convert notebooks"""
+
+    def convert(self, format, nb, callback):
+        """Convert a notebook, and call callback(error, result) with the result
+
+        If there are nbconvert worker processes, the conversion is run there,
+        and callback is called later on the IOLoop.
+        """
+        pool = self.settings.get('nbconvert_pool')
+        if pool is None:
+            callback(*convert_notebook(format, self.config, nb))
+            return
+        # wrap, so errors are handled in the context of this request
+        callback = stack_context.wrap(callback)
+        apply_in_pool(pool, (format, self.config, nb), callback,
+                      timeout=self.settings.get('nbconvert_timeout'))
+
+
+class NbconvertFileHandler(NbconvertHandler):
 
     SUPPORTED_METHODS = ('GET',)
-    
+
     @web.authenticated
+    @web.asynchronous
     def get(self, format, path='', name=None):
-        
-        exporter = get_exporter(format, config=self.config, log=self.log)
-        
-        path = path.strip('/')
-        model = self.contents_manager.get_model(name=name, path=path)
+        """Convert a notebook file
 
+        Conversions are run in the nbconvert worker processes, if there are
+        any, and cached until the notebook is modified.
+        """
+        path = path.strip('/')
+        cm = self.contents_manager
+        model = cm.get_model(name=name, path=path, content=False)
         self.set_header('Last-Modified', model['last_modified'])
-        
-        try:
-            output, resources = exporter.from_notebook_node(model['content'])
-        except Exception as e:
-            raise web.HTTPError(500, "nbconvert failed: %s" % e)
 
+        key = (path, name, model['last_modified'], format, config_hash(self.config))
+        etag = '"%s"' % hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        self.set_header('Etag', etag)
+        if etag in self.request.headers.get('If-None-Match', ''):
+            self.set_status(304)
+            self.finish()
+            return
+
+        if key in _conversion_cache:
+            self.log.debug("Using cached conversion of %s/%s to %s", path, name, format)
+            self._finish_conversion(name, key, None, _conversion_cache[key])
+            return
+
+        nb = cm.get_model(name=name, path=path)['content']
+        self.convert(format, nb,
+            lambda error, result: self._finish_conversion(name, key, error, result)
+        )
+
+    def _finish_conversion(self, name, key, error, result):
+        """Respond with the result of a conversion, and cache it"""
+        if error is not None:
+            raise web.HTTPError(*error)
+
+        _conversion_cache.pop(key, None)
+        _conversion_cache[key] = result
+        while len(_conversion_cache) > _conversion_cache_size:
+            _conversion_cache.popitem(last=False)
+
+        output, resources, mimetype = result
         if respond_zip(self, name, output, resources):
             return
 
@@ -100,34 +246,37 @@ def get(self, format, path='', name=None):
                                'attachment; filename="%s"' % filename)
 
         # MIME type
-        if exporter.output_mimetype:
+        if mimetype:
             self.set_header('Content-Type',
-                            '%s; charset=utf-8' % exporter.output_mimetype)
+                            '%s; charset=utf-8' % mimetype)
 
         self.finish(output)
 
-class NbconvertPostHandler(IPythonHandler):
+class NbconvertPostHandler(NbconvertHandler):
     SUPPORTED_METHODS = ('POST',)
 
-    @web.authenticated 
+    @web.authenticated
+    @web.asynchronous
     def post(self, format):
-        exporter = get_exporter(format, config=self.config)
-        
         model = self.get_json_body()
         nbnode = to_notebook_json(model['content'])
-        
-        try:
-            output, resources = exporter.from_notebook_node(nbnode)
-        except Exception as e:
-            raise web.HTTPError(500, "nbconvert failed: %s" % e)
+        self.convert(format, nbnode,
+            lambda error, result: self._finish_conversion(nbnode, error, result)
+        )
+
+    def _finish_conversion(self, nbnode, error, result):
+        """Respond with the result of a conversion"""
+        if error is not None:
+            raise web.HTTPError(*error)
 
+        output, resources, mimetype = result
         if respond_zip(self, nbnode.metadata.name, output, resources):
             return
 
         # MIME type
-        if exporter.output_mimetype:
+        if mimetype:
             self.set_header('Content-Type',
-                            '%s; charset=utf-8' % exporter.output_mimetype)
+                            '%s; charset=utf-8' % mimetype)
 
         self.finish(output)
 
@@ -22,17 +22,17 @@ class NbconvertAPI(object):
     def __init__(self, base_url):
         self.base_url = base_url
 
-    def _req(self, verb, path, body=None, params=None):
+    def _req(self, verb, path, body=None, params=None, headers=None):
         response = requests.request(verb,
                 url_path_join(self.base_url, 'nbconvert', path),
-                data=body, params=params,
+                data=body, params=params, headers=headers,
         )
         response.raise_for_status()
         return response
 
-    def from_file(self, format, path, name, download=False):
+    def from_file(self, format, path, name, download=False, headers=None):
         return self._req('GET', url_path_join(format, path, name),
-                         params={'download':download})
+                         params={'download':download}, headers=headers)
 
     def from_post(self, format, nbmodel):
         body = json.dumps(nbmodel)
@@ -86,6 +86,31 @@ def test_from_file(self):
         self.assertIn(u'text/x-python', r.headers['Content-Type'])
         self.assertIn(u'print(2*6)', r.text)
 
+    def test_from_file_etag(self):
+        r = self.nbconvert_api.from_file('python', 'foo', 'testnb.ipynb')
+        etag = r.headers['Etag']
+        r2 = self.nbconvert_api.from_file('python', 'foo', 'testnb.ipynb',
+                                          headers={'If-None-Match': etag})
+        self.assertEqual(r2.status_code, 304)
+
+        # cached conversions are served with the same etag
+        r3 = self.nbconvert_api.from_file('python', 'foo', 'testnb.ipynb')
+        self.assertEqual(r3.headers['Etag'], etag)
+        self.assertEqual(r3.text, r.text)
+
+        # modifying the notebook invalidates the conversion
+        nbpath = pjoin(self.notebook_dir.name, 'foo', 'testnb.ipynb')
+        st = os.stat(nbpath)
+        os.utime(nbpath, (st.st_atime, st.st_mtime + 10))
+        r4 = self.nbconvert_api.from_file('python', 'foo', 'testnb.ipynb',
+                                          headers={'If-None-Match': etag})
+        self.assertEqual(r4.status_code, 200)
+        self.assertNotEqual(r4.headers['Etag'], etag)
+
+    def test_from_file_bad_format(self):
+        with assert_http_error(404):
+            self.nbconvert_api.from_file('nosuchformat', 'foo', 'testnb.ipynb')
+
     @onlyif_cmds_exist('pandoc')
     def test_from_file_404(self):
         with assert_http_error(404):
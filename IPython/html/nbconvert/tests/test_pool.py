@@ -0,0 +1,72 @@
+"""Tests for converting notebooks in a worker pool"""
+
+# Copyright (c) IPython Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import time
+from multiprocessing.pool import ThreadPool
+
+import nose.tools as nt
+from zmq.eventloop import ioloop
+
+from .. import handlers
+
+
+def failing_conversion(format, config, nb):
+    raise ValueError("worker failed")
+
+def slow_conversion(format, config, nb):
+    time.sleep(2)
+    return None, (u'', {}, 'text/plain')
+
+def conversion(format, config, nb):
+    return None, (u'converted', {}, 'text/plain')
+
+
+def apply_in_pool(convert, timeout=None):
+    """Run convert in a thread pool, returning what it calls back with"""
+    # tornado >= 4 makes a new loop current, restore the current one after
+    current = ioloop.IOLoop.current()
+    loop = ioloop.IOLoop()
+    pool = ThreadPool(1)
+    replies = []
+    def callback(error, result):
+        replies.append((error, result))
+        loop.stop()
+    save_convert = handlers.convert_notebook
+    save_interval = handlers._poll_interval
+    handlers.convert_notebook = convert
+    handlers._poll_interval = 0.05
+    try:
+        handlers.apply_in_pool(pool, ('html', {}, {}), callback,
+                               timeout=timeout, loop=loop)
+        loop.add_timeout(time.time() + 5, loop.stop)
+        loop.start()
+    finally:
+        handlers.convert_notebook = save_convert
+        handlers._poll_interval = save_interval
+        pool.terminate()
+        current.make_current()
+        loop.close(all_fds=True)
+    return replies
+
+
+def test_apply_in_pool():
+    replies = apply_in_pool(conversion)
+    nt.assert_equal(replies, [(None, (u'converted', {}, 'text/plain'))])
+
+def test_apply_in_pool_error():
+    """Does a failing worker finish the request with a 500?"""
+    replies = apply_in_pool(failing_conversion)
+    nt.assert_equal(len(replies), 1)
+    error, result = replies[0]
+    nt.assert_equal(error[0], 500)
+    nt.assert_in("worker failed", error[1])
+    nt.assert_is_none(result)
+
+def test_apply_in_pool_timeout():
+    replies = apply_in_pool(slow_conversion, timeout=0.2)
+    nt.assert_equal(len(replies), 1)
+    error, result = replies[0]
+    nt.assert_equal(error[0], 500)
+    nt.assert_in("timed out", error[1])
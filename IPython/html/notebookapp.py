@@ -11,6 +11,7 @@
 import io
 import json
 import logging
+import multiprocessing
 import os
 import random
 import re
@@ -176,6 +177,8 @@ def init_settings(self, ipython_app, kernel_manager, contents_manager,
             mathjax_url=ipython_app.mathjax_url,
             config=ipython_app.config,
             jinja2_env=env,
+            nbconvert_pool=ipython_app.nbconvert_pool,
+            nbconvert_timeout=ipython_app.nbconvert_timeout,
         )
 
         # allow custom overrides for the tornado web app.
@@ -462,6 +465,23 @@ def _write_cookie_secret_file(self, secret):
     jinja_environment_options = Dict(config=True, 
             help="Supply extra arguments that will be passed to Jinja environment.")
 
+    nbconvert_processes = Integer(1, config=True,
+        help="""The number of worker processes used to convert notebooks
+        for the /nbconvert/ URLs, so that conversions don't block the server.
+
+        Set to 0 to convert notebooks in the server process.
+        """
+    )
+
+    nbconvert_timeout = Integer(300, config=True,
+        help="""The time in seconds after which a conversion in the
+        nbconvert worker processes fails, e.g. if its worker was killed.
+        Set to 0 to wait for conversions without a timeout.
+        """
+    )
+
+    nbconvert_pool = Instance('multiprocessing.pool.Pool')
+
     
     enable_mathjax = Bool(True, config=True,
         help="""Whether to enable MathJax for typesetting math/TeX
@@ -670,6 +690,21 @@ def init_configurables(self):
         self.cluster_manager = kls(parent=self, log=self.log)
         self.cluster_manager.update_profiles()
 
+    def init_nbconvert_pool(self):
+        """start the worker processes for nbconvert"""
+        if self.nbconvert_processes > 0:
+            from .nbconvert.handlers import init_worker
+            self.nbconvert_pool = multiprocessing.Pool(
+                self.nbconvert_processes, initializer=init_worker,
+            )
+
+    def cleanup_nbconvert_pool(self):
+        """stop the nbconvert worker processes"""
+        if self.nbconvert_pool is not None:
+            self.log.info('Stopping nbconvert workers')
+            self.nbconvert_pool.terminate()
+            self.nbconvert_pool = None
+
     def init_logging(self):
         # This prevents double log messages because tornado use a root logger that
         # self.log is a child of. The logging module dipatches log messages to a log
@@ -826,6 +861,7 @@ def initialize(self, argv=None):
         self.init_kernel_argv()
         self.init_configurables()
         self.init_components()
+        self.init_nbconvert_pool()
         self.init_webapp()
         self.init_signal()
 
@@ -912,6 +948,7 @@ def start(self):
             info("Interrupted...")
         finally:
             self.cleanup_kernels()
+            self.cleanup_nbconvert_pool()
             self.remove_server_info_file()
 
 
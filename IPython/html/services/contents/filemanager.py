@@ -4,20 +4,56 @@
 # Distributed under the terms of the Modified BSD License.
 
 import base64
+import hashlib
 import io
+import json
 import os
-import glob
 import shutil
+import stat
+import time
+from collections import OrderedDict
 
 from tornado import web
 
 from .manager import ContentsManager
 from IPython.nbformat import current
-from IPython.utils.path import ensure_dir_exists
-from IPython.utils.traitlets import Unicode, Bool, TraitError
-from IPython.utils.py3compat import getcwd
+from IPython.utils.path import ensure_dir_exists, link_or_copy
+from IPython.utils.traitlets import Unicode, Bool, Integer, Instance, TraitError
+from IPython.utils.py3compat import getcwd, unicode_type
 from IPython.utils import tz
-from IPython.html.utils import is_hidden, to_os_path, url_path_join
+from IPython.html.utils import (
+    is_hidden, is_file_hidden, to_os_path, url_path_join,
+)
+
+
+# output keys which may be moved to the output store
+_offload_keys = ['text', 'html', 'svg', 'latex', 'javascript', 'json', 'png', 'jpeg']
+
+# output metadata key recording the digests of stored output data
+_offload_metadata_key = 'ipython_stored_outputs'
+# output metadata key marking metadata added only to record those digests
+_offload_created_metadata_key = 'ipython_stored_outputs_metadata'
+
+
+def _iter_outputs(nb):
+    """iterate over the outputs of all code cells in a notebook"""
+    for ws in nb.get('worksheets', []):
+        for cell in ws.get('cells', []):
+            if cell.get('cell_type') == 'code':
+                for output in cell.get('outputs', []):
+                    yield output
+
+
+class _DigestingWriter(object):
+    """A file wrapper, updating a digest with the text written to it"""
+
+    def __init__(self, f, digest):
+        self.f = f
+        self.digest = digest
+
+    def write(self, s):
+        self.digest.update(s.encode('utf-8'))
+        return self.f.write(s)
 
 
 class FileContentsManager(ContentsManager):
@@ -49,6 +85,49 @@ def _root_dir_changed(self, name, old, new):
         """
     )
 
+    output_store_threshold = Integer(0, config=True,
+        help="""The size, in characters, above which output data is stored
+        outside of the notebook file.
+
+        Large outputs (images, long text) are moved to a content-addressed
+        store next to the notebook (see output_store_dir), and the notebook
+        file only references them, so saving a notebook doesn't rewrite
+        outputs that haven't changed. Notebooks saved this way depend on
+        the store, and tools reading the .ipynb file directly won't see
+        the stored outputs.
+        Set to 0 (the default) to keep all outputs in the notebook file.
+        """
+    )
+
+    output_store_dir = Unicode('.ipynb_outputs', config=True,
+        help="""The directory name in which to store large output data
+
+        This is a path relative to the notebook's own directory.
+        Stored data may be shared by the notebooks of a directory, so it is
+        not removed when a notebook is deleted or moved to another directory.
+
+        By default, it is .ipynb_outputs
+        """
+    )
+
+    dir_cache_size = Integer(100, config=True,
+        help="""The number of directory listings to keep in memory.
+
+        Cached listings are reused as long as the directory's mtime is
+        unchanged (and at least two seconds old, for filesystems with coarse
+        mtimes), and are dropped when a file in the directory is saved,
+        renamed or deleted through the contents manager.
+        Set to 0 to disable caching of directory listings.
+        """
+    )
+
+    # {os_path: (mtime, trusted, [models])}, in least recently used order
+    _dir_cache = Instance(OrderedDict, ())
+    # Listings taken within this many seconds of the last modification of
+    # their directory aren't trusted, as the directory may have been modified
+    # again without changing its (coarse) modification time.
+    _dir_cache_racy_interval = 2.0
+
     def _copy(self, src, dest):
         """copy src to dest
 
@@ -60,6 +139,94 @@ def _copy(self, src, dest):
         except OSError as e:
             self.log.debug("copystat on %s failed", dest, exc_info=True)
 
+    def _get_output_store_path(self, digest, path=''):
+        """find the path to a blob in the output store"""
+        os_path = self._get_os_path(path=path)
+        return os.path.join(os_path, self.output_store_dir, digest)
+
+    def _offload_outputs(self, nb, path=''):
+        """Move large output data from nb to the output store
+
+        Each offloaded key is removed from its output, and its digest recorded
+        in the output's metadata. Blobs already in the store are not rewritten.
+        """
+        threshold = self.output_store_threshold
+        for output in _iter_outputs(nb):
+            refs = {}
+            for key in _offload_keys:
+                value = output.get(key)
+                if not isinstance(value, unicode_type) or len(value) <= threshold:
+                    continue
+                data = value.encode('utf-8')
+                digest = hashlib.sha256(data).hexdigest()
+                blob_path = self._get_output_store_path(digest, path)
+                if not os.path.exists(blob_path):
+                    ensure_dir_exists(os.path.dirname(blob_path))
+                    tmp_path = blob_path + '.tmp'
+                    with io.open(tmp_path, 'wb') as f:
+                        f.write(data)
+                    os.rename(tmp_path, blob_path)
+                refs[key] = digest
+                del output[key]
+            if refs:
+                if 'metadata' not in output:
+                    # remember to remove it again on restore,
+                    # so that the notebook's signature still matches
+                    output['metadata'] = {_offload_created_metadata_key: True}
+                output['metadata'][_offload_metadata_key] = refs
+
+    def _stored_output_digests(self, os_path):
+        """The digests of the output data a notebook file has in the store"""
+        try:
+            with io.open(os_path, encoding='utf-8') as f:
+                nb = json.load(f)
+        except (IOError, OSError, ValueError):
+            return set()
+        digests = set()
+        for output in _iter_outputs(nb):
+            refs = output.get('metadata', {}).get(_offload_metadata_key)
+            if refs:
+                digests.update(refs.values())
+        return digests
+
+    def _copy_stored_outputs(self, digests, old_path, new_path):
+        """Make stored output data available in the store of another directory
+
+        Blobs never change once stored, so they are hard-linked where possible.
+        """
+        for digest in digests:
+            src = self._get_output_store_path(digest, old_path)
+            dest = self._get_output_store_path(digest, new_path)
+            if os.path.exists(dest) or not os.path.isfile(src):
+                continue
+            ensure_dir_exists(os.path.dirname(dest))
+            self.log.debug("Copying stored output %s -> %s", src, dest)
+            link_or_copy(src, dest)
+
+    def _restore_outputs(self, nb, path=''):
+        """Restore output data moved to the output store by _offload_outputs"""
+        for output in _iter_outputs(nb):
+            metadata = output.get('metadata', {})
+            refs = metadata.pop(_offload_metadata_key, None)
+            if not refs:
+                continue
+            if metadata.pop(_offload_created_metadata_key, False) and not metadata:
+                del output['metadata']
+            for key, digest in refs.items():
+                blob_path = self._get_output_store_path(digest, path)
+                try:
+                    with io.open(blob_path, 'rb') as f:
+                        data = f.read()
+                except (IOError, OSError):
+                    self.log.warn("Missing stored output data: %s", blob_path)
+                    continue
+                # the notebook's digest stands for the stored data when
+                # checking its signature, so it must match
+                if hashlib.sha256(data).hexdigest() != digest:
+                    self.log.warn("Corrupt stored output data: %s", blob_path)
+                    continue
+                output[key] = data.decode('utf-8')
+
     def _get_os_path(self, name=None, path=''):
         """Given a filename and API path, return its file system
         path.
@@ -164,7 +331,10 @@ def exists(self, name=None, path=''):
     def _base_model(self, name, path=''):
         """Build the common base of a contents model"""
         os_path = self._get_os_path(name, path)
-        info = os.stat(os_path)
+        return self._stat_model(name, path, os.stat(os_path))
+
+    def _stat_model(self, name, path, info):
+        """Build the common base of a contents model from a stat result"""
         last_modified = tz.utcfromtimestamp(info.st_mtime)
         created = tz.utcfromtimestamp(info.st_ctime)
         # Create the base model.
@@ -203,16 +373,69 @@ def _dir_model(self, name, path='', content=True):
         model['type'] = 'directory'
         dir_path = u'{}/{}'.format(path, name)
         if content:
-            model['content'] = contents = []
-            for os_path in glob.glob(self._get_os_path('*', dir_path)):
-                name = os.path.basename(os_path)
-                if self.should_list(name) and not is_hidden(os_path, self.root_dir):
-                    contents.append(self.get_model(name=name, path=dir_path, content=False))
-
+            model['content'] = [
+                m for m in self._list_dir(os_path, dir_path.strip('/'))
+                if self.should_list(m['name'])
+            ]
             model['format'] = 'json'
 
         return model
 
+    def _list_dir(self, os_path, path):
+        """Return the models (without content) of the visible entries of a directory
+
+        The directory is scanned with a single stat per entry, and the result
+        is cached, keyed on the directory's mtime. A listing taken right
+        after the directory changed is cached, but not reused.
+        The returned models are copies, so they may be modified by the caller.
+        """
+        dir_mtime = os.stat(os_path).st_mtime
+        cached = self._dir_cache.pop(os_path, None)
+        if cached is None or cached[0] != dir_mtime or not cached[1]:
+            trusted = time.time() - dir_mtime > self._dir_cache_racy_interval
+            models = []
+            for name in os.listdir(os_path):
+                entry_os_path = os.path.join(os_path, name)
+                try:
+                    info = os.stat(entry_os_path)
+                except OSError:
+                    # broken symlink, or removed since the listing
+                    self.log.debug("Skipping unreadable entry %r", entry_os_path)
+                    continue
+                if is_file_hidden(entry_os_path, info):
+                    continue
+                model = self._stat_model(name, path, info)
+                if stat.S_ISDIR(info.st_mode):
+                    model['type'] = 'directory'
+                elif name.endswith('.ipynb'):
+                    model['type'] = 'notebook'
+                else:
+                    model['type'] = 'file'
+                models.append(model)
+            cached = (dir_mtime, trusted, models)
+
+        if self.dir_cache_size > 0:
+            # re-inserting marks the listing as the most recently used
+            self._dir_cache[os_path] = cached
+            while len(self._dir_cache) > self.dir_cache_size:
+                self._dir_cache.popitem(last=False)
+
+        return [dict(model) for model in cached[2]]
+
+    def _invalidate_dir_cache(self, name=None, path=''):
+        """Drop cached listings affected by a change to path/name
+
+        This drops the listing of the containing directory, and if path/name
+        is itself a directory, the listings of it and everything below it.
+        """
+        parent = self._get_os_path(path=path)
+        self._dir_cache.pop(parent, None)
+        if name:
+            os_path = self._get_os_path(name, path)
+            for key in list(self._dir_cache):
+                if key == os_path or key.startswith(os_path + os.sep):
+                    del self._dir_cache[key]
+
     def _file_model(self, name, path='', content=True):
         """Build a model for a file
 
@@ -246,11 +469,13 @@ def _notebook_model(self, name, path='', content=True):
         if content:
             os_path = self._get_os_path(name, path)
             with io.open(os_path, 'r', encoding='utf-8') as f:
-                try:
-                    nb = current.read(f, u'json')
-                except Exception as e:
-                    raise web.HTTPError(400, u"Unreadable Notebook: %s %s" % (os_path, e))
-            self.mark_trusted_cells(nb, name, path)
+                source = f.read()
+            try:
+                nb = current.reads(source, u'json')
+            except Exception as e:
+                raise web.HTTPError(400, u"Unreadable Notebook: %s %s" % (os_path, e))
+            self._restore_outputs(nb, path)
+            self.mark_trusted_cells(nb, name, path, source)
             model['content'] = nb
             model['format'] = 'json'
         return model
@@ -290,13 +515,23 @@ def _save_notebook(self, os_path, model, name='', path=''):
         # Save the notebook file
         nb = current.to_notebook_json(model['content'])
 
-        self.check_and_sign(nb, name, path)
-
         if 'name' in nb['metadata']:
             nb['metadata']['name'] = u''
 
+        signed = self.check_and_sign(nb, name, path)
+
+        if self.output_store_threshold > 0:
+            self._offload_outputs(nb, path)
+
         with io.open(os_path, 'w', encoding='utf-8') as f:
+            if signed:
+                # remember the file as trusted, so that opening it
+                # doesn't compute its signature again
+                digest = self.notary.source_digest()
+                f = _DigestingWriter(f, digest)
             current.write(nb, f, u'json')
+        if signed:
+            self.notary.remember(digest.hexdigest())
 
     def _save_file(self, os_path, model, name='', path=''):
         """save a non-notebook file"""
@@ -346,6 +581,7 @@ def save(self, model, name='', path=''):
             self.rename(name, path, new_name, new_path)
 
         os_path = self._get_os_path(new_name, new_path)
+        self._invalidate_dir_cache(new_name, new_path)
         self.log.debug("Saving %s", os_path)
         try:
             if model['type'] == 'notebook':
@@ -391,6 +627,8 @@ def delete(self, name, path=''):
         elif not os.path.isfile(os_path):
             raise web.HTTPError(404, u'File does not exist: %s' % os_path)
 
+        self._invalidate_dir_cache(name, path)
+
         # clear checkpoints
         for checkpoint in self.list_checkpoints(name, path):
             checkpoint_id = checkpoint['id']
@@ -420,6 +658,9 @@ def rename(self, old_name, old_path, new_name, new_path):
         if os.path.isfile(new_os_path):
             raise web.HTTPError(409, u'File with name already exists: %s' % new_os_path)
 
+        self._invalidate_dir_cache(old_name, old_path)
+        self._invalidate_dir_cache(new_name, new_path)
+
         # Move the file
         try:
             shutil.move(old_os_path, new_os_path)
@@ -436,6 +677,16 @@ def rename(self, old_name, old_path, new_name, new_path):
                 self.log.debug("Renaming checkpoint %s -> %s", old_cp_path, new_cp_path)
                 shutil.move(old_cp_path, new_cp_path)
 
+        # The output store is per directory, bring the notebook's stored
+        # outputs (and those of its checkpoints) along
+        if new_path != old_path and new_name.endswith('.ipynb') \
+                and os.path.isfile(new_os_path):
+            digests = self._stored_output_digests(new_os_path)
+            for cp in old_checkpoints:
+                digests.update(self._stored_output_digests(
+                    self.get_checkpoint_path(cp['id'], new_name, new_path)))
+            self._copy_stored_outputs(digests, old_path, new_path)
+
     # Checkpoint-related utilities
 
     def get_checkpoint_path(self, checkpoint_id, name, path=''):
@@ -509,6 +760,7 @@ def restore_checkpoint(self, checkpoint_id, name, path=''):
         if cp_path.endswith('.ipynb'):
             with io.open(cp_path, 'r', encoding='utf-8') as f:
                 current.read(f, u'json')
+        self._invalidate_dir_cache(name, path)
         self._copy(cp_path, nb_path)
         self.log.debug("copying %s -> %s", cp_path, nb_path)
 
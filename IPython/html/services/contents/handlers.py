@@ -58,15 +58,37 @@ def get(self, path='', name=None):
 
         A directory model contains a list of models (without content)
         of the files and directories it contains.
+
+        Directory listings can be paginated with the ``offset`` and ``limit``
+        query arguments, which are applied after sorting.
         """
         path = path or ''
+        offset = self._int_argument('offset', 0)
+        limit = self._int_argument('limit', None)
         model = self.contents_manager.get_model(name=name, path=path)
         if model['type'] == 'directory':
             # group listing by type, then by name (case-insensitive)
             # FIXME: sorting should be done in the frontends
             model['content'].sort(key=sort_key)
+            if limit is not None:
+                model['content'] = model['content'][offset:offset + limit]
+            elif offset:
+                model['content'] = model['content'][offset:]
         self._finish_model(model, location=False)
 
+    def _int_argument(self, name, default):
+        """Get a non-negative integer query argument"""
+        value = self.get_argument(name, None)
+        if value is None:
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            value = -1
+        if value < 0:
+            raise web.HTTPError(400, u'%s must be a non-negative integer' % name)
+        return value
+
     @web.authenticated
     @json_errors
     def patch(self, path='', name=None):
@@ -303,13 +303,17 @@ def check_and_sign(self, nb, name='', path=''):
             The filename of the notebook (for logging)
         path : string
             The notebook's directory (for logging)
+
+        Returns True if the notebook was signed, False otherwise.
         """
         if self.notary.check_cells(nb):
             self.notary.sign(nb)
+            return True
         else:
             self.log.warn("Saving untrusted notebook %s/%s", path, name)
+            return False
 
-    def mark_trusted_cells(self, nb, name='', path=''):
+    def mark_trusted_cells(self, nb, name='', path='', source=None):
         """Mark cells as trusted if the notebook signature matches.
 
         Called as a part of loading notebooks.
@@ -322,8 +326,12 @@ def mark_trusted_cells(self, nb, name='', path=''):
             The filename of the notebook (for logging)
         path : string
             The notebook's directory (for logging)
+        source : unicode, optional
+            The serialized notebook, as read.
+            If it is unchanged since the notebook was last trusted,
+            its signature is not computed again.
         """
-        trusted = self.notary.check_signature(nb)
+        trusted = self.notary.check_signature(nb, source)
         if not trusted:
             self.log.warn("Notebook %s/%s is not trusted", path, name)
         self.notary.mark_cells(nb, trusted)
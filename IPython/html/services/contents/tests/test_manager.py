@@ -2,8 +2,10 @@
 """Tests for the notebook manager."""
 from __future__ import print_function
 
+import io
 import logging
 import os
+import time
 
 from tornado.web import HTTPError
 from unittest import TestCase
@@ -69,6 +71,58 @@ def test_checkpoint_subdir(self):
         self.assertEqual(cp_dir, os.path.join(root, fm.checkpoint_dir, cp_name))
         self.assertEqual(cp_subdir, os.path.join(root, subd, fm.checkpoint_dir, cp_name))
 
+    def test_dir_listing_cache(self):
+        with TemporaryDirectory() as td:
+            fm = FileContentsManager(root_dir=td)
+            for name in ('a.txt', 'b.ipynb', '.hidden'):
+                with open(os.path.join(td, name), 'w'):
+                    pass
+            os.mkdir(os.path.join(td, 'sub'))
+            listing = fm.get_model(None, '')['content']
+            types = {m['name']: m['type'] for m in listing}
+            self.assertEqual(types, {
+                'a.txt': 'file', 'b.ipynb': 'notebook', 'sub': 'directory',
+            })
+            self.assertIn(td, fm._dir_cache)
+
+            # returned models don't share state with the cache
+            listing[0]['name'] = 'changed'
+            names = {m['name'] for m in fm.get_model(None, '')['content']}
+            self.assertNotIn('changed', names)
+
+            # saving and deleting through the manager invalidates the listing
+            fm.save({'type': 'file', 'format': 'text', 'content': u''}, 'c.txt')
+            names = {m['name'] for m in fm.get_model(None, '')['content']}
+            self.assertIn('c.txt', names)
+            fm.delete('a.txt')
+            names = {m['name'] for m in fm.get_model(None, '')['content']}
+            self.assertNotIn('a.txt', names)
+
+            fm.dir_cache_size = 0
+            fm.get_model(None, '')
+            self.assertNotIn(td, fm._dir_cache)
+
+    def test_dir_listing_cache_racy(self):
+        with TemporaryDirectory() as td:
+            fm = FileContentsManager(root_dir=td)
+            mtime = time.time()
+            os.utime(td, (mtime, mtime))
+            self.assertEqual(fm.get_model(None, '')['content'], [])
+
+            # a file created within the same mtime tick as the listing
+            open(os.path.join(td, 'a.txt'), 'w').close()
+            os.utime(td, (mtime, mtime))
+            names = [m['name'] for m in fm.get_model(None, '')['content']]
+            self.assertEqual(names, ['a.txt'])
+
+            # listings of directories unchanged for a while are reused
+            os.utime(td, (mtime - 10, mtime - 10))
+            fm.get_model(None, '')
+            open(os.path.join(td, 'b.txt'), 'w').close()
+            os.utime(td, (mtime - 10, mtime - 10))
+            names = [m['name'] for m in fm.get_model(None, '')['content']]
+            self.assertEqual(names, ['a.txt'])
+
 
 class TestContentsManager(TestCase):
 
@@ -299,3 +353,103 @@ def test_check_and_sign(self):
         cm.mark_trusted_cells(nb, name, path)
         cm.check_and_sign(nb, name, path)
         assert cm.notary.check_signature(nb)
+
+    def test_trusted_source_remembered(self):
+        cm = self.contents_manager
+        cm.notary.forget_all()
+        nb, name, path = self.new_notebook()
+        cm.trust_notebook(name, path)
+
+        # the saved notebook is trusted without computing its signature
+        compute_signature = cm.notary.compute_signature
+        cm.notary.compute_signature = None
+        try:
+            nb = cm.get_model(name, path)['content']
+        finally:
+            cm.notary.compute_signature = compute_signature
+        assert cm.notary.check_cells(nb)
+
+        # unless its file changes
+        os_path = cm._get_os_path(name, path)
+        with io.open(os_path, 'a', encoding='utf-8') as f:
+            f.write(u'\n')
+        cm.notary.compute_signature = None
+        try:
+            with self.assertRaises(TypeError):
+                cm.get_model(name, path)
+        finally:
+            cm.notary.compute_signature = compute_signature
+        nb = cm.get_model(name, path)['content']
+        assert cm.notary.check_cells(nb)
+
+    def test_output_store_stream_trusted(self):
+        cm = self.contents_manager
+        cm.output_store_threshold = 100
+        nb, name, path = self.new_notebook()
+        output = current.new_output("stream", output_text=u'x' * 1000,
+                                    stream=u'stdout')
+        del output['metadata']
+        nb.worksheets[0].cells[0].outputs.append(output)
+        cm.save({'type': 'notebook', 'content': nb}, name, path)
+        cm.trust_notebook(name, path)
+
+        # the signature matches without the known digest of the file
+        cm.notary.forget_all()
+        nb2 = cm.get_model(name, path)['content']
+        output2 = nb2.worksheets[0].cells[0].outputs[-1]
+        self.assertNotIn('metadata', output2)
+        assert nb2.worksheets[0].cells[0].trusted
+        assert cm.notary.check_cells(nb2)
+        assert cm.notary.check_signature(nb2)
+
+    def test_output_store(self):
+        cm = self.contents_manager
+        cm.output_store_threshold = 100
+        nb, name, path = self.new_notebook()
+        big = u'x' * 1000
+        output = current.new_output("display_data", output_png=big,
+                                    output_text=u'small')
+        nb.worksheets[0].cells[0].outputs.append(output)
+        cm.save({'type': 'notebook', 'content': nb}, name, path)
+        cm.trust_notebook(name, path)
+
+        os_path = cm._get_os_path(name, path)
+        with io.open(os_path, encoding='utf-8') as f:
+            self.assertNotIn(big, f.read())
+        store = os.path.join(cm.root_dir, cm.output_store_dir)
+        self.assertEqual(len(os.listdir(store)), 1)
+
+        nb2 = cm.get_model(name, path)['content']
+        output2 = nb2.worksheets[0].cells[0].outputs[-1]
+        self.assertEqual(output2.png, big)
+        self.assertEqual(output2.text, u'small')
+        self.assertEqual(output2.metadata, {})
+        assert cm.notary.check_cells(nb2)
+
+        # saving again reuses the stored blob
+        cm.save({'type': 'notebook', 'content': nb2}, name, path)
+        self.assertEqual(len(os.listdir(store)), 1)
+
+        # modified blobs are not restored
+        blob, = os.listdir(store)
+        with io.open(os.path.join(store, blob), 'wb') as f:
+            f.write(b'<script>alert(1)</script>')
+        nb3 = cm.get_model(name, path)['content']
+        self.assertNotIn('png', nb3.worksheets[0].cells[0].outputs[-1])
+
+    def test_output_store_rename(self):
+        cm = self.contents_manager
+        cm.output_store_threshold = 100
+        nb, name, path = self.new_notebook()
+        big = u'x' * 1000
+        output = current.new_output("display_data", output_png=big)
+        nb.worksheets[0].cells[0].outputs.append(output)
+        cm.save({'type': 'notebook', 'content': nb}, name, path)
+
+        # moving the notebook to another directory brings its stored outputs
+        self.make_dir(cm.root_dir, 'sub')
+        cm.rename(name, path, name, 'sub')
+        nb2 = cm.get_model(name, 'sub')['content']
+        self.assertEqual(nb2.worksheets[0].cells[0].outputs[-1].png, big)
+        store = os.path.join(cm.root_dir, 'sub', cm.output_store_dir)
+        self.assertEqual(len(os.listdir(store)), 1)
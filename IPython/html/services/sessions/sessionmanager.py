@@ -16,14 +16,18 @@
 # Imports
 #-----------------------------------------------------------------------------
 
+import io
+import json
+import os
+import sys
 import uuid
-import sqlite3
+from collections import OrderedDict
 
 from tornado import web
 
 from IPython.config.configurable import LoggingConfigurable
 from IPython.utils.py3compat import unicode_type
-from IPython.utils.traitlets import Instance
+from IPython.utils.traitlets import Instance, Unicode
 
 #-----------------------------------------------------------------------------
 # Classes
@@ -33,41 +37,101 @@ class SessionManager(LoggingConfigurable):
 
     kernel_manager = Instance('IPython.html.services.kernels.kernelmanager.MappingKernelManager')
     contents_manager = Instance('IPython.html.services.contents.manager.ContentsManager', args=())
-    
-    # Session database initialized below
-    _cursor = None
-    _connection = None
+
+    session_file = Unicode(u'', config=True,
+        help="""A JSON file in which to persist sessions across server restarts.
+
+        When sessions are restored, a session whose kernel is no longer
+        running gets a new kernel of the same kind, started in the notebook's
+        directory. By default, sessions are not persisted.
+        """
+    )
+
+    # Sessions are stored as {session_id: record}, in creation order,
+    # with indexes by (name, path) and by kernel_id.
+    _sessions = Instance(OrderedDict, ())
+    _by_notebook = Instance(dict, ())
+    _by_kernel = Instance(dict, ())
     _columns = {'session_id', 'name', 'path', 'kernel_id'}
-    
-    @property
-    def cursor(self):
-        """Start a cursor and create a database called 'session'"""
-        if self._cursor is None:
-            self._cursor = self.connection.cursor()
-            self._cursor.execute("""CREATE TABLE session 
-                (session_id, name, path, kernel_id)""")
-        return self._cursor
-
-    @property
-    def connection(self):
-        """Start a database connection"""
-        if self._connection is None:
-            self._connection = sqlite3.connect(':memory:')
-            self._connection.row_factory = self.row_factory
-        return self._connection
-        
-    def __del__(self):
-        """Close connection once SessionManager closes"""
-        self.cursor.close()
+
+    def __init__(self, **kwargs):
+        super(SessionManager, self).__init__(**kwargs)
+        if self.session_file:
+            self._load_sessions()
+
+    def _load_sessions(self):
+        """Restore sessions from the session file"""
+        if not os.path.exists(self.session_file):
+            return
+        try:
+            with io.open(self.session_file, encoding='utf-8') as f:
+                records = json.load(f)
+        except (IOError, ValueError) as e:
+            self.log.warn("Could not load sessions from %s: %s", self.session_file, e)
+            return
+        for record in records:
+            kernel_name = record.pop('kernel_name', 'python')
+            if record['kernel_id'] not in self.kernel_manager:
+                # kernels don't outlive the server, start a new one
+                kernel_path = self.contents_manager.get_kernel_path(
+                    name=record['name'], path=record['path'])
+                try:
+                    record['kernel_id'] = self.kernel_manager.start_kernel(
+                        path=kernel_path, kernel_name=kernel_name)
+                except Exception as e:
+                    self.log.warn("Not restoring session %s, could not start its kernel: %s",
+                        record['session_id'], e)
+                    continue
+            self._add_record(record)
+        self._save_sessions()
+
+    def _save_sessions(self):
+        """Write sessions to the session file, if there is one"""
+        if not self.session_file:
+            return
+        records = []
+        for record in self._sessions.values():
+            record = dict(record)
+            if record['kernel_id'] in self.kernel_manager:
+                record['kernel_name'] = self.kernel_manager.kernel_model(
+                    record['kernel_id'])['name']
+            records.append(record)
+        data = json.dumps(records)
+        # write to a temporary file first, so that a crash
+        # never leaves a truncated session file behind
+        tmp_path = self.session_file + '.tmp'
+        with io.open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(unicode_type(data))
+        if sys.platform == 'win32' and os.path.exists(self.session_file):
+            # rename doesn't replace existing files on Windows
+            os.remove(self.session_file)
+        os.rename(tmp_path, self.session_file)
+
+    def _add_record(self, record):
+        """Add a session record and index it"""
+        self._sessions[record['session_id']] = record
+        self._index(record)
+
+    def _index(self, record):
+        session_id = record['session_id']
+        self._by_notebook[(record['name'], record['path'])] = session_id
+        self._by_kernel[record['kernel_id']] = session_id
+
+    def _unindex(self, record):
+        session_id = record['session_id']
+        for index, key in ((self._by_notebook, (record['name'], record['path'])),
+                           (self._by_kernel, record['kernel_id'])):
+            if index.get(key) == session_id:
+                del index[key]
+
+    def _check_columns(self, columns):
+        for column in columns:
+            if column not in self._columns:
+                raise TypeError("No such column: %r" % column)
 
     def session_exists(self, name, path):
         """Check to see if the session for a given notebook exists"""
-        self.cursor.execute("SELECT * FROM session WHERE name=? AND path=?", (name, path))
-        reply = self.cursor.fetchone()
-        if reply is None:
-            return False
-        else:
-            return True
+        return (name, path) in self._by_notebook
 
     def new_session_id(self):
         "Create a uuid for a new session"
@@ -87,7 +151,7 @@ def save_session(self, session_id, name=None, path=None, kernel_id=None):
         """Saves the items for the session with the given session_id
         
         Given a session_id (and any other of the arguments), this method
-        creates a row in the sqlite session database that holds the information
+        creates a record in the session registry that holds the information
         for a session.
         
         Parameters
@@ -106,21 +170,46 @@ def save_session(self, session_id, name=None, path=None, kernel_id=None):
         model : dict
             a dictionary of the session model
         """
-        self.cursor.execute("INSERT INTO session VALUES (?,?,?,?)",
-            (session_id, name, path, kernel_id)
-        )
+        self._add_record(dict(
+            session_id=session_id, name=name, path=path, kernel_id=kernel_id,
+        ))
+        self._save_sessions()
         return self.get_session(session_id=session_id)
 
+    def _find_record(self, **kwargs):
+        """Find the record of a session matching all of kwargs
+
+        The session_id, (name, path) and kernel_id indexes are used
+        where possible. Returns None if no session matches.
+        """
+        if 'session_id' in kwargs:
+            candidates = [self._sessions.get(kwargs['session_id'])]
+        elif 'name' in kwargs and 'path' in kwargs:
+            session_id = self._by_notebook.get((kwargs['name'], kwargs['path']))
+            candidates = [self._sessions.get(session_id)]
+        elif 'kernel_id' in kwargs:
+            session_id = self._by_kernel.get(kwargs['kernel_id'])
+            candidates = [self._sessions.get(session_id)]
+        else:
+            candidates = self._sessions.values()
+
+        for record in candidates:
+            if record is not None and all(
+                record[key] == value for key, value in kwargs.items()
+            ):
+                return record
+        return None
+
     def get_session(self, **kwargs):
         """Returns the model for a particular session.
         
         Takes a keyword argument and searches for the value in the session
-        database, then returns the rest of the session's info.
+        registry, then returns the rest of the session's info.
 
         Parameters
         ----------
         **kwargs : keyword argument
-            must be given one of the keywords and values from the session database
+            must be given one of the keywords and values from the session registry
             (i.e. session_id, name, path, kernel_id)
 
         Returns
@@ -131,27 +220,19 @@ def get_session(self, **kwargs):
         """
         if not kwargs:
             raise TypeError("must specify a column to query")
+        self._check_columns(kwargs)
 
-        conditions = []
-        for column in kwargs.keys():
-            if column not in self._columns:
-                raise TypeError("No such column: %r", column)
-            conditions.append("%s=?" % column)
-
-        query = "SELECT * FROM session WHERE %s" % (' AND '.join(conditions))
-
-        self.cursor.execute(query, list(kwargs.values()))
-        model = self.cursor.fetchone()
-        if model is None:
+        record = self._find_record(**kwargs)
+        if record is None:
             q = []
             for key, value in kwargs.items():
                 q.append("%s=%r" % (key, value))
 
             raise web.HTTPError(404, u'Session not found: %s' % (', '.join(q)))
-        return model
+        return self.session_model(record)
 
     def update_session(self, session_id, **kwargs):
-        """Updates the values in the session database.
+        """Updates the values in the session registry.
         
         Changes the values of the session with the given session_id
         with the values from the keyword arguments. 
@@ -159,9 +240,9 @@ def update_session(self, session_id, **kwargs):
         Parameters
         ----------
         session_id : str
-            a uuid that identifies a session in the sqlite3 database
+            a uuid that identifies a session
         **kwargs : str
-            the key must correspond to a column title in session database,
+            the key must correspond to a column title in session registry,
             and the value replaces the current value in the session 
             with session_id.
         """
@@ -171,36 +252,39 @@ def update_session(self, session_id, **kwargs):
             # no changes
             return
 
-        sets = []
-        for column in kwargs.keys():
-            if column not in self._columns:
-                raise TypeError("No such column: %r" % column)
-            sets.append("%s=?" % column)
-        query = "UPDATE session SET %s WHERE session_id=?" % (', '.join(sets))
-        self.cursor.execute(query, list(kwargs.values()) + [session_id])
+        self._check_columns(kwargs)
+        record = self._sessions[session_id]
+        self._unindex(record)
+        record.update(kwargs)
+        if record['session_id'] != session_id:
+            # keep the session in the same position
+            self._sessions = OrderedDict(
+                (r['session_id'], r) for r in self._sessions.values()
+            )
+        self._index(record)
+        self._save_sessions()
 
-    def row_factory(self, cursor, row):
-        """Takes sqlite database session row and turns it into a dictionary"""
-        row = sqlite3.Row(cursor, row)
+    def session_model(self, record):
+        """Takes a session record and turns it into a session model"""
         model = {
-            'id': row['session_id'],
+            'id': record['session_id'],
             'notebook': {
-                'name': row['name'],
-                'path': row['path']
+                'name': record['name'],
+                'path': record['path']
             },
-            'kernel': self.kernel_manager.kernel_model(row['kernel_id'])
+            'kernel': self.kernel_manager.kernel_model(record['kernel_id'])
         }
         return model
 
     def list_sessions(self):
         """Returns a list of dictionaries containing all the information from
-        the session database"""
-        c = self.cursor.execute("SELECT * FROM session")
-        return list(c.fetchall())
+        the session registry"""
+        return [self.session_model(record) for record in self._sessions.values()]
 
     def delete_session(self, session_id):
-        """Deletes the row in the session database with given session_id"""
+        """Deletes the session with given session_id"""
         # Check that session exists before deleting
         session = self.get_session(session_id=session_id)
         self.kernel_manager.shutdown_kernel(session['kernel']['id'])
-        self.cursor.execute("DELETE FROM session WHERE session_id=?", (session_id,))
+        self._unindex(self._sessions.pop(session_id))
+        self._save_sessions()
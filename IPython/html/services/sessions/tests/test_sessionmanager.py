@@ -1,11 +1,13 @@
 """Tests for the session manager."""
 
+import os
 from unittest import TestCase
 
 from tornado import web
 
 from ..sessionmanager import SessionManager
 from IPython.html.services.kernels.kernelmanager import MappingKernelManager
+from IPython.utils.tempdir import TemporaryDirectory
 
 class DummyKernel(object):
     def __init__(self, kernel_name='python'):
@@ -40,6 +42,22 @@ def test_get_session(self):
                     'kernel': {'id':u'A', 'name': 'bar'}}
         self.assertEqual(model, expected)
 
+    def test_get_session_by_index(self):
+        sm = SessionManager(kernel_manager=DummyMKM())
+        sm.create_session(name='test1.ipynb', path='/path/to/', kernel_name='python')
+        session_id = sm.create_session(name='test2.ipynb', path='/path/to/',
+                                       kernel_name='python')['id']
+        model = sm.get_session(name='test2.ipynb', path='/path/to/')
+        self.assertEqual(model['id'], session_id)
+        model = sm.get_session(kernel_id=u'B')
+        self.assertEqual(model['id'], session_id)
+        model = sm.get_session(name='test2.ipynb')
+        self.assertEqual(model['id'], session_id)
+        self.assertTrue(sm.session_exists(name='test2.ipynb', path='/path/to/'))
+        self.assertFalse(sm.session_exists(name='test3.ipynb', path='/path/to/'))
+        self.assertRaises(web.HTTPError, sm.get_session,
+                          session_id=session_id, kernel_id=u'A')
+
     def test_bad_get_session(self):
         # Should raise error if a bad key is passed to the database.
         sm = SessionManager(kernel_manager=DummyMKM())
@@ -103,3 +121,30 @@ def test_bad_delete_session(self):
         self.assertRaises(TypeError, sm.delete_session, bad_kwarg='23424') # Bad keyword
         self.assertRaises(web.HTTPError, sm.delete_session, session_id='23424') # nonexistant
 
+    def test_session_file(self):
+        with TemporaryDirectory() as td:
+            session_file = os.path.join(td, 'sessions.json')
+            km = DummyMKM()
+            sm = SessionManager(kernel_manager=km, session_file=session_file)
+            sessions = [
+                sm.create_session(name='test1.ipynb', path='/path/to/1/', kernel_name='python'),
+                sm.create_session(name='test2.ipynb', path='/path/to/2/', kernel_name='python'),
+                sm.create_session(name='test3.ipynb', path='/path/to/3/', kernel_name='bar'),
+            ]
+            sm.update_session(sessions[0]['id'], name='renamed.ipynb')
+            sm.delete_session(sessions[1]['id'])
+            expected = sm.list_sessions()
+            self.assertEqual(os.listdir(td), ['sessions.json'])
+
+            # running kernels are adopted
+            sm2 = SessionManager(kernel_manager=km, session_file=session_file)
+            self.assertEqual(sm2.list_sessions(), expected)
+            model = sm2.get_session(name='renamed.ipynb', path='/path/to/1/')
+            self.assertEqual(model['id'], sessions[0]['id'])
+
+            # sessions whose kernel is gone get a new kernel of the same kind
+            km.shutdown_kernel(u'C')
+            sm3 = SessionManager(kernel_manager=km, session_file=session_file)
+            model = sm3.get_session(session_id=sessions[2]['id'])
+            self.assertEqual(model['kernel'], {'id': u'D', 'name': 'bar'})
+            self.assertEqual(sm3.get_session(kernel_id=u'A')['id'], sessions[0]['id'])
@@ -16,7 +16,8 @@
 import nose.tools as nt
 
 import IPython.testing.tools as tt
-from IPython.html.utils import url_escape, url_unescape, is_hidden
+from IPython.html.utils import (url_escape, url_unescape, is_hidden,
+                                is_file_hidden)
 from IPython.utils.tempdir import TemporaryDirectory
 
 #-----------------------------------------------------------------------------
@@ -74,3 +75,17 @@ def test_is_hidden():
         os.makedirs(subdir34)
         nt.assert_equal(is_hidden(subdir34, root), True)
         nt.assert_equal(is_hidden(subdir34), True)
+
+def test_is_file_hidden():
+    with TemporaryDirectory() as root:
+        subdir1 = os.path.join(root, 'subdir')
+        os.makedirs(subdir1)
+        nt.assert_equal(is_file_hidden(subdir1), False)
+        nt.assert_equal(is_file_hidden(subdir1, os.stat(subdir1)), False)
+        subdir2 = os.path.join(root, '.subdir2')
+        os.makedirs(subdir2)
+        nt.assert_equal(is_file_hidden(subdir2), True)
+        # only the last element of the path is checked
+        subdir34 = os.path.join(root, '.subdir3', 'subdir4')
+        os.makedirs(subdir34)
+        nt.assert_equal(is_file_hidden(subdir34), False)
@@ -127,6 +127,41 @@ def is_hidden(abs_path, abs_root=''):
 
     return False
 
+def is_file_hidden(abs_path, stat_res=None):
+    """Is a single file or directory hidden?
+
+    Unlike :func:`is_hidden`, this only checks the last element of the path,
+    not its parents, so it is suitable for checking the entries of a directory
+    which is already known not to be hidden.
+
+    Parameters
+    ----------
+    abs_path : unicode
+        The absolute path of the file to check.
+    stat_res : os.stat_result, optional
+        The result of ``os.stat(abs_path)``, if it is already available.
+        Passing it avoids an extra stat call.
+    """
+    if os.path.basename(abs_path).startswith('.'):
+        return True
+
+    if stat_res is None:
+        try:
+            stat_res = os.stat(abs_path)
+        except OSError:
+            return True
+
+    # check that dirs can be listed
+    # use access rather than an actual listing, which may be slow
+    if stat.S_ISDIR(stat_res.st_mode):
+        if not os.access(abs_path, os.R_OK | os.X_OK):
+            return True
+
+    if getattr(stat_res, 'st_flags', 0) & UF_HIDDEN:
+        return True
+
+    return False
+
 def to_os_path(path, root=''):
     """Convert an API path to a filesystem path
     
@@ -1,2 +1,3 @@
 from .manager import IOLoopKernelManager
 from .restarter import IOLoopKernelRestarter
+from .client import IOLoopKernelClient
@@ -0,0 +1,360 @@
+"""A kernel client that runs all of its channels on a tornado IOLoop.
+
+Unlike the threaded channels of :class:`IPython.kernel.client.KernelClient`,
+no threads are started: the sockets of every channel are ZMQStreams on a single
+IOLoop, which may be shared by the clients of many kernels.
+The requests return Futures, which can be yielded from tornado coroutines.
+"""
+
+# Copyright (c) IPython Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+from __future__ import absolute_import
+
+import time
+
+import zmq
+from zmq.eventloop import ioloop, zmqstream
+from tornado import gen
+from tornado.concurrent import Future
+
+from IPython.utils.traitlets import Dict, Instance, Type
+
+from IPython.kernel.client import KernelClient
+from IPython.kernel.channels import (
+    ShellChannel, IOPubChannel, StdInChannel, HBChannel,
+)
+
+#-----------------------------------------------------------------------------
+# Channels
+#-----------------------------------------------------------------------------
+
+class IOLoopChannelMixin(object):
+    """Run a channel's socket on an IOLoop, instead of in a thread.
+
+    The IOLoop is assigned by the client before the channel is started,
+    and messages are delivered to the client's ``_handle_<channel>_msg``.
+    """
+
+    client = None
+    socket_type = zmq.DEALER
+
+    def start(self):
+        self.socket = self.context.socket(self.socket_type)
+        self.socket.linger = 1000
+        if self.socket_type == zmq.SUB:
+            self.socket.setsockopt(zmq.SUBSCRIBE, b'')
+        self.socket.setsockopt(zmq.IDENTITY, self.session.bsession)
+        self.socket.connect(self.address)
+        self.stream = zmqstream.ZMQStream(self.socket, self.ioloop)
+        self.stream.on_recv(self._handle_recv)
+
+    def stop(self):
+        self.close()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close(linger=0)
+            self.stream = None
+            self.socket = None
+
+    def is_alive(self):
+        return self.stream is not None
+
+    def _queue_send(self, msg):
+        """Send a message
+
+        This must be called from the IOLoop's thread.
+        """
+        self.session.send(self.stream, msg)
+
+
+class IOLoopShellChannel(IOLoopChannelMixin, ShellChannel):
+    # execute is wrapped by IOLoopKernelClient.execute
+    proxy_methods = [m for m in ShellChannel.proxy_methods if m != 'execute']
+
+    def __init__(self, context, session, address):
+        super(ShellChannel, self).__init__(context, session, address)
+
+    def call_handlers(self, msg):
+        if msg['msg_type'] == 'kernel_info_reply':
+            self._handle_kernel_info_reply(msg)
+        self.client._handle_shell_msg(msg)
+
+
+class IOLoopIOPubChannel(IOLoopChannelMixin, IOPubChannel):
+    socket_type = zmq.SUB
+
+    def __init__(self, context, session, address):
+        super(IOPubChannel, self).__init__(context, session, address)
+
+    def call_handlers(self, msg):
+        self.client._handle_iopub_msg(msg)
+
+    def flush(self, timeout=1.0):
+        """Process all pending messages on the iopub channel.
+
+        This must be called from the IOLoop's thread.
+        """
+        if self.stream is not None:
+            self.stream.flush()
+
+
+class IOLoopStdInChannel(IOLoopChannelMixin, StdInChannel):
+
+    def __init__(self, context, session, address):
+        super(StdInChannel, self).__init__(context, session, address)
+
+    def call_handlers(self, msg):
+        self.client._handle_stdin_msg(msg)
+
+
+class IOLoopHBChannel(HBChannel):
+    """A heartbeat channel, pinging the kernel from a PeriodicCallback"""
+
+    ioloop = None
+    client = None
+    _callback = None
+    _last_reply = None
+
+    def start(self):
+        self._running = True
+        self._beating = True
+        self._create_stream()
+        self._callback = ioloop.PeriodicCallback(
+            self._beat, 1000 * self.time_to_dead, self.ioloop,
+        )
+        self._callback.start()
+
+    def _create_stream(self):
+        if self.stream is not None:
+            # close previous socket, before opening a new one
+            self.stream.close(linger=0)
+        self.socket = self.context.socket(zmq.REQ)
+        self.socket.linger = 1000
+        self.socket.connect(self.address)
+        self.stream = zmqstream.ZMQStream(self.socket, self.ioloop)
+        self.stream.on_recv(self._handle_pong)
+        self._waiting = False
+
+    def _handle_pong(self, msg):
+        self._waiting = False
+        self._beating = True
+        self._last_reply = time.time()
+
+    def _beat(self):
+        if self._pause:
+            return
+        if self._waiting:
+            # no reply within time_to_dead, signal heart failure
+            self._beating = False
+            self.call_handlers(time.time() - (self._last_reply or 0))
+            # and reopen the socket, because the REQ/REP cycle has been broken
+            self._create_stream()
+        self.stream.send(b'ping')
+        self._waiting = True
+
+    def stop(self):
+        self._running = False
+        if self._callback is not None:
+            self._callback.stop()
+            self._callback = None
+        self.close()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close(linger=0)
+            self.stream = None
+            self.socket = None
+
+    def is_alive(self):
+        return self._running
+
+    def call_handlers(self, since_last_heartbeat):
+        """Called on the IOLoop when the kernel misses a heartbeat."""
+        pass
+
+#-----------------------------------------------------------------------------
+# Client
+#-----------------------------------------------------------------------------
+
+class IOLoopKernelClient(KernelClient):
+    """A KernelClient whose channels run on a tornado IOLoop.
+
+    The request methods send their message immediately and return its msg_id,
+    like the threaded client. :meth:`execute` and :meth:`wait_for_reply`
+    return Futures instead, so many kernels can be driven from coroutines
+    running on the same IOLoop::
+
+        @gen.coroutine
+        def run(kc):
+            reply, outputs = yield kc.execute("a = 1")
+
+    All methods must be called from the IOLoop's thread.
+    """
+
+    loop = Instance('zmq.eventloop.ioloop.IOLoop', allow_none=False)
+    def _loop_default(self):
+        return ioloop.IOLoop.instance()
+
+    shell_channel_class = Type(IOLoopShellChannel)
+    iopub_channel_class = Type(IOLoopIOPubChannel)
+    stdin_channel_class = Type(IOLoopStdInChannel)
+    hb_channel_class = Type(IOLoopHBChannel)
+
+    # {msg_id: Future} for requests awaiting their shell reply
+    _reply_futures = Dict()
+    # {msg_id: dict(outputs=[msgs], idle=Future)} for requests awaiting
+    # the kernel's idle status
+    _executions = Dict()
+
+    def start_channels(self, shell=True, iopub=True, stdin=True, hb=True):
+        """Starts the channels for this kernel on the IOLoop."""
+        for channel in (self.shell_channel, self.iopub_channel,
+                        self.stdin_channel, self.hb_channel):
+            channel.ioloop = self.loop
+            channel.client = self
+        super(IOLoopKernelClient, self).start_channels(shell, iopub, stdin, hb)
+
+    def wait_for_reply(self, msg_id, timeout=None):
+        """Return a Future for the shell reply to the request msg_id
+
+        If timeout (in seconds) is given, and no reply arrives in time,
+        the Future's exception is set to a TimeoutError.
+        """
+        future = self._reply_futures.get(msg_id)
+        if future is None:
+            future = self._reply_futures[msg_id] = Future()
+            if timeout is not None:
+                self._add_timeout(future, timeout, msg_id)
+        return future
+
+    @gen.coroutine
+    def wait_for_ready(self, timeout=60):
+        """Wait until the kernel replies on both the shell and iopub channels.
+
+        This is a coroutine.
+        A kernel_info request is sent until its iopub status arrives, which
+        means that no outputs of subsequent requests will be missed
+        because the iopub subscription was not yet established.
+        """
+        deadline = time.time() + timeout
+        while True:
+            msg_id = self.kernel_info()
+            idle = self._track_outputs(msg_id)['idle']
+            try:
+                yield self.wait_for_reply(msg_id,
+                                          timeout=deadline - time.time())
+                self._add_timeout(idle, min(1, deadline - time.time()), msg_id)
+                yield idle
+            except TimeoutError:
+                if time.time() >= deadline:
+                    raise
+            else:
+                return
+            finally:
+                self._executions.pop(msg_id, None)
+                self._reply_futures.pop(msg_id, None)
+
+    def _track_outputs(self, msg_id):
+        execution = self._executions[msg_id] = dict(outputs=[], idle=Future())
+        return execution
+
+    @gen.coroutine
+    def execute(self, code, silent=False, store_history=True,
+                user_expressions=None, allow_stdin=False, timeout=None,
+                idle_timeout=None):
+        """Execute code in the kernel, and collect its outputs.
+
+        This is a coroutine.
+        The parameters are those of :meth:`ShellChannel.execute`,
+        except that stdin is not allowed by default.
+
+        If timeout is given, it bounds the whole execution.
+        If idle_timeout is given, timeout only bounds the wait for the reply,
+        and idle_timeout the wait for the kernel's idle status after it.
+        When that expires, a warning is logged and the outputs collected
+        so far are returned.
+
+        Returns
+        -------
+        reply : dict
+            The execute_reply message.
+        outputs : list
+            The iopub messages published in reply to the request,
+            excluding status and execute_input messages.
+        """
+        msg_id = self.shell_channel.execute(code, silent=silent,
+            store_history=store_history, user_expressions=user_expressions,
+            allow_stdin=allow_stdin,
+        )
+        execution = self._track_outputs(msg_id)
+        if timeout is not None and idle_timeout is None:
+            self._add_timeout(execution['idle'], timeout, msg_id)
+        try:
+            reply = yield self.wait_for_reply(msg_id, timeout=timeout)
+            if idle_timeout is not None:
+                self._add_timeout(execution['idle'], idle_timeout, msg_id)
+            try:
+                yield execution['idle']
+            except TimeoutError:
+                if idle_timeout is None:
+                    raise
+                self.log.warn("Timeout waiting for the outputs of %s", msg_id)
+        finally:
+            self._executions.pop(msg_id, None)
+            self._reply_futures.pop(msg_id, None)
+        raise gen.Return((reply, execution['outputs']))
+
+    def _add_timeout(self, future, timeout, msg_id):
+        def on_timeout():
+            if not future.done():
+                future.set_exception(TimeoutError(
+                    "Timeout waiting for reply to %s" % msg_id))
+        self.loop.add_timeout(time.time() + timeout, on_timeout)
+
+    #--------------------------------------------------------------------------
+    # Message handlers, called by the channels on the IOLoop
+    #--------------------------------------------------------------------------
+
+    def _parent_id(self, msg):
+        return msg['parent_header'].get('msg_id')
+
+    def _handle_shell_msg(self, msg):
+        future = self._reply_futures.pop(self._parent_id(msg), None)
+        if future is not None and not future.done():
+            future.set_result(msg)
+        else:
+            self.handle_unsolicited_msg('shell', msg)
+
+    def _handle_iopub_msg(self, msg):
+        execution = self._executions.get(self._parent_id(msg))
+        if execution is None:
+            self.handle_unsolicited_msg('iopub', msg)
+            return
+        msg_type = msg['msg_type']
+        if msg_type == 'status':
+            if msg['content']['execution_state'] == 'idle':
+                if not execution['idle'].done():
+                    execution['idle'].set_result(None)
+        elif msg_type != 'execute_input':
+            execution['outputs'].append(msg)
+
+    def _handle_stdin_msg(self, msg):
+        self.handle_unsolicited_msg('stdin', msg)
+
+    def handle_unsolicited_msg(self, channel, msg):
+        """Called with messages that aren't replies to pending requests
+
+        Override in subclasses to handle them. By default, they are dropped.
+        """
+        self.log.debug("Dropping %s message %s", channel, msg['msg_type'])
+
+
+# TimeoutError is defined here on Python 3 as well, so callers can import it
+try:
+    TimeoutError = TimeoutError
+except NameError:
+    # Python 2
+    class TimeoutError(RuntimeError):
+        pass
@@ -0,0 +1,57 @@
+"""Tests for the IOLoop kernel client"""
+
+# Copyright (c) IPython Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+from subprocess import STDOUT
+
+import nose
+import nose.tools as nt
+from tornado import gen
+from zmq.eventloop import ioloop
+
+from IPython.kernel import KernelManager
+from IPython.kernel.ioloop import IOLoopKernelClient
+from .utils import STARTUP_TIMEOUT, TIMEOUT
+
+
+def start_kernels(n, loop):
+    kms = []
+    kcs = []
+    for i in range(n):
+        km = KernelManager()
+        km.start_kernel(stdout=nose.iptest_stdstreams_fileno(), stderr=STDOUT)
+        kc = IOLoopKernelClient(loop=loop, **km.get_connection_info())
+        kc.start_channels()
+        kms.append(km)
+        kcs.append(kc)
+    return kms, kcs
+
+
+def test_execute_many_kernels():
+    loop = ioloop.IOLoop()
+    kms, kcs = start_kernels(2, loop)
+
+    @gen.coroutine
+    def run():
+        yield [ kc.wait_for_ready(timeout=STARTUP_TIMEOUT) for kc in kcs ]
+        results = yield [
+            kc.execute("print(%i)\n%i * 2" % (i, i), timeout=TIMEOUT)
+            for i, kc in enumerate(kcs)
+        ]
+        raise gen.Return(results)
+
+    try:
+        results = loop.run_sync(run)
+    finally:
+        for kc, km in zip(kcs, kms):
+            kc.stop_channels()
+            km.shutdown_kernel(now=True)
+        loop.close()
+
+    for i, (reply, outputs) in enumerate(results):
+        nt.assert_equal(reply['content']['status'], 'ok')
+        msg_types = [ msg['msg_type'] for msg in outputs ]
+        nt.assert_equal(msg_types, ['stream', 'execute_result'])
+        nt.assert_equal(outputs[0]['content']['data'], '%i\n' % i)
+        nt.assert_equal(outputs[1]['content']['data']['text/plain'], str(i * 2))
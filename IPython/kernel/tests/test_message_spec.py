@@ -364,6 +364,7 @@ def test_complete():
     matches = reply['content']['matches']
     for name in ('alpha', 'albert'):
         nt.assert_in(name, matches)
+    nt.assert_in('python_matches', reply['content']['metadata']['matcher_times'])
 
 
 def test_kernel_info_request():
@@ -184,10 +184,15 @@ def do_execute(self, code, silent, store_history=True,
 
     def do_complete(self, code, cursor_pos):
         txt, matches = self.shell.complete('', code, cursor_pos)
+        completer = self.shell.Completer
+        metadata = {
+            'matcher_times' : completer.matcher_times,
+            'matchers_timed_out' : completer.matchers_timed_out,
+        }
         return {'matches' : matches,
                 'cursor_end' : cursor_pos,
                 'cursor_start' : cursor_pos - len(txt),
-                'metadata' : {},
+                'metadata' : metadata,
                 'status' : 'ok'}
 
     def do_inspect(self, code, cursor_pos, detail_level=0):
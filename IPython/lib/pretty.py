@@ -110,6 +110,7 @@ def _repr_pretty_(self, p, cycle):
 import re
 import datetime
 from collections import deque
+from weakref import WeakKeyDictionary
 
 from IPython.utils.py3compat import PY3
 
@@ -123,6 +124,8 @@ def _repr_pretty_(self, p, cycle):
     'for_type', 'for_type_by_name']
 
 
+MAX_SEQ_LENGTH = 1000
+
 _re_pattern_type = type(re.compile(''))
 
 def _failed_repr(obj, e):
@@ -180,22 +183,26 @@ def _safe_getattr(obj, attr, default=None):
     except Exception:
         return default
 
-def pretty(obj, verbose=False, max_width=79, newline='\n'):
+def pretty(obj, verbose=False, max_width=79, newline='\n',
+           max_seq_length=MAX_SEQ_LENGTH, max_output_length=None):
     """
     Pretty print the object's representation.
     """
     stream = StringIO()
-    printer = RepresentationPrinter(stream, verbose, max_width, newline)
+    printer = RepresentationPrinter(stream, verbose, max_width, newline,
+        max_seq_length=max_seq_length, max_output_length=max_output_length)
     printer.pretty(obj)
     printer.flush()
     return stream.getvalue()
 
 
-def pprint(obj, verbose=False, max_width=79, newline='\n'):
+def pprint(obj, verbose=False, max_width=79, newline='\n',
+           max_seq_length=MAX_SEQ_LENGTH, max_output_length=None):
     """
     Like `pretty` but print to stdout.
     """
-    printer = RepresentationPrinter(sys.stdout, verbose, max_width, newline)
+    printer = RepresentationPrinter(sys.stdout, verbose, max_width, newline,
+        max_seq_length=max_seq_length, max_output_length=max_output_length)
     printer.pretty(obj)
     printer.flush()
     sys.stdout.write(newline)
@@ -227,13 +234,23 @@ class PrettyPrinter(_PrettyPrinterBase):
     generate pretty reprs of objects.  Contrary to the `RepresentationPrinter`
     this printer knows nothing about the default pprinters or the `_repr_pretty_`
     callback method.
+
+    Containers print at most `max_seq_length` items. If `max_output_length`
+    is given, the output is truncated after about as many characters, and
+    nothing more is printed, so that printing huge objects stays cheap.
     """
 
-    def __init__(self, output, max_width=79, newline='\n', max_seq_length=1000):
+    def __init__(self, output, max_width=79, newline='\n',
+                 max_seq_length=MAX_SEQ_LENGTH, max_output_length=None):
         self.output = output
         self.max_width = max_width
         self.newline = newline
         self.max_seq_length = max_seq_length
+        self.max_output_length = max_output_length
+        # number of characters printed so far, and whether
+        # max_output_length was reached
+        self.output_length = 0
+        self.truncated = False
         self.output_width = 0
         self.buffer_width = 0
         self.buffer = deque()
@@ -257,8 +274,29 @@ def _break_outer_groups(self):
                 self.output_width = x.output(self.output, self.output_width)
                 self.buffer_width -= x.width
 
+    def _count_output(self, width):
+        """Count width characters of output against max_output_length
+
+        Returns the number of characters that can still be printed.
+        """
+        self.output_length += width
+        if not self.max_output_length or \
+                self.output_length <= self.max_output_length:
+            return width
+        self.truncated = True
+        return max(width - (self.output_length - self.max_output_length), 0)
+
     def text(self, obj):
         """Add literal text to the output."""
+        if self.truncated:
+            return
+        width = len(obj)
+        allowed = self._count_output(width)
+        if allowed < width:
+            obj = obj[:allowed] + '...'
+        self._text(obj)
+
+    def _text(self, obj):
         width = len(obj)
         if self.buffer:
             text = self.buffer[-1]
@@ -278,7 +316,14 @@ def breakable(self, sep=' '):
         will automatically break here.  If no breaking on this position takes
         place the `sep` is inserted which default to one space.
         """
+        if self.truncated:
+            return
         width = len(sep)
+        # count the width of a line break, in case the group is broken
+        counted = max(width, len(self.newline) + self.indentation)
+        if self._count_output(counted) < counted:
+            self._text('...')
+            return
         group = self.group_stack[-1]
         if group.want_break:
             self.flush()
@@ -295,6 +340,12 @@ def break_(self):
         """
         Explicitly insert a newline into the output, maintaining correct indentation.
         """
+        if self.truncated:
+            return
+        width = len(self.newline) + self.indentation
+        if self._count_output(width) < width:
+            self._text('...')
+            return
         self.flush()
         self.output.write(self.newline)
         self.output.write(' ' * self.indentation)
@@ -330,12 +381,21 @@ def begin_group(self, indent=0, open=''):
     def _enumerate(self, seq):
         """like enumerate, but with an upper limit on the number of items"""
         for idx, x in enumerate(seq):
+            if self.truncated:
+                return
             if self.max_seq_length and idx >= self.max_seq_length:
                 self.text(',')
                 self.breakable()
                 self.text('...')
-                raise StopIteration
+                return
             yield idx, x
+
+    def _too_long(self, seq):
+        """Whether only part of seq will be printed
+
+        Such sequences are not sorted, their first items are printed.
+        """
+        return bool(self.max_seq_length) and len(seq) > self.max_seq_length
     
     def end_group(self, dedent=0, close=''):
         """End a group. See `begin_group` for more details."""
@@ -354,20 +414,32 @@ def flush(self):
         self.buffer_width = 0
 
 
+# MROs of old-style classes, without the class itself, which would otherwise
+# keep the weak key alive.
+_old_style_mros = WeakKeyDictionary()
+
 def _get_mro(obj_class):
     """ Get a reasonable method resolution order of a class and its superclasses
     for both old-style and new-style classes.
     """
     if not hasattr(obj_class, '__mro__'):
+        try:
+            return (obj_class,) + _old_style_mros[obj_class]
+        except (KeyError, TypeError):
+            pass
         # Old-style class. Mix in object to make a fake new-style class.
         try:
-            obj_class = type(obj_class.__name__, (obj_class, object), {})
+            fake_class = type(obj_class.__name__, (obj_class, object), {})
         except TypeError:
             # Old-style extension type that does not descend from object.
             # FIXME: try to construct a more thorough MRO.
             mro = [obj_class]
         else:
-            mro = obj_class.__mro__[1:-1]
+            mro = fake_class.__mro__[1:-1]
+            try:
+                _old_style_mros[obj_class] = mro[1:]
+            except TypeError:
+                pass
     else:
         mro = obj_class.__mro__
     return mro
@@ -389,9 +461,11 @@ class RepresentationPrinter(PrettyPrinter):
     """
 
     def __init__(self, output, verbose=False, max_width=79, newline='\n',
-        singleton_pprinters=None, type_pprinters=None, deferred_pprinters=None):
+        singleton_pprinters=None, type_pprinters=None, deferred_pprinters=None,
+        max_seq_length=MAX_SEQ_LENGTH, max_output_length=None):
 
-        PrettyPrinter.__init__(self, output, max_width, newline)
+        PrettyPrinter.__init__(self, output, max_width, newline,
+            max_seq_length=max_seq_length, max_output_length=max_output_length)
         self.verbose = verbose
         self.stack = []
         if singleton_pprinters is None:
@@ -403,9 +477,14 @@ def __init__(self, output, verbose=False, max_width=79, newline='\n',
         if deferred_pprinters is None:
             deferred_pprinters = _deferred_type_pprinters.copy()
         self.deferred_pprinters = deferred_pprinters
+        # {class: printer}, so that the MRO of the class of every item in a
+        # large container isn't walked again.
+        self._printer_cache = {}
 
     def pretty(self, obj):
         """Pretty print the given object."""
+        if self.truncated:
+            return
         obj_id = id(obj)
         cycle = obj_id in self.stack
         self.stack.append(obj_id)
@@ -419,32 +498,44 @@ def pretty(self, obj):
                 pass
             else:
                 return printer(obj, self, cycle)
-            # Next walk the mro and check for either:
-            #   1) a registered printer
-            #   2) a _repr_pretty_ method
-            for cls in _get_mro(obj_class):
-                if cls in self.type_pprinters:
-                    # printer registered in self.type_pprinters
-                    return self.type_pprinters[cls](obj, self, cycle)
-                else:
-                    # deferred printer
-                    printer = self._in_deferred_types(cls)
-                    if printer is not None:
-                        return printer(obj, self, cycle)
-                    else:
-                        # Finally look for special method names.
-                        # Some objects automatically create any requested
-                        # attribute. Try to ignore most of them by checking for
-                        # callability.
-                        if '_repr_pretty_' in cls.__dict__:
-                            meth = cls._repr_pretty_
-                            if callable(meth):
-                                return meth(obj, self, cycle)
-            return _default_pprint(obj, self, cycle)
+            try:
+                printer = self._printer_cache.get(obj_class)
+            except TypeError:
+                printer = self._lookup_printer(obj_class)
+            else:
+                if printer is None:
+                    printer = self._printer_cache[obj_class] = \
+                        self._lookup_printer(obj_class)
+            return printer(obj, self, cycle)
         finally:
             self.end_group()
             self.stack.pop()
 
+    def _lookup_printer(self, obj_class):
+        """Find the printer for the instances of a class"""
+        # Walk the mro and check for either:
+        #   1) a registered printer
+        #   2) a _repr_pretty_ method
+        for cls in _get_mro(obj_class):
+            if cls in self.type_pprinters:
+                # printer registered in self.type_pprinters
+                return self.type_pprinters[cls]
+            else:
+                # deferred printer
+                printer = self._in_deferred_types(cls)
+                if printer is not None:
+                    return printer
+                else:
+                    # Finally look for special method names.
+                    # Some objects automatically create any requested
+                    # attribute. Try to ignore most of them by checking for
+                    # callability.
+                    if '_repr_pretty_' in cls.__dict__:
+                        meth = cls._repr_pretty_
+                        if callable(meth):
+                            return meth
+        return _default_pprint
+
     def _in_deferred_types(self, cls):
         """
         Check if the given class is specified in the deferred type registry.
@@ -639,13 +730,16 @@ def inner(obj, p, cycle):
         else:
             step = len(start)
             p.begin_group(step, start)
-            # Like dictionary keys, we will try to sort the items.
-            items = list(obj)
-            try:
-                items.sort()
-            except Exception:
-                # Sometimes the items don't sort.
-                pass
+            if p._too_long(obj):
+                items = obj
+            else:
+                # Like dictionary keys, we will try to sort the items.
+                items = list(obj)
+                try:
+                    items.sort()
+                except Exception:
+                    # Sometimes the items don't sort.
+                    pass
             for idx, x in p._enumerate(items):
                 if idx:
                     p.text(',')
@@ -669,12 +763,16 @@ def inner(obj, p, cycle):
         if cycle:
             return p.text('{...}')
         p.begin_group(1, start)
-        keys = obj.keys()
-        try:
-            keys.sort()
-        except Exception as e:
-            # Sometimes the keys don't sort.
-            pass
+        if p._too_long(obj):
+            # don't build the list of all keys on Python 2
+            keys = _safe_getattr(obj, 'iterkeys', obj.keys)()
+        else:
+            keys = obj.keys()
+            try:
+                keys.sort()
+            except Exception as e:
+                # Sometimes the keys don't sort.
+                pass
         for idx, key in p._enumerate(keys):
             if idx:
                 p.text(',')
@@ -228,4 +228,36 @@ def test_long_dict():
 
 def test_unbound_method():
     output = pretty.pretty(MyObj.somemethod)
-    nt.assert_in('MyObj.somemethod', output)
\ No newline at end of file
+    nt.assert_in('MyObj.somemethod', output)
+def test_printer_cache():
+    # items of the same class share the printer lookup
+    lis = [Dummy1(), Dummy2(), Dummy1()]
+    stream = pretty.StringIO()
+    printer = pretty.RepresentationPrinter(stream)
+    printer.pretty(lis)
+    printer.flush()
+    nt.assert_equal(stream.getvalue(), '[Dummy1(...), Dummy1(...), Dummy1(...)]')
+    nt.assert_in(Dummy1, printer._printer_cache)
+    nt.assert_in(Dummy2, printer._printer_cache)
+
+def test_long_dict_not_sorted():
+    class Unsortable(object):
+        def __lt__(self, other):
+            raise AssertionError("huge dicts shouldn't be sorted")
+        __gt__ = __lt__
+        def __repr__(self):
+            return 'U'
+    d = dict((Unsortable(), n) for n in range(2000))
+    p = pretty.pretty(d)
+    nt.assert_equal(p.count('U: '), 1000)
+    s = pretty.pretty(set(d))
+    nt.assert_equal(s.count('U'), 1000)
+
+def test_max_output_length():
+    nested = [[list(range(1000))] * 1000] * 1000
+    p = pretty.pretty(nested, max_output_length=10000)
+    nt.assert_true(len(p) <= 10003)
+    nt.assert_true(p.endswith('...'))
+    nt.assert_equal(pretty.pretty('x' * 100, max_output_length=5), "'xxxx...")
+    # short outputs are unchanged
+    nt.assert_equal(pretty.pretty([1, 2], max_output_length=10), '[1, 2]')
@@ -18,13 +18,16 @@
 
 # Stdlib imports
 import os
+from collections import OrderedDict
 
 # other libs/dependencies are imported at runtime
 # to move ImportErrors to runtime when the requirement is actually needed
 
 # IPython imports
+from IPython.config.configurable import Configurable
 from IPython.utils.traitlets import MetaHasTraits, Unicode, List, Dict, Any
 from IPython.utils.importstring import import_item
+from IPython.utils.path import locate_profile, ensure_dir_exists
 from IPython.utils import py3compat, text
 
 from IPython.nbconvert import filters
@@ -47,8 +50,8 @@
         'highlight2latex': filters.Highlight2Latex,
         'ipython2python': filters.ipython2python,
         'posix_path': filters.posix_path,
-        'markdown2latex': filters.markdown2latex,
-        'markdown2rst': filters.markdown2rst,
+        'markdown2latex': filters.Markdown2Latex,
+        'markdown2rst': filters.Markdown2RST,
         'comment_lines': filters.comment_lines,
         'strip_ansi': filters.strip_ansi,
         'strip_dollars': filters.strip_dollars,
@@ -67,6 +70,21 @@
 #-----------------------------------------------------------------------------
 # Class
 #-----------------------------------------------------------------------------
+# Jinja environments, with their filters and compiled templates,
+# shared by the exporters with the same settings
+_environments = OrderedDict()
+_max_environments = 32
+
+
+def _config_key(config):
+    """A hashable key for a Config, independent of the order of its items"""
+    if isinstance(config, dict):
+        # skip the empty sections created by looking them up
+        return tuple(sorted((key, _config_key(value))
+                            for key, value in config.items()
+                            if value or not isinstance(value, dict)))
+    return repr(config)
+
 
 class TemplateExporter(Exporter):
     """
@@ -126,6 +144,16 @@ def _template_path_changed(self, name, old, new):
         help="""Dictionary of filters, by name and namespace, to add to the Jinja
         environment.""")
 
+    template_cache_dir = Unicode(config=True,
+        help="""Directory where compiled templates are cached between runs.
+        Defaults to a directory in the default profile. Set to '' to disable."""
+    )
+    def _template_cache_dir_default(self):
+        try:
+            return os.path.join(locate_profile(), 'nbconvert_template_cache')
+        except IOError:
+            return u''
+
     raw_mimetypes = List(config=True,
         help="""formats of raw cells to be included in this Exporter's output."""
     )
@@ -151,8 +179,49 @@ def __init__(self, config=None, extra_loaders=None, **kw):
 
         #Init
         self._init_template()
-        self._init_environment(extra_loaders=extra_loaders)
-        self._init_filters()
+        # Exporters with the same settings share their Jinja environment,
+        # unless they have their own loaders.
+        key = None if extra_loaders else self._environment_key()
+        self.environment = _environments.get(key)
+        if self.environment is None:
+            self._init_environment(extra_loaders=extra_loaders)
+            self._init_filters()
+            if key is not None:
+                self._detach_filters()
+                _environments[key] = self.environment
+                while len(_environments) > _max_environments:
+                    _environments.popitem(last=False)
+        self._shared_environment = key is not None
+
+    def _environment_key(self):
+        """The settings that determine the Jinja environment of this exporter"""
+        jinja_syntax = tuple(getattr(self, name) for name in sorted(self.trait_names())
+                             if name.startswith('jinja_'))
+        return (type(self), tuple(self._template_paths()), jinja_syntax,
+                self.template_cache_dir, _config_key(self.filters),
+                _config_key(self.config))
+
+    def _detach_filters(self):
+        """Detach the configurable filters from this exporter,
+        so that a shared environment doesn't keep it alive.
+
+        The filters have already loaded their config through this exporter.
+        """
+        for jinja_filter in self.environment.filters.values():
+            if isinstance(jinja_filter, Configurable) and jinja_filter.parent is self:
+                jinja_filter.parent = None
+
+    def _template_paths(self):
+        # absolute, since a shared environment may outlive the working directory
+        return [ os.path.abspath(path) for path in self.template_path ]
+
+    def _unshare_environment(self):
+        """Give this exporter an environment of its own,
+        before changing it."""
+        self.environment = self.environment.overlay()
+        self.environment.filters = dict(self.environment.filters)
+        self._shared_environment = False
+        self.template = None
 
 
     def _load_template(self):
@@ -208,6 +277,7 @@ def from_notebook_node(self, nb, resources=None, **kw):
         resources.setdefault('raw_mimetypes', self.raw_mimetypes)
 
         self._load_template()
+        self._prefetch_markdown(nb_copy)
 
         if self.template is not None:
             output = self.template.render(nb=nb_copy, resources=resources)
@@ -216,6 +286,26 @@ def from_notebook_node(self, nb, resources=None, **kw):
         return output, resources
 
 
+    def _prefetch_markdown(self, nb):
+        """Give the markdown cells of a notebook to the filters with a
+        `prefetch` method, so that they can convert them all at once.
+        """
+        sources = [ cell.source for worksheet in nb.worksheets
+                    for cell in worksheet.cells if cell.cell_type == 'markdown' ]
+        if not sources:
+            return
+        filters = self.environment.filters
+        for jinja_filter in set(filters.values()):
+            prefetch = getattr(jinja_filter, 'prefetch', None)
+            if prefetch is None:
+                continue
+            filtered = sources
+            # apply the filters the templates pipe sources through first
+            for name in getattr(jinja_filter, 'prefetch_filters', ()):
+                if name in filters:
+                    filtered = [ filters[name](source) for source in filtered ]
+            prefetch(filtered)
+
     def register_filter(self, name, jinja_filter):
         """
         Register a filter.
@@ -230,6 +320,8 @@ def register_filter(self, name, jinja_filter):
         """
         if jinja_filter is None:
             raise TypeError('filter')
+        if getattr(self, '_shared_environment', False):
+            self._unshare_environment()
         isclass = isinstance(jinja_filter, type)
         constructed = not isclass
 
@@ -274,20 +366,34 @@ def _init_environment(self, extra_loaders=None):
         """
         Create the Jinja templating environment.
         """
-        from jinja2 import Environment, ChoiceLoader, FileSystemLoader
+        from jinja2 import (Environment, ChoiceLoader, FileSystemLoader,
+                            FileSystemBytecodeCache)
         here = os.path.dirname(os.path.realpath(__file__))
         loaders = []
         if extra_loaders:
             loaders.extend(extra_loaders)
 
-        paths = self.template_path
+        paths = self._template_paths()
         paths.extend([os.path.join(here, self.default_template_path),
                       os.path.join(here, self.template_skeleton_path)])
         loaders.append(FileSystemLoader(paths))
 
+        bytecode_cache = None
+        if self.template_cache_dir:
+            try:
+                ensure_dir_exists(self.template_cache_dir)
+            except OSError:
+                self.log.warn("Could not create template cache directory %s",
+                              self.template_cache_dir)
+            else:
+                bytecode_cache = FileSystemBytecodeCache(self.template_cache_dir)
+
+        # templates are reloaded when their files change (auto_reload)
         self.environment = Environment(
             loader= ChoiceLoader(loaders),
-            extensions=JINJA_EXTENSIONS
+            extensions=JINJA_EXTENSIONS,
+            bytecode_cache=bytecode_cache,
+            auto_reload=True,
             )
         
         #Set special Jinja2 syntax that will not conflict with latex.
@@ -99,3 +99,29 @@ def test_very_long_cells(self):
 
             (output, resources) = LatexExporter(template_file='article').from_filename(nbfile)            
             assert len(output) > 0
+
+    def test_prefetch_filtered_markdown(self):
+        """
+        Are markdown cells prefetched as the template filters them?
+        """
+        class RecordingConverter(object):
+            prefetch_filters = ('citation2latex', 'strip_files_prefix')
+            def __init__(self):
+                self.prefetched = None
+                self.converted = []
+            def prefetch(self, sources):
+                self.prefetched = sources
+            def __call__(self, source):
+                self.converted.append(source)
+                return source
+
+        converter = RecordingConverter()
+        exporter = LatexExporter()
+        exporter.register_filter('markdown2latex', converter)
+        nb = current.new_notebook(worksheets=[current.new_worksheet(cells=[
+            current.new_text_cell('markdown', source=u'![a](files/a.png) <cite data-cite="x">y</cite>'),
+            current.new_text_cell('markdown', source=u'plain'),
+        ])])
+        exporter.from_notebook_node(nb)
+        self.assertEqual(converter.prefetched, converter.converted)
+        self.assertEqual(converter.prefetched[0], u'![a](a.png) \\cite{x}')
@@ -14,11 +14,19 @@
 # Imports
 #-----------------------------------------------------------------------------
 
+import collections
+import gc
+import os
+import time
+import weakref
+
 from IPython.config import Config
+from IPython.utils.tempdir import TemporaryDirectory
 
 from .base import ExportersTestsBase
 from .cheese import CheesePreprocessor
 from ..templateexporter import TemplateExporter
+from ..html import HTMLExporter
 
 
 #-----------------------------------------------------------------------------
@@ -53,7 +61,7 @@ def test_extract_outputs(self):
         exporter = self._make_exporter(config=config)
         (output, resources) = exporter.from_filename(self._get_notebook())
         assert resources is not None
-        assert isinstance(resources['outputs'], dict)
+        assert isinstance(resources['outputs'], collections.Mapping)
         assert len(resources['outputs']) > 0
 
 
@@ -101,6 +109,71 @@ def test_preprocessor_via_method(self):
         assert resources['cheese'] == 'real'
 
 
+    def test_shared_environment(self):
+        """
+        Do exporters with the same settings share their Jinja environment?
+        """
+        a = HTMLExporter()
+        b = HTMLExporter()
+        assert a.environment is b.environment
+        c = HTMLExporter(config=Config({'HTMLExporter': {'jinja_comment_block_start': '((='}}))
+        assert c.environment is not a.environment
+        d = HTMLExporter(config=Config({'Highlight2HTML': {'default_language': 'ruby'}}))
+        assert d.environment is not a.environment
+        (output, resources) = b.from_filename(self._get_notebook())
+        assert len(output) > 0
+
+
+    def test_shared_environment_releases_exporter(self):
+        """
+        Does a shared Jinja environment let its first exporter go?
+        """
+        a = HTMLExporter(config=Config({'Highlight2HTML': {'cache_size': 10}}))
+        environment = a.environment
+        assert environment.filters['highlight2html'].cache_size == 10
+        ref = weakref.ref(a)
+        del a
+        gc.collect()
+        assert ref() is None
+        b = HTMLExporter(config=Config({'Highlight2HTML': {'cache_size': 10}}))
+        assert b.environment is environment
+
+
+    def test_register_filter_unshares_environment(self):
+        """
+        Does registering a filter leave the other exporters' environment alone?
+        """
+        a = HTMLExporter()
+        b = HTMLExporter()
+        b.register_filter('cheese', lambda text: 'cheese')
+        assert b.environment is not a.environment
+        assert 'cheese' in b.environment.filters
+        assert 'cheese' not in a.environment.filters
+        assert HTMLExporter().environment is a.environment
+
+
+    def test_template_changes(self):
+        """
+        Are template changes picked up by new exporters?
+        """
+        with TemporaryDirectory() as td:
+            path = os.path.join(td, 'changing.tpl')
+            with open(path, 'w') as f:
+                f.write('first')
+            config = Config({'TemplateExporter': {'template_path': [td]}})
+            exporter = TemplateExporter(config=config, template_file='changing')
+            (output, resources) = exporter.from_filename(self._get_notebook())
+            assert output == 'first'
+
+            with open(path, 'w') as f:
+                f.write('second')
+            mtime = time.time() + 10
+            os.utime(path, (mtime, mtime))
+            exporter = TemplateExporter(config=config, template_file='changing')
+            (output, resources) = exporter.from_filename(self._get_notebook())
+            assert output == 'second'
+
+
     def _make_exporter(self, config=None):
         # Create the exporter instance, make sure to set a template name since
         # the base TemplateExporter doesn't have a template associated with it.
@@ -10,7 +10,13 @@
 # because errors should be raised at runtime if it's actually needed,
 # not import time, when it may not be needed.
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 from IPython.nbconvert.utils.base import NbConvertBase
+from IPython.utils.py3compat import cast_bytes
+from IPython.utils.traitlets import Integer
 
 MULTILINE_OUTPUTS = ['text', 'html', 'svg', 'latex', 'javascript', 'json']
 
@@ -19,7 +25,57 @@
     'Highlight2Latex'
 ]
 
-class Highlight2HTML(NbConvertBase):
+class _Highlighter(NbConvertBase):
+    """Base class for the highlight filters, caching their formatters
+    and, optionally, their output.
+
+    A filter can be shared between threads, e.g. by the exporters
+    sharing a Jinja environment.
+    """
+
+    cache_size = Integer(0, config=True,
+        help="""The number of highlighted sources to keep, so that the same
+        source is highlighted only once by this filter, across notebooks.
+        0 disables the cache."""
+    )
+
+    def _cache_size_changed(self, name, old, new):
+        self._prune_cache()
+
+    def __init__(self, **kw):
+        self._cache = OrderedDict()
+        self._formatters = {}
+        self._lock = threading.Lock()
+        super(_Highlighter, self).__init__(**kw)
+
+    def _prune_cache(self):
+        with self._lock:
+            while len(self._cache) > max(self.cache_size, 0):
+                self._cache.popitem(last=False)
+
+    def _highlight(self, source, formatter_key, make_formatter, language, metadata):
+        """Highlight source, with the formatter cached under formatter_key"""
+        with self._lock:
+            formatter = self._formatters.get(formatter_key)
+            if formatter is None:
+                formatter = self._formatters[formatter_key] = make_formatter()
+        if self.cache_size <= 0:
+            return _pygments_highlight(source, formatter, language, metadata)
+
+        key = (hashlib.sha1(cast_bytes(source)).hexdigest(),
+               _magics_language(language, metadata), formatter_key)
+        with self._lock:
+            output = self._cache.pop(key, None)
+        if output is None:
+            output = _pygments_highlight(source, formatter, language, metadata)
+        with self._lock:
+            # (re)insert as the most recently used
+            self._cache[key] = output
+        self._prune_cache()
+        return output
+
+
+class Highlight2HTML(_Highlighter):
 
     def __call__(self, source, language=None, metadata=None):
         """
@@ -38,13 +94,13 @@ def __call__(self, source, language=None, metadata=None):
         if not language:
             language=self.default_language
 
-        return _pygments_highlight(source if len(source) > 0 else ' ',
-                                   # needed to help post processors:
-                                   HtmlFormatter(cssclass=" highlight hl-"+language),
-                                   language, metadata)
+        return self._highlight(source if len(source) > 0 else ' ', language,
+                               # needed to help post processors:
+                               lambda : HtmlFormatter(cssclass=" highlight hl-"+language),
+                               language, metadata)
 
 
-class Highlight2Latex(NbConvertBase):
+class Highlight2Latex(_Highlighter):
 
     def __call__(self, source, language=None, metadata=None, strip_verbatim=False):
         """
@@ -65,7 +121,7 @@ def __call__(self, source, language=None, metadata=None, strip_verbatim=False):
         if not language:
             language=self.default_language
 
-        latex = _pygments_highlight(source, LatexFormatter(), language, metadata)
+        latex = self._highlight(source, None, LatexFormatter, language, metadata)
         if strip_verbatim:
             latex = latex.replace(r'\begin{Verbatim}[commandchars=\\\{\}]' + '\n', '')
             return latex.replace('\n\\end{Verbatim}\n', '')
@@ -74,6 +130,33 @@ def __call__(self, source, language=None, metadata=None, strip_verbatim=False):
 
 
 
+# lexers, by language
+_lexers = {}
+
+def _get_lexer(language):
+    """Return the lexer for a language, creating it once"""
+    lexer = _lexers.get(language)
+    if lexer is None:
+        from pygments.lexers import get_lexer_by_name
+        from IPython.nbconvert.utils.lexers import IPythonLexer
+        if language == 'ipython':
+            lexer = IPythonLexer()
+        else:
+            lexer = get_lexer_by_name(language, stripall=True)
+        _lexers[language] = lexer
+    return lexer
+
+
+def _magics_language(language, metadata):
+    """The language of a cell using a magic extension language"""
+    if language == 'ipython' \
+        and metadata \
+        and 'magics_language' in metadata:
+
+        language = metadata['magics_language']
+    return language
+
+
 def _pygments_highlight(source, output_formatter, language='ipython', metadata=None):
     """
     Return a syntax-highlighted version of the input source
@@ -89,20 +172,8 @@ def _pygments_highlight(source, output_formatter, language='ipython', metadata=N
         metadata of the cell to highlight
     """
     from pygments import highlight
-    from pygments.lexers import get_lexer_by_name
-    from IPython.nbconvert.utils.lexers import IPythonLexer
 
     # If the cell uses a magic extension language,
     # use the magic language instead.
-    if language == 'ipython' \
-        and metadata \
-        and 'magics_language' in metadata:
-
-        language = metadata['magics_language']
-
-    if language == 'ipython':
-        lexer = IPythonLexer()
-    else:
-        lexer = get_lexer_by_name(language, stripall=True)
-
-    return highlight(source, lexer, output_formatter)
+    language = _magics_language(language, metadata)
+    return highlight(source, _get_lexer(language), output_formatter)
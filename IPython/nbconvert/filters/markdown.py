@@ -21,7 +21,8 @@
 from pygments.util import ClassNotFound
 
 # IPython imports
-from IPython.nbconvert.utils.pandoc import pandoc
+from IPython.nbconvert.utils.pandoc import pandoc, PandocConverter
+from IPython.nbconvert.utils.converter import ConverterProcess
 from IPython.nbconvert.utils.exceptions import ConversionException
 from IPython.utils.decorators import undoc
 from IPython.utils.process import get_output_error_code
@@ -39,6 +40,10 @@
     'markdown2html_mistune',
     'markdown2latex',
     'markdown2rst',
+    'Markdown2Latex',
+    'Markdown2RST',
+    'Markdown2HTMLPandoc',
+    'Markdown2HTMLMarked',
 ]
 
 class NodeJSMissing(ConversionException):
@@ -185,6 +190,20 @@ def markdown2html_marked(source, encoding='utf-8'):
     out = TextIOWrapper(BytesIO(out), encoding, 'replace').read()
     return out.rstrip('\n')
 
+class Markdown2HTMLMarked(ConverterProcess):
+    """Convert markdown strings to HTML via marked,
+    with a single node.js process.
+    """
+    def __init__(self, encoding='utf-8'):
+        super(Markdown2HTMLMarked, self).__init__(
+            [_find_nodejs(), marked, '--stream'], encoding)
+
+    def missing(self, error):
+        return NodeJSMissing(
+            "The command '%s' returned an error: %s.\n" % (" ".join(self.command), error) +
+            "Please check that Node.js is installed."
+        )
+
 # The mistune renderer is the default, because it's simple to depend on it
 markdown2html = markdown2html_mistune
 
@@ -206,6 +225,24 @@ def markdown2rst(source):
     """
     return pandoc(source, 'markdown', 'rst')
 
+class Markdown2Latex(PandocConverter):
+    """Convert markdown strings to LaTeX via pandoc, caching the results"""
+    fmt = 'markdown'
+    to = 'latex'
+    # as piped by the markdown cells of the LaTeX templates
+    prefetch_filters = ('citation2latex', 'strip_files_prefix')
+
+class Markdown2RST(PandocConverter):
+    """Convert markdown strings to ReST via pandoc, caching the results"""
+    fmt = 'markdown'
+    to = 'rst'
+
+class Markdown2HTMLPandoc(PandocConverter):
+    """Convert markdown strings to HTML via pandoc, caching the results"""
+    fmt = 'markdown'
+    to = 'html'
+    extra_args = ['--mathjax']
+
 def _verify_node(cmd):
     """Verify that the node command exists and is at least the minimum supported
     version of node.
@@ -44,6 +44,42 @@ requirejs([
         }
     });
 
+    var md2html = function (md) {
+        var text_and_math = mathjaxutils.remove_math(md);
+        var text = text_and_math[0];
+        var math = text_and_math[1];
+        var html = marked.parser(marked.lexer(text));
+        return mathjaxutils.replace_math(html, math);
+    };
+
+    if (process.argv.indexOf('--stream') !== -1) {
+        // convert many documents, each framed on stdin and stdout
+        // by its length in bytes and a newline
+        var buffer = new Buffer(0);
+        process.stdin.on("data", function (data) {
+            buffer = Buffer.concat([buffer, data]);
+            while (true) {
+                var newline = 0;
+                while (newline < buffer.length && buffer[newline] !== 10) {
+                    newline++;
+                }
+                if (newline === buffer.length) {
+                    break;
+                }
+                var size = parseInt(buffer.slice(0, newline).toString(), 10);
+                if (buffer.length < newline + 1 + size) {
+                    break;
+                }
+                var md = buffer.slice(newline + 1, newline + 1 + size).toString('utf8');
+                buffer = buffer.slice(newline + 1 + size);
+                var html = new Buffer(md2html(md), 'utf8');
+                process.stdout.write(html.length + '\n');
+                process.stdout.write(html);
+            }
+        });
+        return;
+    }
+
     // read the markdown from stdin
     var md='';
     process.stdin.on("data", function (data) {
@@ -52,12 +88,7 @@ requirejs([
 
     // perform the md2html transform once stdin is complete
     process.stdin.on("end", function () {
-        var text_and_math = mathjaxutils.remove_math(md);
-        var text = text_and_math[0];
-        var math = text_and_math[1];
-        var html = marked.parser(marked.lexer(text));
-        html = mathjaxutils.replace_math(html, math);
-        process.stdout.write(html);
+        process.stdout.write(md2html(md));
     });
 
 });
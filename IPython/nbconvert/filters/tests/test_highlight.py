@@ -78,6 +78,34 @@ def test_parse_html_many_lang(self):
             root = xml.etree.ElementTree.fromstring(lang)
             assert self._extract_tokens(root,'k') == set(tkns)
 
+    def test_highlight_cache(self):
+        """Is highlighted output cached, up to cache_size sources?"""
+        h = Highlight2HTML(cache_size=2)
+        first = h(self.tests[0])
+        self.assertEqual(h(self.tests[0]), first)
+        self.assertEqual(len(h._cache), 1)
+        # the same source in another language is cached separately
+        rb = h(self.tests[0], 'ruby')
+        self.assertNotEqual(rb, first)
+        self.assertEqual(len(h._cache), 2)
+        # the least recently used source is evicted
+        h(self.tests[0])
+        h(self.tests[1])
+        self.assertEqual(len(h._cache), 2)
+        self.assertNotIn('ruby', [key[1] for key in h._cache])
+        h.cache_size = 0
+        self.assertEqual(len(h._cache), 0)
+        self.assertEqual(h(self.tests[0]), first)
+        self.assertEqual(len(h._cache), 0)
+
+    def test_highlight_magics_language_cache(self):
+        """Are cells using magic languages cached under their language?"""
+        h = Highlight2Latex(cache_size=10)
+        python = h(self.tests[0])
+        ruby = h(self.tests[0], metadata={'magics_language': 'ruby'})
+        self.assertNotEqual(python, ruby)
+        self.assertEqual(h(self.tests[0]), python)
+
     def _extract_tokens(self, root, cls):
         return set(map(lambda x:x.text,root.findall(".//*[@class='"+cls+"']")))
 
@@ -13,12 +13,14 @@
 import sys
 import os
 import glob
+import time
+import traceback
 
 from IPython.core.application import BaseIPythonApplication, base_aliases, base_flags
 from IPython.core.profiledir import ProfileDir
 from IPython.config import catch_config_error, Configurable
 from IPython.utils.traitlets import (
-    Unicode, List, Instance, DottedObjectName, Type, CaselessStrEnum,
+    Unicode, List, Instance, DottedObjectName, Type, CaselessStrEnum, Integer,
 )
 from IPython.utils.importstring import import_item
 
@@ -31,6 +33,33 @@
 #Classes and functions
 #-----------------------------------------------------------------------------
 
+# The exporter of a worker process, used by _convert_in_worker
+_worker_exporter = None
+
+def _init_worker(export_format, config):
+    """Create the exporter of a worker process"""
+    global _worker_exporter
+    _worker_exporter = exporter_map[export_format](config=config)
+
+def _convert(exporter, notebook_filename, resources):
+    """Convert a notebook, catching errors
+
+    Returns (output, resources, elapsed time, error), where error is None,
+    or a (is_conversion_error, formatted traceback) tuple.
+    """
+    start = time.time()
+    try:
+        output, resources = exporter.from_filename(notebook_filename,
+                                                   resources=resources)
+    except Exception as e:
+        error = (isinstance(e, ConversionException), traceback.format_exc())
+        return None, resources, time.time() - start, error
+    return output, resources, time.time() - start, None
+
+def _convert_in_worker(args):
+    return _convert(_worker_exporter, *args)
+
+
 class DottedOrNone(DottedObjectName):
     """
     A string holding a valid dotted object name in Python, such as A.b3._c
@@ -53,6 +82,7 @@ def validate(self, obj, value):
     'post': 'NbConvertApp.postprocessor_class',
     'output': 'NbConvertApp.output_base',
     'reveal-prefix': 'RevealHelpPreprocessor.url_prefix',
+    'jobs': 'NbConvertApp.jobs',
 })
 
 nbconvert_flags = {}
@@ -130,6 +160,10 @@ def _classes_default(self):
   
         > ipython nbconvert notebook*.ipynb
         > ipython nbconvert notebook1.ipynb notebook2.ipynb
+
+        which can be converted in parallel, in 4 processes here
+        
+        > ipython nbconvert --jobs 4 notebook*.ipynb
         
         or you can specify the notebooks list in a config file, containing::
         
@@ -185,6 +219,12 @@ def _postprocessor_class_changed(self, name, old, new):
                      Filenames passed positionally will be added to the list.
                      """)
 
+    jobs = Integer(1, config=True, help="""The number of notebooks to convert
+                   in parallel, in a pool of processes. Each process creates
+                   its own exporter from the configuration. The results are
+                   written, and errors reported, in the order of the notebooks.
+                   """)
+
     @catch_config_error
     def initialize(self, argv=None):
         self.init_syspath()
@@ -255,6 +295,27 @@ def start(self):
         super(NbConvertApp, self).start()
         self.convert_notebooks()
 
+    def notebook_resources(self, notebook_filename, exporter):
+        """Return the initial resources of a notebook
+
+        resources['unique_key'] is the name of its output.
+        """
+        # Get a unique key for the notebook and set it in the resources object.
+        basename = os.path.basename(notebook_filename)
+        notebook_name = basename[:basename.rfind('.')]
+        if self.output_base:
+            # strip duplicate extension from output_base, to avoid Basname.ext.ext
+            if getattr(exporter, 'file_extension', False):
+                base, ext = os.path.splitext(self.output_base)
+                if ext == '.' + exporter.file_extension:
+                    self.output_base = base
+            notebook_name = self.output_base
+        resources = {}
+        resources['profile_dir'] = self.profile_dir.location
+        resources['unique_key'] = notebook_name
+        resources['output_files_dir'] = '%s_files' % notebook_name
+        return resources
+
     def convert_notebooks(self):
         """
         Convert the notebooks in the self.notebook traitlet
@@ -271,44 +332,66 @@ def convert_notebooks(self):
         
         exporter = exporter_map[self.export_format](config=self.config)
 
+        tasks = []
         for notebook_filename in self.notebooks:
-            self.log.info("Converting notebook %s to %s", notebook_filename, self.export_format)
-
-            # Get a unique key for the notebook and set it in the resources object.
-            basename = os.path.basename(notebook_filename)
-            notebook_name = basename[:basename.rfind('.')]
-            if self.output_base:
-                # strip duplicate extension from output_base, to avoid Basname.ext.ext
-                if getattr(exporter, 'file_extension', False):
-                    base, ext = os.path.splitext(self.output_base)
-                    if ext == '.' + exporter.file_extension:
-                        self.output_base = base
-                notebook_name = self.output_base
-            resources = {}
-            resources['profile_dir'] = self.profile_dir.location
-            resources['unique_key'] = notebook_name
-            resources['output_files_dir'] = '%s_files' % notebook_name
-            self.log.info("Support files will be in %s", os.path.join(resources['output_files_dir'], ''))
-
-            # Try to export
-            try:
-                output, resources = exporter.from_filename(notebook_filename, resources=resources)
-            except ConversionException as e:
-                self.log.error("Error while converting '%s'", notebook_filename,
-                      exc_info=True)
-                self.exit(1)
-            else:
-                write_results = self.writer.write(output, resources, notebook_name=notebook_name)
-
-                #Post-process if post processor has been defined.
-                if hasattr(self, 'postprocessor') and self.postprocessor:
-                    self.postprocessor(write_results)
-                conversion_success += 1
+            resources = self.notebook_resources(notebook_filename, exporter)
+            tasks.append((notebook_filename, resources))
+
+        pool = None
+        jobs = min(self.jobs, len(tasks))
+        if jobs > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(jobs, _init_worker,
+                                        (self.export_format, self.config))
+            results = pool.imap(_convert_in_worker, tasks)
+        else:
+            results = (_convert(exporter, *task) for task in tasks)
+
+        timings = []
+        try:
+            for notebook_filename, resources in tasks:
+                self.log.info("Converting notebook %s to %s", notebook_filename, self.export_format)
+                self.log.info("Support files will be in %s", os.path.join(resources['output_files_dir'], ''))
+                output, resources, elapsed, error = next(results)
+                timings.append((notebook_filename, elapsed))
+
+                if error is not None:
+                    is_conversion_error, tb = error
+                    if is_conversion_error:
+                        msg = "Error while converting '%s':\n%s"
+                    else:
+                        msg = "Unexpected error while converting '%s':\n%s"
+                    self.log.error(msg, notebook_filename, tb)
+                    self.exit(1)
+                else:
+                    write_results = self.writer.write(output, resources,
+                        notebook_name=resources['unique_key'])
+
+                    #Post-process if post processor has been defined.
+                    if hasattr(self, 'postprocessor') and self.postprocessor:
+                        self.postprocessor(write_results)
+                    conversion_success += 1
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        if len(timings) > 1:
+            self.log_timings(timings)
 
         # If nothing was converted successfully, help the user.
         if conversion_success == 0:
             self.print_help()
             sys.exit(-1)
+
+    def log_timings(self, timings):
+        """Log a table of the time taken to convert each notebook"""
+        width = max(len(filename) for filename, _ in timings)
+        lines = ["%-*s  %8.2fs" % (width, filename, elapsed)
+                 for filename, elapsed in timings]
+        lines.append("%-*s  %8.2fs" % (width, "Total",
+                                       sum(elapsed for _, elapsed in timings)))
+        self.log.info("Conversion times:\n%s", "\n".join(lines))
             
 #-----------------------------------------------------------------------------
 # Main entry point
@@ -13,8 +13,15 @@
 # Imports
 #-----------------------------------------------------------------------------
 
+import io
+import os
+import tempfile
+from multiprocessing.pool import ThreadPool
+
 from .base import Preprocessor
-from IPython.utils.traitlets import Unicode
+from IPython.utils import py3compat
+from IPython.utils.path import ensure_dir_exists
+from IPython.utils.traitlets import Unicode, Integer
 
 #-----------------------------------------------------------------------------
 # Classes
@@ -28,6 +35,18 @@ class ConvertFiguresPreprocessor(Preprocessor):
     from_format = Unicode(config=True, help='Format the converter accepts')
     to_format = Unicode(config=True, help='Format the converter writes')
 
+    max_workers = Integer(4, config=True,
+        help="""The number of figures converted at the same time.
+        Conversions run in threads, so this helps converters running
+        in subprocesses."""
+    )
+
+    cache_dir = Unicode(config=True,
+        help="""Directory where converted figures are cached,
+        by :meth:`figure_cache_key`. Files in it are never removed,
+        so it is disabled by default (blank)."""
+    )
+
     def __init__(self, **kw):
         """
         Public constructor
@@ -39,6 +58,98 @@ def convert_figure(self, data_format, data):
         raise NotImplementedError()
 
 
+    def figure_cache_key(self, data_format, data):
+        """The key of a figure in the disk cache, or None to not cache it.
+
+        Subclasses caching their figures must return a key that changes with
+        anything affecting the conversion, usable as a filename.
+        """
+        return None
+
+
+    def preprocess(self, nb, resources):
+        """
+        Convert all the figures of the notebook.
+
+        The figures to convert are collected first. Identical figures are
+        converted once, up to `max_workers` at a time, unless they are in
+        the cache.
+
+        Subclasses overriding :meth:`preprocess_cell` or
+        :meth:`_convert_figure` convert their figures one cell at a time.
+        """
+        if self._overrides('preprocess_cell') or self._overrides('_convert_figure'):
+            return super(ConvertFiguresPreprocessor, self).preprocess(nb, resources)
+
+        # figures to convert, by data, with the outputs showing them
+        figures = {}
+        for worksheet in nb.worksheets:
+            for cell in worksheet.cells:
+                for cell_out in cell.get('outputs', []):
+                    if self.to_format in cell_out:
+                        continue
+                    data = cell_out.get(self.from_format)
+                    if data is not None:
+                        figures.setdefault(data, []).append(cell_out)
+        if not figures:
+            return nb, resources
+
+        datas = list(figures)
+        n = min(max(self.max_workers, 1), len(datas))
+        if n > 1:
+            pool = ThreadPool(n)
+            try:
+                converted = pool.map(self._cached_convert_figure, datas)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            converted = [ self._cached_convert_figure(data) for data in datas ]
+
+        for data, new_data in zip(datas, converted):
+            for cell_out in figures[data]:
+                cell_out[self.to_format] = new_data
+        return nb, resources
+
+
+    def _overrides(self, name):
+        """Whether a subclass overrides the method `name`"""
+        for cls in type(self).__mro__:
+            if cls is ConvertFiguresPreprocessor:
+                return False
+            if name in vars(cls):
+                return True
+        return False
+
+
+    def _cached_convert_figure(self, data):
+        """Convert a figure, or get it from the cache"""
+        key = self.figure_cache_key(self.from_format, data) if self.cache_dir else None
+        if key is None:
+            return self.convert_figure(self.from_format, data)
+
+        path = os.path.join(self.cache_dir, key)
+        if os.path.isfile(path):
+            self.log.debug("Using cached figure %s", path)
+            with io.open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+
+        new_data = self.convert_figure(self.from_format, data)
+        tmp_path = None
+        try:
+            ensure_dir_exists(self.cache_dir)
+            # write then rename, so that concurrent runs never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with io.open(fd, 'w', encoding='utf-8') as f:
+                f.write(py3compat.cast_unicode(new_data))
+            os.rename(tmp_path, path)
+        except (IOError, OSError) as e:
+            self.log.warn("Could not cache figure in %s: %s", path, e)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return new_data
+
+
     def preprocess_cell(self, cell, resources, cell_index):
         """
         Apply a transformation on each cell,
@@ -60,5 +171,5 @@ def _convert_figure(self, cell_out, resources, data_type, data):
         Convert a figure and output the results to the cell output
         """
         if not self.to_format in cell_out and data_type == self.from_format:
-            data = self.convert_figure(data_type, data)
+            data = self._cached_convert_figure(data)
             cell_out[self.to_format] = data
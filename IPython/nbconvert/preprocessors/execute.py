@@ -3,13 +3,8 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import functools
 import os
-import sys
-
-try:
-    from queue import Empty  # Py 3
-except ImportError:
-    from Queue import Empty  # Py 2
 
 from IPython.utils.traitlets import List, Unicode
 
@@ -17,13 +12,35 @@
 from .base import Preprocessor
 from IPython.utils.traitlets import Integer
 
+
+def _coroutine(method):
+    """Make a method a tornado coroutine.
+
+    tornado is imported only when the method is called, so that it is
+    required to execute notebooks, not to import nbconvert.
+    """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        from tornado import gen
+        return gen.coroutine(method)(*args, **kwargs)
+    return wrapper
+
+
 class ExecutePreprocessor(Preprocessor):
     """
     Executes all the cells in a notebook
     """
     
     timeout = Integer(30, config=True,
-        help="The time to wait (in seconds) for output from executions."
+        help="The time to wait (in seconds) for a cell to finish executing."
+    )
+    idle_timeout = Integer(10, config=True,
+        help="""The time to wait (in seconds) for the remaining output of a cell,
+        once it has finished executing."""
+    )
+    concurrency = Integer(1, config=True,
+        help="""The number of notebooks executed at the same time by
+        preprocess_many, each on its own kernel."""
     )
     # FIXME: to be removed with nbformat v4
     # map msg_type to v3 output_type
@@ -47,91 +64,113 @@ class ExecutePreprocessor(Preprocessor):
     
     extra_arguments = List(Unicode)
     
-    def _create_client(self):
+    def _create_client(self, loop):
         from IPython.kernel import KernelManager
-        self.km = KernelManager()
-        self.km.write_connection_file()
-        self.kc = self.km.client()
-        self.kc.start_channels()
-        self.km.start_kernel(extra_arguments=self.extra_arguments, stderr=open(os.devnull, 'w'))
-        self.iopub = self.kc.iopub_channel
-        self.shell = self.kc.shell_channel
-        self.shell.kernel_info()
-        try:
-            self.shell.get_msg(timeout=self.timeout)
-        except Empty:
-            self.log.error("Timeout waiting for kernel_info reply")
-            raise
-        # flush IOPub
-        while True:
-            try:
-                self.iopub.get_msg(block=True, timeout=0.25)
-            except Empty:
-                break
-
-    def _shutdown_client(self):
-        self.kc.stop_channels()
-        self.km.shutdown_kernel()
-        del self.km
+        km = KernelManager(
+            client_class='IPython.kernel.ioloop.IOLoopKernelClient')
+        km.write_connection_file()
+        km.start_kernel(extra_arguments=self.extra_arguments, stderr=open(os.devnull, 'w'))
+        kc = km.client(loop=loop)
+        kc.start_channels()
+        return km, kc
+
+    def _shutdown_client(self, km, kc):
+        kc.stop_channels()
+        km.shutdown_kernel()
 
     def preprocess(self, nb, resources):
-        self._create_client()
-        nb, resources = super(ExecutePreprocessor, self).preprocess(nb, resources)
-        self._shutdown_client()
-        return nb, resources
+        return self.preprocess_many([(nb, resources)])[0]
 
-    def preprocess_cell(self, cell, resources, cell_index):
+    def preprocess_many(self, notebooks):
+        """Execute several notebooks, up to `concurrency` at a time.
+
+        All the kernels are driven from a single IOLoop.
+
+        Parameters
+        ----------
+        notebooks : list
+            (nb, resources) pairs.
+
+        Returns
+        -------
+        The list of executed (nb, resources) pairs, in the same order.
         """
-        Apply a transformation on each code cell. See base.py for details.
+        from zmq.eventloop import ioloop
+        loop = ioloop.IOLoop()
+        try:
+            return loop.run_sync(lambda : self._execute_many(notebooks, loop))
+        finally:
+            loop.close()
+
+    @_coroutine
+    def _execute_many(self, notebooks, loop):
+        from tornado import gen
+        results = [None] * len(notebooks)
+        pending = iter(enumerate(notebooks))
+
+        @_coroutine
+        def run_pending():
+            for index, (nb, resources) in pending:
+                results[index] = yield self.execute_notebook(nb, resources, loop)
+
+        n = min(max(self.concurrency, 1), len(notebooks))
+        yield [ run_pending() for i in range(n) ]
+        raise gen.Return(results)
+
+    @_coroutine
+    def execute_notebook(self, nb, resources, loop):
+        """Execute the code cells of a notebook on a new kernel.
+
+        This is a coroutine, returning the executed nb and resources.
         """
-        if cell.cell_type != 'code':
-            return cell, resources
+        from tornado import gen
+        from IPython.kernel.ioloop.client import TimeoutError
+        km, kc = self._create_client(loop)
         try:
-            outputs = self.run_cell(self.shell, self.iopub, cell)
-        except Exception as e:
-            self.log.error("failed to run cell: " + repr(e))
-            self.log.error(str(cell.input))
-            raise
-        cell.outputs = outputs
-        return cell, resources
-
-    def run_cell(self, shell, iopub, cell):
-        msg_id = shell.execute(cell.input)
-        self.log.debug("Executing cell:\n%s", cell.input)
-        # wait for finish, with timeout
-        while True:
             try:
-                msg = shell.get_msg(timeout=self.timeout)
-            except Empty:
-                self.log.error("Timeout waiting for execute reply")
+                yield kc.wait_for_ready(timeout=self.timeout)
+            except TimeoutError:
+                self.log.error("Timeout waiting for kernel_info reply")
                 raise
-            if msg['parent_header'].get('msg_id') == msg_id:
-                break
-            else:
-                # not our reply
-                continue
-        
-        outs = []
-
-        while True:
-            try:
-                msg = iopub.get_msg(timeout=self.timeout)
-            except Empty:
-                self.log.warn("Timeout waiting for IOPub output")
-                break
-            if msg['parent_header'].get('msg_id') != msg_id:
-                # not an output from our execution
-                continue
+            for worksheet in nb.worksheets:
+                for cell in worksheet.cells:
+                    if cell.cell_type != 'code':
+                        continue
+                    try:
+                        cell.outputs = yield self.run_cell(kc, cell)
+                    except Exception as e:
+                        self.log.error("failed to run cell: " + repr(e))
+                        self.log.error(str(cell.input))
+                        raise
+        finally:
+            self._shutdown_client(km, kc)
+        raise gen.Return((nb, resources))
+
+    @_coroutine
+    def run_cell(self, kc, cell):
+        """Execute a cell, and return its outputs.
+
+        This is a coroutine.
+        Execution ends when both the execute_reply and the idle status of
+        the kernel have arrived. `timeout` bounds the wait for the reply,
+        and `idle_timeout` the wait for the remaining output after it.
+        """
+        from tornado import gen
+        from IPython.kernel.ioloop.client import TimeoutError
+        self.log.debug("Executing cell:\n%s", cell.input)
+        try:
+            reply, msgs = yield kc.execute(cell.input, timeout=self.timeout,
+                                           idle_timeout=self.idle_timeout)
+        except TimeoutError:
+            self.log.error("Timeout waiting for execute reply")
+            raise
 
+        outs = []
+        for msg in msgs:
             msg_type = msg['msg_type']
             self.log.debug("output: %s", msg_type)
             content = msg['content']
-            if msg_type == 'status':
-                if content['execution_state'] == 'idle':
-                    break
-                else:
-                    continue
-            elif msg_type in {'execute_input', 'pyin'}:
+            if msg_type in {'status', 'pyin'}:
                 continue
             elif msg_type == 'clear_output':
                 outs = []
@@ -162,4 +201,5 @@ def run_cell(self, shell, iopub, cell):
                 self.log.error("unhandled iopub msg: " + msg_type)
 
             outs.append(out)
-        return outs
+        raise gen.Return(outs)
+
@@ -14,6 +14,8 @@
 #-----------------------------------------------------------------------------
 
 import base64
+import collections
+import hashlib
 import sys
 import os
 from mimetypes import guess_extension
@@ -26,6 +28,104 @@
 # Classes
 #-----------------------------------------------------------------------------
 
+def decode_output(data, out_type):
+    """Decode the data of an output, as it is written to a file"""
+    #Binary files are base64-encoded, SVG is already XML
+    if out_type in {'png', 'jpeg', 'application/pdf'}:
+
+        # data is b64-encoded as text (str, unicode)
+        # decodestring only accepts bytes
+        data = py3compat.cast_bytes(data)
+        data = base64.decodestring(data)
+    elif sys.platform == 'win32':
+        data = data.replace('\n', '\r\n').encode("UTF-8")
+    else:
+        data = data.encode("UTF-8")
+    return data
+
+
+class _EncodedOutput(object):
+    """The data of an output, as it is in the notebook"""
+
+    def __init__(self, data, out_type, content_hash):
+        self.data = data
+        self.out_type = out_type
+        self.content_hash = content_hash
+
+    def decode(self):
+        return decode_output(self.data, self.out_type)
+
+    def __repr__(self):
+        return '<encoded %s output %s>' % (self.out_type, self.content_hash)
+
+
+class ExtractedOutputs(collections.MutableMapping):
+    """The extracted output files, by filename
+
+    Outputs added with :meth:`add_encoded` keep their encoded data, as it is
+    in the notebook, and are decoded each time they are looked up.
+    Writers can iterate over them without holding all the decoded files
+    in memory. Other values are stored as is.
+
+    This is not a dict subclass, since on Python 2 ``dict(outputs)`` would
+    copy the values of a dict subclass without decoding them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._outputs = {}
+        self.update(*args, **kwargs)
+
+    def add_encoded(self, filename, data, out_type, content_hash):
+        """Add an output, to be decoded with :func:`decode_output` on lookup"""
+        self._outputs[filename] = _EncodedOutput(data, out_type, content_hash)
+
+    def content_hash(self, filename):
+        """The hash of the content of an output, if known, or None"""
+        value = self._outputs.get(filename)
+        if isinstance(value, _EncodedOutput):
+            return value.content_hash
+
+    def __getitem__(self, filename):
+        value = self._outputs[filename]
+        if isinstance(value, _EncodedOutput):
+            return value.decode()
+        return value
+
+    def __setitem__(self, filename, data):
+        self._outputs[filename] = data
+
+    def __delitem__(self, filename):
+        del self._outputs[filename]
+
+    def __iter__(self):
+        return iter(self._outputs)
+
+    def __len__(self):
+        return len(self._outputs)
+
+    def __contains__(self, filename):
+        return filename in self._outputs
+
+    def update(self, other=(), **kwargs):
+        if isinstance(other, ExtractedOutputs):
+            # keep the outputs encoded, with their hashes
+            self._outputs.update(other._outputs)
+            other = ()
+        collections.MutableMapping.update(self, other, **kwargs)
+
+    def copy(self):
+        new = type(self)()
+        new._outputs.update(self._outputs)
+        return new
+
+    def __reduce__(self):
+        # pickle the outputs encoded, with their hashes
+        return (type(self), (), {'_outputs': self._outputs})
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self._outputs)
+
+
 class ExtractOutputPreprocessor(Preprocessor):
     """
     Extracts all of the outputs from the notebook file.  The extracted 
@@ -33,7 +133,12 @@ class ExtractOutputPreprocessor(Preprocessor):
     """
 
     output_filename_template = Unicode(
-        "{unique_key}_{cell_index}_{index}{extension}", config=True)
+        "{unique_key}_{hash}{extension}", config=True,
+        help="""The name of extracted output files. Besides unique_key and
+        extension, it can use cell_index, the index of the output in the cell,
+        and hash, a hash of the output's content. Identical outputs named
+        after their hash are extracted once."""
+    )
 
     extract_output_types = Set({'png', 'jpeg', 'svg', 'application/pdf'}, config=True)
 
@@ -59,8 +164,11 @@ def preprocess_cell(self, cell, resources, cell_index):
         output_files_dir = resources.get('output_files_dir', None)
         
         #Make sure outputs key exists
-        if not isinstance(resources['outputs'], dict):
-            resources['outputs'] = {}
+        if not isinstance(resources['outputs'], collections.Mapping):
+            resources['outputs'] = ExtractedOutputs()
+        outputs = resources['outputs']
+        if not isinstance(outputs, ExtractedOutputs):
+            outputs = resources['outputs'] = ExtractedOutputs(outputs)
             
         #Loop through all of the outputs in the cell
         for index, out in enumerate(cell.get('outputs', [])):
@@ -70,17 +178,10 @@ def preprocess_cell(self, cell, resources, cell_index):
                 if out_type in out:
                     data = out[out_type]
 
-                    #Binary files are base64-encoded, SVG is already XML
-                    if out_type in {'png', 'jpeg', 'application/pdf'}:
-
-                        # data is b64-encoded as text (str, unicode)
-                        # decodestring only accepts bytes
-                        data = py3compat.cast_bytes(data)
-                        data = base64.decodestring(data)
-                    elif sys.platform == 'win32':
-                        data = data.replace('\n', '\r\n').encode("UTF-8")
-                    else:
-                        data = data.encode("UTF-8")
+                    # The data is decoded when it is written,
+                    # the hash is that of the encoded data.
+                    content_hash = hashlib.sha1(
+                        py3compat.cast_bytes(data)).hexdigest()[:16]
                     
                     # Build an output name
                     # filthy hack while we have some mimetype output, and some not
@@ -95,6 +196,7 @@ def preprocess_cell(self, cell, resources, cell_index):
                                     unique_key=unique_key,
                                     cell_index=cell_index,
                                     index=index,
+                                    hash=content_hash,
                                     extension=ext)
 
                     #On the cell, make the figure available via 
@@ -107,6 +209,7 @@ def preprocess_cell(self, cell, resources, cell_index):
 
                     #In the resources, make the figure available via
                     #   resources['outputs']['filename'] = data
-                    resources['outputs'][filename] = data
+                    if outputs.content_hash(filename) != content_hash:
+                        outputs.add_encoded(filename, data, out_type, content_hash)
 
         return cell, resources
@@ -14,11 +14,13 @@
 #-----------------------------------------------------------------------------
 
 import base64
+import hashlib
 import io
 import os
 import sys
 import subprocess
 
+from IPython.utils.py3compat import cast_bytes
 from IPython.utils.tempdir import TemporaryDirectory
 from IPython.utils.traitlets import Unicode
 
@@ -67,6 +69,14 @@ def _inkscape_default(self):
         return "inkscape"
 
 
+    def figure_cache_key(self, data_format, data):
+        """The hash of the SVG and of the conversion command"""
+        h = hashlib.sha1(cast_bytes(self.command))
+        h.update(b'\0')
+        h.update(cast_bytes(data))
+        return h.hexdigest() + '.pdf.b64'
+
+
     def convert_figure(self, data_format, data):
         """
         Convert a single SVG figure to PDF.  Returns converted data.
@@ -92,6 +102,6 @@ def convert_figure(self, data_format, data):
             if os.path.isfile(output_filename):
                 with open(output_filename, 'rb') as f:
                     # PDF is a nb supported binary, data type, so base64 encode.
-                    return base64.encodestring(f.read())
+                    return base64.encodestring(f.read()).decode('ascii')
             else:
                 raise TypeError("Inkscape svg to pdf conversion failed")
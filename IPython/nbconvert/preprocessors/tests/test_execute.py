@@ -80,3 +80,21 @@ def test_run_notebooks(self):
             output_nb, _ = preprocessor(copy.deepcopy(input_nb), res)
             self.assert_notebooks_equal(output_nb, input_nb)
 
+
+
+    def test_preprocess_many(self):
+        """Can notebooks be executed concurrently?"""
+        current_dir = os.path.dirname(__file__)
+        input_files = sorted(glob.glob(os.path.join(current_dir, 'files', '*.ipynb')))
+        input_nbs = []
+        for filename in input_files:
+            with open(filename) as f:
+                input_nbs.append(nbformat.read(f, 'ipynb'))
+        preprocessor = self.build_preprocessor()
+        preprocessor.concurrency = 2
+        results = preprocessor.preprocess_many([
+            (copy.deepcopy(nb), self.build_resources()) for nb in input_nbs
+        ])
+        assert len(results) == len(input_nbs)
+        for (output_nb, _), input_nb in zip(results, input_nbs):
+            self.assert_notebooks_equal(output_nb, input_nb)
@@ -14,8 +14,12 @@
 # Imports
 #-----------------------------------------------------------------------------
 
+import pickle
+
+from IPython.nbformat import current as nbformat
+
 from .base import PreprocessorTestsBase
-from ..extractoutput import ExtractOutputPreprocessor
+from ..extractoutput import ExtractOutputPreprocessor, ExtractedOutputs
 
 
 #-----------------------------------------------------------------------------
@@ -72,3 +76,47 @@ def test_output(self):
         # Verify pdf output
         assert pdf_filename in res['outputs']
         self.assertEqual(res['outputs'][pdf_filename], b'h')
+
+
+    def test_identical_outputs(self):
+        """Are identical outputs extracted once?"""
+        nb = self.build_notebook()
+        cells = nb.worksheets[0].cells
+        cells.append(nbformat.new_code_cell(input="$ e $", prompt_number=2,
+            outputs=[nbformat.new_output(output_type="png", output_png='Zw=='),
+                     nbformat.new_output(output_type="png", output_png='aA==')]))
+        res = self.build_resources()
+        preprocessor = self.build_preprocessor()
+        nb, res = preprocessor(nb, res)
+
+        first = cells[0].outputs[6]['png_filename']
+        same = cells[-1].outputs[0]['png_filename']
+        other = cells[-1].outputs[1]['png_filename']
+        self.assertEqual(first, same)
+        self.assertNotEqual(first, other)
+        png_filenames = [f for f in res['outputs'] if f.endswith('.png')]
+        self.assertEqual(sorted(png_filenames), sorted([first, other]))
+        self.assertEqual(res['outputs'][other], b'h')
+
+
+    def test_extracted_outputs(self):
+        """Are extracted outputs decoded when copied, and kept encoded when pickled?"""
+        nb = self.build_notebook()
+        res = self.build_resources()
+        preprocessor = self.build_preprocessor()
+        nb, res = preprocessor(nb, res)
+        outputs = res['outputs']
+        png_filename = nb.worksheets[0].cells[0].outputs[6]['png_filename']
+
+        copied = {}
+        copied.update(outputs)
+        self.assertEqual(dict(outputs), copied)
+        self.assertEqual(copied[png_filename], b'g')
+        self.assertEqual(dict(outputs.items())[png_filename], b'g')
+
+        for copy in (outputs.copy(), ExtractedOutputs(outputs),
+                     pickle.loads(pickle.dumps(outputs, 2))):
+            self.assertIsInstance(copy, ExtractedOutputs)
+            self.assertEqual(copy, outputs)
+            self.assertEqual(copy.content_hash(png_filename),
+                             outputs.content_hash(png_filename))
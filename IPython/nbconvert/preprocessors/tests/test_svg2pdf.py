@@ -14,8 +14,13 @@
 # Imports
 #-----------------------------------------------------------------------------
 
+import base64
+import os
+import sys
+
 from IPython.testing import decorators as dec
 from IPython.nbformat import current as nbformat
+from IPython.utils.tempdir import TemporaryDirectory
 
 from .base import PreprocessorTestsBase
 from ..svg2pdf import SVG2PDFPreprocessor
@@ -77,7 +82,9 @@ def build_preprocessor(self):
 
     def test_constructor(self):
         """Can a SVG2PDFPreprocessor be constructed?"""
-        self.build_preprocessor()
+        preprocessor = self.build_preprocessor()
+        # the disk cache is opt-in
+        self.assertEqual(preprocessor.cache_dir, '')
 
 
     @dec.onlyif_cmds_exist('inkscape')
@@ -88,3 +95,69 @@ def test_output(self):
         preprocessor = self.build_preprocessor()
         nb, res = preprocessor(nb, res)
         assert 'svg' in nb.worksheets[0].cells[0].outputs[0]
+
+
+    def test_parallel_cached_conversion(self):
+        """Are figures converted once, in parallel, and cached?"""
+        with TemporaryDirectory() as td:
+            log = os.path.join(td, 'log')
+            stub = os.path.join(td, 'stub.py')
+            with open(stub, 'w') as f:
+                f.write(stub_converter)
+            cache_dir = os.path.join(td, 'cache')
+
+            other_svg = self.simple_svg.replace('300.00000', '30.00000')
+            svgs = [self.simple_svg, other_svg, self.simple_svg]
+            for run in range(2):
+                outputs = [nbformat.new_output(output_type="svg", output_svg=svg)
+                           for svg in svgs]
+                cells = [nbformat.new_code_cell(input="", prompt_number=1, outputs=outputs)]
+                nb = nbformat.new_notebook(worksheets=[nbformat.new_worksheet(cells=cells)])
+
+                preprocessor = self.build_preprocessor()
+                preprocessor.command = '"%s" "%s" "{from_filename}" "{to_filename}" "%s"' % (
+                    sys.executable, stub, log)
+                preprocessor.cache_dir = cache_dir
+                preprocessor.max_workers = 2
+                nb, res = preprocessor(nb, self.build_resources())
+
+                pdfs = [base64.b64decode(out['application/pdf'])
+                        for out in nb.worksheets[0].cells[0].outputs]
+                self.assertEqual(pdfs[0], pdfs[2])
+                self.assertNotEqual(pdfs[0], pdfs[1])
+                assert pdfs[0].startswith(b'%PDF')
+                # the identical figures are converted once, and only on the first run
+                with open(log) as f:
+                    self.assertEqual(len(f.readlines()), 2)
+
+
+    def test_preprocess_cell_override(self):
+        """Do subclasses overriding preprocess_cell still convert cell by cell?"""
+        cells = []
+        class CellByCell(SVG2PDFPreprocessor):
+            def preprocess_cell(self, cell, resources, cell_index):
+                cells.append(cell_index)
+                return super(CellByCell, self).preprocess_cell(cell, resources, cell_index)
+
+            def convert_figure(self, data_format, data):
+                return u'converted'
+
+        preprocessor = CellByCell(enabled=True)
+        nb, res = preprocessor(self.build_notebook(), self.build_resources())
+        self.assertEqual(cells, [0])
+        self.assertEqual(nb.worksheets[0].cells[0].outputs[0]['application/pdf'],
+                         u'converted')
+
+
+# A stub for inkscape, which writes the size of the SVG as a PDF,
+# and logs its runs.
+stub_converter = """
+import sys
+svg, pdf, log = sys.argv[1:]
+with open(svg, 'rb') as f:
+    size = len(f.read())
+with open(pdf, 'wb') as f:
+    f.write(('%%PDF %i' % size).encode('ascii'))
+with open(log, 'a') as f:
+    f.write('converted\\n')
+"""
@@ -46,6 +46,19 @@ def test_glob(self):
             assert os.path.isfile('notebook2.py')
 
 
+    def test_jobs(self):
+        """
+        Can notebooks be converted in parallel?
+        """
+        with self.create_temp_cwd(['notebook*.ipynb']):
+            out, err = self.call('nbconvert --to python --jobs 2 notebook*.ipynb')
+            assert os.path.isfile('notebook1.py')
+            assert os.path.isfile('notebook2.py')
+            # the results are reported in order, with a table of timings
+            assert err.index('notebook1.ipynb to') < err.index('notebook2.ipynb to')
+            assert 'Conversion times' in err
+
+
     def test_glob_subdir(self):
         """
         Do search patterns work for subdirectory notebook names?
@@ -0,0 +1,167 @@
+"""Long-lived converter processes, and a cache of their results
+
+Spawning an external converter (pandoc, node) for every cell of a notebook
+spends most of the conversion time in starting processes. A
+:class:`ConverterProcess` is started once, and converts many documents in
+turn, framed on its stdin and stdout.
+"""
+
+# Copyright (c) IPython Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+from __future__ import print_function
+
+import hashlib
+import subprocess
+from collections import OrderedDict
+import threading
+
+from IPython.utils.py3compat import cast_bytes
+
+from .exceptions import ConversionException
+
+
+class ConversionCache(object):
+    """The results of a conversion, keyed by a hash of their source
+
+    Identical sources, such as repeated cells, are converted only once.
+    At most `max_size` results are kept, the least recently used
+    being dropped first. A cache can be shared between threads.
+    """
+
+    def __init__(self, encoding='utf-8', max_size=1024):
+        self.encoding = encoding
+        self.max_size = max_size
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, source):
+        return hashlib.sha1(cast_bytes(source, self.encoding)).hexdigest()
+
+    def get(self, source):
+        key = self.key(source)
+        with self._lock:
+            result = self._results.pop(key, None)
+            if result is not None:
+                self._results[key] = result
+        return result
+
+    def set(self, source, result):
+        key = self.key(source)
+        with self._lock:
+            self._results.pop(key, None)
+            self._results[key] = result
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def __contains__(self, source):
+        return self.key(source) in self._results
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+def write_frame(stream, data):
+    """Write a frame: the byte count of data, a newline, and data"""
+    stream.write(str(len(data)).encode('ascii') + b'\n')
+    stream.write(data)
+    stream.flush()
+
+
+def read_frame(stream):
+    """Read a frame written by :func:`write_frame`
+
+    Returns None at the end of the stream.
+    """
+    header = stream.readline()
+    if not header.endswith(b'\n'):
+        return None
+    size = int(header)
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return data
+
+
+class ConverterProcess(object):
+    """A converter process that converts many documents in turn
+
+    The process is started on the first conversion, and restarted if it dies.
+    Each document is written to its stdin as a frame: its size in bytes,
+    in decimal, followed by a newline and the encoded document.
+    The converted document is read back from its stdout as a frame
+    in the same format.
+
+    Results are cached, so the same source is converted only once.
+    Conversions are serialized, so a converter can be shared between threads,
+    e.g. by the exporters sharing a Jinja environment.
+    """
+
+    command = None
+
+    def __init__(self, command=None, encoding='utf-8'):
+        if command is not None:
+            self.command = command
+        self.encoding = encoding
+        self.cache = ConversionCache(encoding)
+        self.process = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the converter process"""
+        self.close()
+        try:
+            self.process = subprocess.Popen(self.command,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            )
+        except OSError as e:
+            raise self.missing(e)
+
+    def missing(self, error):
+        """The exception to raise when the command cannot be started"""
+        return ConversionException("The command '%s' returned an error: %s."
+                                   % (" ".join(self.command), error))
+
+    def convert(self, source):
+        """Convert a document, returning the unicode result"""
+        result = self.cache.get(source)
+        if result is not None:
+            return result
+
+        with self._lock:
+            if self.process is None or self.process.poll() is not None:
+                self.start()
+            try:
+                write_frame(self.process.stdin, cast_bytes(source, self.encoding))
+                out = read_frame(self.process.stdout)
+            except (IOError, OSError):
+                out = None
+            if out is None:
+                self.close()
+        if out is None:
+            raise ConversionException("The command '%s' exited unexpectedly."
+                                      % " ".join(self.command))
+        result = out.decode(self.encoding, 'replace').rstrip('\n')
+        self.cache.set(source, result)
+        return result
+
+    __call__ = convert
+
+    def close(self):
+        """Stop the converter process"""
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        try:
+            process.stdin.close()
+        except (IOError, OSError):
+            pass
+        process.stdout.close()
+        process.wait()
+
+    def __del__(self):
+        self.close()
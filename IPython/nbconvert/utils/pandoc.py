@@ -14,15 +14,18 @@
 
 # Stdlib imports
 import subprocess
+import threading
 import warnings
 import re
 from io import TextIOWrapper, BytesIO
+from multiprocessing.pool import ThreadPool
 
 # IPython imports
 from IPython.utils.py3compat import cast_bytes
 from IPython.utils.version import check_version
 from IPython.utils.process import is_cmd_found, FindCmdError
 
+from .converter import ConversionCache
 from .exceptions import ConversionException
 
 #-----------------------------------------------------------------------------
@@ -69,6 +72,99 @@ def pandoc(source, fmt, to, extra_args=None, encoding='utf-8'):
     return out.rstrip('\n')
 
 
+def pandoc_many(sources, fmt, to, extra_args=None, encoding='utf-8',
+                max_workers=4):
+    """Convert many input strings, running up to `max_workers` pandoc
+    processes at a time.
+
+    Each source is converted on its own, as by :func:`pandoc`, so that
+    document-wide constructs such as link references, header ids and
+    footnotes are not shared between them.
+
+    Parameters are those of :func:`pandoc`, with a list of sources.
+
+    Returns
+    -------
+    outs : list of unicode
+      The outputs, in the order of the sources.
+    """
+    sources = list(sources)
+    convert = lambda source: pandoc(source, fmt, to, extra_args, encoding)
+    n = min(max(max_workers, 1), len(sources))
+    if n < 2:
+        return [ convert(source) for source in sources ]
+    pool = ThreadPool(n)
+    try:
+        return pool.map(convert, sources)
+    finally:
+        pool.terminate()
+
+
+class PandocConverter(object):
+    """Convert strings from format `fmt` to format `to` via pandoc,
+    caching the results.
+
+    Sources given to :meth:`prefetch` are converted concurrently with
+    :func:`pandoc_many` when the converter is first called, so that
+    converting them is then a cache lookup instead of a pandoc process each.
+    Templates often pipe sources through other filters first: the names of
+    those filters are listed in `prefetch_filters`, so that the exporter
+    can prefetch the strings that will actually be converted.
+
+    A converter can be shared between threads, e.g. by the exporters
+    sharing a Jinja environment.
+    """
+
+    fmt = 'markdown'
+    to = 'html'
+    extra_args = None
+    prefetch_filters = ()
+
+    def __init__(self, fmt=None, to=None, extra_args=None, encoding='utf-8'):
+        if fmt is not None:
+            self.fmt = fmt
+        if to is not None:
+            self.to = to
+        if extra_args is not None:
+            self.extra_args = extra_args
+        self.encoding = encoding
+        self.cache = ConversionCache(encoding)
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def __call__(self, source):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            self._convert(pending)
+        out = self.cache.get(source)
+        if out is None:
+            out = pandoc(source, self.fmt, self.to, self.extra_args, self.encoding)
+            self.cache.set(source, out)
+        return out
+
+    def prefetch(self, sources):
+        """Convert these sources at once, on the next call.
+
+        They replace the sources of a previous prefetch, if it was not
+        followed by a call. Nothing is converted if the converter is not
+        called, e.g. by a template that does not use it.
+        """
+        pending = []
+        seen = set()
+        for source in sources:
+            if source and source not in seen and source not in self.cache:
+                seen.add(source)
+                pending.append(source)
+        with self._lock:
+            self._pending = pending
+
+    def _convert(self, pending):
+        outs = pandoc_many(pending, self.fmt, self.to, self.extra_args, self.encoding)
+        for source, out in zip(pending, outs):
+            self.cache.set(source, out)
+
+
 def get_pandoc_version():
     """Gets the Pandoc version if Pandoc is installed.
     
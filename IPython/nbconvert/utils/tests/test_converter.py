@@ -0,0 +1,107 @@
+"""Tests for long-lived converter processes"""
+
+# Copyright (c) IPython Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import sys
+
+from IPython.utils.tempdir import TemporaryDirectory
+
+from IPython.nbconvert.tests.base import TestsBase
+from ..converter import ConverterProcess, ConversionCache
+from ..exceptions import ConversionException
+
+# A converter speaking the framed protocol, which upper-cases documents,
+# and logs each of them to a file.
+stub_converter = r'''
+import sys
+sys.path.insert(0, %r)
+from IPython.nbconvert.utils.converter import read_frame, write_frame
+stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+while True:
+    data = read_frame(stdin)
+    if data is None:
+        break
+    with open(sys.argv[1], 'a') as f:
+        f.write('converted\n')
+    if data == b'exit':
+        break
+    write_frame(stdout, data.decode('utf-8').upper().encode('utf-8'))
+'''
+
+
+class TestConverterProcess(TestsBase):
+    """Tests for ConverterProcess, with a stub converter"""
+
+    def setUp(self):
+        self.td = TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        script = os.path.join(self.td.name, 'converter.py')
+        self.log = os.path.join(self.td.name, 'log')
+        here = os.path.dirname(__file__)
+        package_dir = os.path.abspath(os.path.join(here, *['..'] * 4))
+        with open(script, 'w') as f:
+            f.write(stub_converter % package_dir)
+        self.converter = ConverterProcess([sys.executable, script, self.log])
+        self.addCleanup(self.converter.close)
+
+    def conversions(self):
+        if not os.path.exists(self.log):
+            return 0
+        with open(self.log) as f:
+            return len(f.readlines())
+
+    def test_convert(self):
+        """Are many documents converted by one process?"""
+        converter = self.converter
+        self.assertEqual(converter(u'abc'), u'ABC')
+        process = converter.process
+        self.assertEqual(converter(u'h\xe9llo\n\nworld'), u'H\xc9LLO\n\nWORLD')
+        self.assertEqual(converter(u''), u'')
+        self.assertIs(converter.process, process)
+        self.assertEqual(self.conversions(), 3)
+
+    def test_cache(self):
+        """Are identical documents converted once?"""
+        converter = self.converter
+        for i in range(3):
+            self.assertEqual(converter(u'abc'), u'ABC')
+        self.assertEqual(self.conversions(), 1)
+        self.assertEqual(len(converter.cache), 1)
+
+    def test_restart(self):
+        """Is the converter restarted after it exits?"""
+        converter = self.converter
+        with self.assertRaises(ConversionException):
+            converter(u'exit')
+        self.assertIsNone(converter.process)
+        self.assertEqual(converter(u'abc'), u'ABC')
+
+    def test_missing(self):
+        """Is a missing command reported?"""
+        converter = ConverterProcess([os.path.join(self.td.name, 'missing')])
+        with self.assertRaises(ConversionException):
+            converter(u'abc')
+
+
+def test_conversion_cache():
+    cache = ConversionCache()
+    cache.set(u'h\xe9llo', u'world')
+    assert u'h\xe9llo' in cache
+    assert u'hello' not in cache
+    assert cache.get(u'h\xe9llo') == u'world'
+    assert cache.get(u'hello') is None
+
+
+def test_conversion_cache_size():
+    cache = ConversionCache(max_size=2)
+    cache.set(u'a', u'A')
+    cache.set(u'b', u'B')
+    assert cache.get(u'a') == u'A'
+    cache.set(u'c', u'C')
+    assert len(cache) == 2
+    assert u'b' not in cache
+    assert cache.get(u'a') == u'A'
+    assert cache.get(u'c') == u'C'
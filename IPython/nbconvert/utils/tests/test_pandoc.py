@@ -10,9 +10,11 @@
 # Imports
 #-----------------------------------------------------------------------------
 import os
+import sys
 import warnings
 
 from IPython.testing import decorators as dec
+from IPython.utils.tempdir import TemporaryDirectory
 
 from IPython.nbconvert.tests.base import TestsBase
 from .. import pandoc
@@ -61,6 +63,68 @@ def test_minimal_version(self):
         assert pandoc.check_pandoc_version()
 
 
+# A stub pandoc, which wraps paragraphs in <p> tags,
+# and logs each of its runs to a file.
+stub_pandoc = r'''#!%s
+import sys
+if sys.argv[1:] == ['-v']:
+    print('pandoc 1.13.0')
+    sys.exit()
+with open(%r, 'a') as f:
+    f.write('run\n')
+source = sys.stdin.read()
+paragraphs = [ p.strip() for p in source.split('\n\n') if p.strip() ]
+sys.stdout.write('\n'.join('<p>%%s</p>' %% p for p in paragraphs) + '\n')
+'''
+
+class TestPandocConverter(TestsBase):
+    """Tests for PandocConverter, with a stub pandoc"""
+
+    def setUp(self):
+        self.td = TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        self.log = os.path.join(self.td.name, 'log')
+        script = os.path.join(self.td.name, 'pandoc')
+        with open(script, 'w') as f:
+            f.write(stub_pandoc % (sys.executable, self.log))
+        os.chmod(script, 0o755)
+        path = os.environ['PATH']
+        os.environ['PATH'] = self.td.name + os.pathsep + path
+        self.addCleanup(os.environ.__setitem__, 'PATH', path)
+        pandoc.clean_cache()
+        self.addCleanup(pandoc.clean_cache)
+
+    def runs(self):
+        if not os.path.exists(self.log):
+            return 0
+        with open(self.log) as f:
+            return len(f.readlines())
+
+    @dec.skip_win32
+    def test_pandoc_many(self):
+        """Are many sources converted, each on its own?"""
+        sources = ['a', 'b\n\nc', 'd']
+        outs = pandoc.pandoc_many(sources, 'markdown', 'html', max_workers=2)
+        self.assertEqual(outs, ['<p>a</p>', '<p>b</p>\n<p>c</p>', '<p>d</p>'])
+        self.assertEqual(self.runs(), 3)
+        self.assertEqual(outs, [ pandoc.pandoc(source, 'markdown', 'html')
+                                 for source in sources ])
+
+    @dec.skip_win32
+    def test_prefetch(self):
+        """Are prefetched sources converted on the first call, and cached?"""
+        converter = pandoc.PandocConverter('markdown', 'html')
+        converter.prefetch(['a', 'b', 'a', ''])
+        self.assertEqual(self.runs(), 0)
+        self.assertEqual(converter('b'), '<p>b</p>')
+        self.assertEqual(self.runs(), 2)
+        self.assertEqual(converter('a'), '<p>a</p>')
+        self.assertEqual(self.runs(), 2)
+        self.assertEqual(converter('c'), '<p>c</p>')
+        self.assertEqual(converter('c'), '<p>c</p>')
+        self.assertEqual(self.runs(), 3)
+
+
 def pandoc_function_raised_missing(f, *args, **kwargs):
     try:
         f(*args, **kwargs)
@@ -14,6 +14,8 @@
 # Imports
 #-----------------------------------------------------------------------------
 
+import collections
+
 from .base import WriterBase
 from pprint import pprint
 
@@ -34,10 +36,10 @@ def write(self, output, resources, notebook_name='notebook', **kw):
         See base for more...
         """
 
-        if isinstance(resources['outputs'], dict):
+        if isinstance(resources['outputs'], collections.Mapping):
             print("outputs extracted from %s" % notebook_name)
             print('-' * 80)
-            pprint(resources['outputs'], indent=2, width=70)
+            pprint(dict(resources['outputs']), indent=2, width=70)
         else:
             print("no outputs extracted from %s" % notebook_name)
         print('=' * 80)
@@ -7,7 +7,7 @@
 import os
 import glob
 
-from IPython.utils.traitlets import Unicode
+from IPython.utils.traitlets import Unicode, Bool
 from IPython.utils.path import link_or_copy, ensure_dir_exists
 from IPython.utils.py3compat import unicode_type
 
@@ -26,6 +26,13 @@ class FilesWriter(WriterBase):
                               to output to the current directory""")
 
 
+    link_identical_outputs = Bool(False, config=True,
+                              help="""Hard-link extracted output files to
+                              identical ones already written by this writer,
+                              e.g. for another notebook, instead of writing
+                              them again.""")
+
+
     # Make sure that the output directory exists.
     def _build_directory_changed(self, name, old, new):
         if new:
@@ -34,6 +41,8 @@ def _build_directory_changed(self, name, old, new):
 
     def __init__(self, **kw):
         super(FilesWriter, self).__init__(**kw)
+        # {content hash: path} of the extracted outputs written so far
+        self._written_outputs = {}
         self._build_directory_changed('build_directory', self.build_directory, 
                                       self.build_directory)
     
@@ -62,17 +71,37 @@ def write(self, output, resources, notebook_name=None, **kw):
             # Write all of the extracted resources to the destination directory.
             # NOTE: WE WRITE EVERYTHING AS-IF IT'S BINARY.  THE EXTRACT FIG
             # PREPROCESSOR SHOULD HANDLE UNIX/WINDOWS LINE ENDINGS...
-            for filename, data in resources.get('outputs', {}).items():
+            # Outputs are looked up one at a time, since they may be decoded
+            # on lookup (see ExtractedOutputs).
+            outputs = resources.get('outputs', {})
+            content_hash = getattr(outputs, 'content_hash', lambda filename: None)
+            for filename in outputs:
 
                 # Determine where to write the file to
                 dest = os.path.join(self.build_directory, filename)
                 path = os.path.dirname(dest)
                 self._makedir(path)
 
+                key = content_hash(filename)
+                if key is not None and self.link_identical_outputs:
+                    src = self._written_outputs.get(key)
+                    if src is not None and os.path.isfile(src):
+                        if os.path.abspath(src) != os.path.abspath(dest):
+                            self.log.debug("Linking %s -> %s", src, dest)
+                            link_or_copy(src, dest)
+                        continue
+
+                # Don't write through a hard link to another output
+                if os.path.isfile(dest) and os.stat(dest).st_nlink > 1:
+                    os.remove(dest)
+
                 # Write file
+                data = outputs[filename]
                 self.log.debug("Writing %i bytes to support file %s", len(data), dest)
                 with io.open(dest, 'wb') as f:
                     f.write(data)
+                if key is not None:
+                    self._written_outputs[key] = dest
 
             # Copy referenced files to output directory
             if self.build_directory:
@@ -19,6 +19,7 @@
 
 from ...tests.base import TestsBase
 from ..files import FilesWriter
+from IPython.nbconvert.preprocessors.extractoutput import ExtractedOutputs
 from IPython.utils.py3compat import PY3
 
 if PY3:
@@ -98,6 +99,28 @@ def test_extract(self):
                 self.assertEqual(output, 'b')
 
 
+    def test_link_identical_outputs(self):
+        """Does FilesWriter link identical outputs of different notebooks?"""
+
+        # Work in a temporary directory.
+        with self.create_temp_cwd():
+
+            writer = FilesWriter(link_identical_outputs=True)
+            for name in 'yz':
+                outputs = ExtractedOutputs()
+                outputs.add_encoded(os.path.join(name + '_files', 'a.png'),
+                                    'Yg==', 'png', 'hash')
+                writer.write(u'y', {'outputs': outputs}, notebook_name=name)
+
+            for name in 'yz':
+                with open(os.path.join(name + '_files', 'a.png'), 'rb') as f:
+                    self.assertEqual(f.read(), b'b')
+            if hasattr(os, 'link'):
+                y_stat = os.stat(os.path.join('y_files', 'a.png'))
+                z_stat = os.stat(os.path.join('z_files', 'a.png'))
+                self.assertEqual(y_stat.st_ino, z_stat.st_ino)
+
+
     def test_builddir(self):
         """Can FilesWriter write to a build dir correctly?"""
 
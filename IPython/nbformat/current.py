@@ -25,8 +25,8 @@
 'new_output', 'new_worksheet', 'parse_filename', 'new_metadata', 'new_author',
 'new_heading_cell', 'nbformat', 'nbformat_minor', 'nbformat_schema',
 'to_notebook_json', 'convert', 'validate', 'NBFormatError', 'parse_py',
-'reads_json', 'writes_json', 'reads_py', 'writes_py', 'reads', 'writes', 'read',
-'write']
+'reads_json', 'writes_json', 'write_json', 'reads_py', 'writes_py', 'reads',
+'writes', 'read', 'write']
 
 current_nbformat = nbformat
 current_nbformat_minor = nbformat_minor
@@ -68,20 +68,35 @@ def reads_json(nbjson, **kwargs):
     return nb_current
 
 
-def writes_json(nb, **kwargs):
-    """Take a NotebookNode object and write out a JSON string. Report if
-    any JSON format errors are detected.
-
-    """
+def _validate_for_write(nb):
+    """Report if any JSON format errors are detected in a notebook to write."""
     errors = validate(nb)
     if errors:
         get_logger().error(
             "Notebook JSON is invalid (%d errors detected during write)",
             len(errors))
+
+
+def writes_json(nb, **kwargs):
+    """Take a NotebookNode object and write out a JSON string. Report if
+    any JSON format errors are detected.
+
+    """
+    _validate_for_write(nb)
     nbjson = versions[current_nbformat].writes_json(nb, **kwargs)
     return nbjson
 
 
+def write_json(nb, fp, **kwargs):
+    """Take a NotebookNode object and write it to a file as JSON. Report if
+    any JSON format errors are detected.
+
+    The JSON is written incrementally, rather than built as a single string.
+    """
+    _validate_for_write(nb)
+    versions[current_nbformat].nbjson.write(nb, fp, **kwargs)
+
+
 def reads_py(s, **kwargs):
     """Read a .py notebook from a string and return the NotebookNode object."""
     nbf, nbm, s = parse_py(s, **kwargs)
@@ -188,11 +203,12 @@ def write(nb, fp, format, **kwargs):
     format : (u'json', u'ipynb', u'py')
         The format to write the notebook in.
 
-    Returns
-    -------
-    s : unicode
-        The notebook string.
+    JSON notebooks are written incrementally, rather than built in memory
+    as a single string first.
     """
+    format = unicode_type(format)
+    if format == u'json' or format == u'ipynb':
+        return write_json(nb, fp, **kwargs)
     return fp.write(writes(nb, format, **kwargs))
 
 def _convert_to_metadata():
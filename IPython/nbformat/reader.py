@@ -82,10 +82,12 @@ def reads(s, **kwargs):
     """
     from .current import NBFormatError
     
-    nb_dict = parse_json(s, **kwargs)
+    # parse objects straight into NotebookNodes of the current version,
+    # which it doesn't need to copy. Older versions convert them.
+    nb_dict = parse_json(s, object_pairs_hook=v3.NotebookNode, **kwargs)
     (major, minor) = get_version(nb_dict)
     if major in versions:
-        return versions[major].to_notebook_json(nb_dict, minor=minor)
+        return versions[major].to_notebook_json(nb_dict, minor=minor, copy=False)
     else:
         raise NBFormatError('Unsupported nbformat version %s' % major)
 
@@ -12,17 +12,28 @@
 
 import base64
 from contextlib import contextmanager
+from datetime import datetime
 import hashlib
 from hmac import HMAC
 import io
 import os
 
+try:
+    import sqlite3
+except ImportError:
+    try:
+        from pysqlite2 import dbapi2 as sqlite3
+    except ImportError:
+        sqlite3 = None
+
 from IPython.utils.py3compat import string_types, unicode_type, cast_bytes
-from IPython.utils.traitlets import Instance, Bytes, Enum, Any, Unicode, Bool
+from IPython.utils.traitlets import (
+    Instance, Bytes, Enum, Any, Unicode, Bool, Integer,
+)
 from IPython.config import LoggingConfigurable, MultipleInstanceError
 from IPython.core.application import BaseIPythonApplication, base_flags
 
-from .current import read, write
+from .current import reads, write
 
 #-----------------------------------------------------------------------------
 # Code
@@ -55,6 +66,46 @@ def yield_everything(obj):
         yield unicode_type(obj).encode('utf8')
 
 
+class _BufferedDigest(object):
+    """Feed bytes to a digest in large buffers, rather than one by one"""
+
+    def __init__(self, digest, buffer_size=1 << 16):
+        self.digest = digest
+        self.buffer_size = buffer_size
+        self.chunks = []
+        self.size = 0
+
+    def write(self, b):
+        self.chunks.append(b)
+        self.size += len(b)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.digest.update(b''.join(self.chunks))
+        self.chunks = []
+        self.size = 0
+
+
+def write_everything(obj, write):
+    """Write every item in a container as bytes
+
+    Writes the same bytes as :func:`yield_everything`, by calling write
+    on each of them, without a chain of generators.
+    """
+    if isinstance(obj, dict):
+        for key in sorted(obj):
+            write(cast_bytes(key))
+            write_everything(obj[key], write)
+    elif isinstance(obj, (list, tuple)):
+        for element in obj:
+            write_everything(element, write)
+    elif isinstance(obj, unicode_type):
+        write(obj.encode('utf8'))
+    else:
+        write(unicode_type(obj).encode('utf8'))
+
+
 @contextmanager
 def signature_removed(nb):
     """Context manager for operating on a notebook with its signature removed
@@ -118,6 +169,48 @@ def _secret_default(self):
             self._write_secret_file(secret)
             return secret
     
+    db_file = Unicode(config=True,
+        help="""The sqlite file in which to store the digests of notebooks
+        known to be trusted. Notebooks whose files are unchanged since their
+        signature was last verified are trusted without computing it again.
+        
+        Set it to ':memory:' to keep the digests in memory only.
+        """
+    )
+    def _db_file_default(self):
+        if self.profile_dir is None:
+            return ':memory:'
+        return os.path.join(self.profile_dir.security_dir, 'nbsignatures.db')
+    
+    cache_size = Integer(65535, config=True,
+        help="""The number of notebook digests to keep in db_file.
+        The least recently seen are removed first.
+        """
+    )
+    
+    db = Any()
+    def _db_default(self):
+        if sqlite3 is None:
+            self.log.warn("Missing SQLite3, trusted notebooks will not be remembered")
+            return None
+        kwargs = dict(detect_types=sqlite3.PARSE_DECLTYPES|sqlite3.PARSE_COLNAMES)
+        try:
+            db = self._connect_db(self.db_file, **kwargs)
+        except sqlite3.DatabaseError as e:
+            self.log.warn("Could not use %s (%s), trusted notebooks will be "
+                          "remembered in memory only", self.db_file, e)
+            db = self._connect_db(':memory:', **kwargs)
+        return db
+    
+    def _connect_db(self, db_file, **kwargs):
+        db = sqlite3.connect(db_file, **kwargs)
+        db.execute("""CREATE TABLE IF NOT EXISTS nbsignatures
+            (digest text PRIMARY KEY, last_seen timestamp)""")
+        db.execute("""CREATE INDEX IF NOT EXISTS last_seen_idx
+            ON nbsignatures (last_seen)""")
+        db.commit()
+        return db
+    
     def _write_secret_file(self, secret):
         """write my secret to my secret_file"""
         self.log.info("Writing notebook-signing key to %s", self.secret_file)
@@ -138,20 +231,78 @@ def compute_signature(self, nb):
         by hashing the entire contents of the notebook via HMAC digest.
         """
         hmac = HMAC(self.secret, digestmod=self.digestmod)
+        digest = _BufferedDigest(hmac)
         # don't include the previous hash in the content to hash
         with signature_removed(nb):
             # sign the whole thing
-            for b in yield_everything(nb):
-                hmac.update(b)
+            write_everything(nb, digest.write)
+        digest.flush()
         
         return hmac.hexdigest()
     
-    def check_signature(self, nb):
+    def source_digest(self, source=None):
+        """Return an HMAC of the source of a notebook, as it is stored
+        
+        Unlike its signature, this only depends on the notebook's serialized
+        form, so it is cheap to compute. Call its update method with the
+        source if it is written incrementally, and pass its hexdigest
+        to :meth:`is_known` and :meth:`remember`.
+        """
+        hmac = HMAC(self.secret, digestmod=self.digestmod)
+        if source is not None:
+            hmac.update(cast_bytes(source, 'utf8'))
+        return hmac
+    
+    def _digest_key(self, digest):
+        return u"%s:%s" % (self.algorithm, digest)
+    
+    def is_known(self, digest):
+        """Is digest that of the source of a notebook known to be trusted?"""
+        if self.db is None:
+            return False
+        key = self._digest_key(digest)
+        cursor = self.db.execute(
+            "UPDATE nbsignatures SET last_seen = ? WHERE digest = ?",
+            (datetime.utcnow(), key))
+        self.db.commit()
+        return cursor.rowcount > 0
+    
+    def remember(self, digest):
+        """Remember the digest of the source of a trusted notebook"""
+        if self.db is None:
+            return
+        key = self._digest_key(digest)
+        self.db.execute(
+            "INSERT OR REPLACE INTO nbsignatures (digest, last_seen) VALUES (?, ?)",
+            (key, datetime.utcnow()))
+        n, = self.db.execute("SELECT COUNT(*) FROM nbsignatures").fetchone()
+        if n > self.cache_size:
+            self._cull(n)
+        self.db.commit()
+    
+    def _cull(self, n):
+        """Forget the least recently seen digests, down to 3/4 of cache_size"""
+        self.db.execute("""DELETE FROM nbsignatures WHERE digest IN
+            (SELECT digest FROM nbsignatures ORDER BY last_seen, rowid LIMIT ?)""",
+            (n - self.cache_size * 3 // 4,))
+    
+    def forget_all(self):
+        """Forget all the notebooks known to be trusted"""
+        if self.db is None:
+            return
+        self.db.execute("DELETE FROM nbsignatures")
+        self.db.commit()
+    
+    def check_signature(self, nb, source=None):
         """Check a notebook's stored signature
         
         If a signature is stored in the notebook's metadata,
         a new signature is computed and compared with the stored value.
         
+        If the source the notebook was read from is given, and its digest
+        is known, the notebook is trusted without computing its signature.
+        Otherwise the digest is remembered if the signature matches.
+        
         Returns True if the signature is found and matches, False otherwise.
         
         The following conditions must all be met for a notebook to be trusted:
@@ -168,8 +319,16 @@ def check_signature(self, nb):
         stored_algo, sig = stored_signature.split(':', 1)
         if self.algorithm != stored_algo:
             return False
+        if source is not None:
+            digest = self.source_digest(source).hexdigest()
+            if self.is_known(digest):
+                return True
         my_signature = self.compute_signature(nb)
-        return my_signature == sig
+        if my_signature != sig:
+            return False
+        if source is not None:
+            self.remember(digest)
+        return True
     
     def sign(self, nb):
         """Sign a notebook, indicating that its output is trusted
@@ -292,8 +451,9 @@ def sign_notebook(self, notebook_path):
             self.log.error("Notebook missing: %s" % notebook_path)
             self.exit(1)
         with io.open(notebook_path, encoding='utf8') as f:
-            nb = read(f, 'json')
-        if self.notary.check_signature(nb):
+            source = f.read()
+        nb = reads(source, 'json')
+        if self.notary.check_signature(nb, source):
             print("Notebook already signed: %s" % notebook_path)
         else:
             print("Signing notebook: %s" % notebook_path)
@@ -305,6 +465,7 @@ def generate_new_key(self):
         """Generate a new notebook signature key"""
         print("Generating new notebook key: %s" % self.notary.secret_file)
         self.notary._write_secret_file(os.urandom(1024))
+        self.notary.forget_all()
     
     def start(self):
         if self.reset:
@@ -15,6 +15,8 @@
 from .base import TestsBase
 
 from ..reader import read, get_version
+from ..v2 import NotebookNode as NotebookNode2
+from ..v3 import NotebookNode as NotebookNode3
 
 #-----------------------------------------------------------------------------
 # Classes and functions
@@ -30,9 +32,11 @@ def test_read(self):
             nb = read(f)
         (major, minor) = get_version(nb)
         self.assertEqual(major, 3)
+        self.assertIsInstance(nb.worksheets[0].cells[0], NotebookNode3)
 
         # Open a version 2 notebook.  Make sure it is still version 2.
         with self.fopen(u'test2.ipynb', u'r') as f:
             nb = read(f)
         (major, minor) = get_version(nb)
         self.assertEqual(major, 2)
+        self.assertIsInstance(nb.worksheets[0].cells[0], NotebookNode2)
@@ -10,10 +10,12 @@
 # Imports
 #-----------------------------------------------------------------------------
 
+from hmac import HMAC
+
 from .. import sign
 from .base import TestsBase
 
-from ..current import read
+from ..current import read, writes, new_output
 from IPython.core.getipython import get_ipython
 
 #-----------------------------------------------------------------------------
@@ -25,7 +27,8 @@ class TestNotary(TestsBase):
     def setUp(self):
         self.notary = sign.NotebookNotary(
             secret=b'secret',
-            profile_dir=get_ipython().profile_dir
+            profile_dir=get_ipython().profile_dir,
+            db_file=':memory:'
         )
         with self.fopen(u'test3.ipynb', u'r') as f:
             self.nb = read(f, u'json')
@@ -54,6 +57,63 @@ def test_change_secret(self):
         sig2 = self.notary.compute_signature(self.nb)
         self.assertNotEqual(sig1, sig2)
     
+    def reference_signature(self, nb):
+        """The signature, computed by feeding yield_everything to HMAC"""
+        hmac = HMAC(self.notary.secret, digestmod=self.notary.digestmod)
+        with sign.signature_removed(nb):
+            for b in sign.yield_everything(nb):
+                hmac.update(b)
+        return hmac.hexdigest()
+    
+    def test_signature_equivalence(self):
+        """compute_signature matches hashing yield_everything"""
+        nb = self.nb
+        self.assertEqual(self.notary.compute_signature(nb),
+                         self.reference_signature(nb))
+        cell = [ c for c in nb.worksheets[0].cells if c.cell_type == 'code' ][0]
+        cell.outputs.append(new_output(u'display_data',
+            output_png=b'\x89PNG' * 100000, output_text=u'h\xe9llo',
+            metadata={u'width': 10, u'isolated': True, u'nested': [None, 1.5]},
+        ))
+        nb.metadata.signature = u'sha256:deadbeef'
+        for algo in ('md5', 'sha256', 'sha512'):
+            self.notary.algorithm = algo
+            self.assertEqual(self.notary.compute_signature(nb),
+                             self.reference_signature(nb))
+        self.assertEqual(nb.metadata.signature, u'sha256:deadbeef')
+    
+    def test_known_source(self):
+        """An unchanged source is trusted without computing its signature"""
+        notary = self.notary
+        nb = self.nb
+        notary.sign(nb)
+        source = writes(nb, u'json')
+        digest = notary.source_digest(source).hexdigest()
+        self.assertFalse(notary.is_known(digest))
+        self.assertTrue(notary.check_signature(nb, source))
+        self.assertTrue(notary.is_known(digest))
+        # the known source is trusted, even though nb no longer matches it
+        nb.worksheets[0].cells[0].input = u'changed'
+        self.assertTrue(notary.check_signature(nb, source))
+        # but its new source isn't
+        self.assertFalse(notary.check_signature(nb, writes(nb, u'json')))
+        # digests depend on the secret
+        notary.secret = b'different'
+        self.assertFalse(notary.is_known(notary.source_digest(source).hexdigest()))
+    
+    def test_cull_known_sources(self):
+        notary = self.notary
+        notary.cache_size = 8
+        digests = [ u'%032x' % i for i in range(9) ]
+        for digest in digests:
+            notary.remember(digest)
+        self.assertFalse(notary.is_known(digests[0]))
+        self.assertTrue(notary.is_known(digests[-1]))
+        n, = notary.db.execute("SELECT COUNT(*) FROM nbsignatures").fetchone()
+        self.assertEqual(n, 6)
+        notary.forget_all()
+        self.assertFalse(notary.is_known(digests[-1]))
+    
     def test_sign(self):
         self.notary.sign(self.nb)
         sig = self.nb.metadata.signature
@@ -17,7 +17,7 @@
 from .base import TestsBase
 from jsonschema import SchemaError
 from ..current import read
-from ..validator import schema_path, isvalid, validate, resolve_ref
+from ..validator import schema_path, isvalid, validate, resolve_ref, get_validator
 
 
 #-----------------------------------------------------------------------------
@@ -55,6 +55,23 @@ def test_invalid(self):
         self.assertEqual(len(validate(nb)), 3)
         self.assertEqual(isvalid(nb), False)
 
+    def test_invalid_cell(self):
+        """Test that isvalid finds errors in cells"""
+        with self.fopen(u'test3.ipynb', u'r') as f:
+            nb = read(f, u'json')
+        cells = nb.worksheets[0].cells
+        code_cells = [ cell for cell in cells if cell.cell_type == 'code' ]
+        code_cells[-1].prompt_number = 'x'
+        self.assertEqual(len(validate(nb)), 1)
+        self.assertEqual(isvalid(nb), False)
+        cells.append(5)
+        self.assertEqual(isvalid(nb), False)
+
+    def test_cached_validator(self):
+        """Test that validators are created once"""
+        self.assertIs(get_validator(), get_validator())
+        self.assertIsNot(get_validator(pointer='/any_cell'), get_validator())
+
     def test_resolve_ref(self):
         """Test that references are correctly resolved"""
         # make sure it resolves the ref correctly
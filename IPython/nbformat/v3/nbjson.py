@@ -16,15 +16,16 @@
 # Imports
 #-----------------------------------------------------------------------------
 
-import copy
 import json
 
-from .nbbase import from_dict
+from .nbbase import from_dict, NotebookNode
 from .rwbase import (
-    NotebookReader, NotebookWriter, restore_bytes, rejoin_lines, split_lines
+    NotebookReader, NotebookWriter, restore_bytes, rejoin_lines,
+    _multiline_outputs,
 )
 
 from IPython.utils import py3compat
+from IPython.utils.py3compat import string_types
 
 #-----------------------------------------------------------------------------
 # Code
@@ -38,28 +39,144 @@ def default(self, obj):
         return json.JSONEncoder.default(self, obj)
 
 
+class _SplitLinesList(list):
+    """A shallow copy of a list, whose items are wrapped as they are iterated"""
+
+    def __init__(self, items, wrap):
+        list.__init__(self, items)
+        self._wrap = wrap
+
+    def __iter__(self):
+        wrap = self._wrap
+        for item in list.__iter__(self):
+            yield wrap(item)
+
+
+class _SplitLinesDict(dict):
+    """A shallow copy of a dict, whose values are wrapped by items()"""
+
+    def __init__(self, d, wrap):
+        dict.__init__(self, d)
+        self._wrap = wrap
+
+    def items(self):
+        wrap = self._wrap
+        return [ (key, wrap(key, value)) for key, value in dict.items(self) ]
+
+
+def _split(text):
+    if isinstance(text, string_types):
+        return text.splitlines(True)
+    return text
+
+
+def _split_output(output):
+    def wrap(key, value):
+        if key in _multiline_outputs:
+            return _split(value)
+        return value
+    return _SplitLinesDict(output, wrap)
+
+
+def _split_cell(cell):
+    if cell['cell_type'] == 'code':
+        def wrap(key, value):
+            if key == 'input':
+                return _split(value)
+            if key == 'outputs':
+                return _SplitLinesList(value, _split_output)
+            return value
+    else: # text, heading cell
+        def wrap(key, value):
+            if key in ('source', 'rendered'):
+                return _split(value)
+            return value
+    return _SplitLinesDict(cell, wrap)
+
+
+def _split_worksheet(ws):
+    def wrap(key, value):
+        if key == 'cells':
+            return _SplitLinesList(value, _split_cell)
+        return value
+    return _SplitLinesDict(ws, wrap)
+
+
+def split_lines_view(nb):
+    """A view of nb, which splits multiline text as it is encoded
+
+    The JSON written is that of ``split_lines(nb)``, but nb is neither
+    copied nor modified: the lines of each cell are split while it is
+    encoded, and discarded after. This relies on the pure Python JSON
+    encoder, which is used when indenting, calling ``items()`` on dicts.
+    """
+    def wrap(key, value):
+        if key == 'worksheets':
+            return _SplitLinesList(value, _split_worksheet)
+        return value
+    return _SplitLinesDict(nb, wrap)
+
+
 class JSONReader(NotebookReader):
 
     def reads(self, s, **kwargs):
-        nb = json.loads(s, **kwargs)
-        nb = self.to_notebook(nb, **kwargs)
+        # parse objects straight into NotebookNodes, rather than converting
+        # a tree of dicts after
+        nb = json.loads(s, object_pairs_hook=NotebookNode, **kwargs)
+        nb = self.to_notebook(nb, copy=False, **kwargs)
         return nb
 
-    def to_notebook(self, d, **kwargs):
-        return rejoin_lines(from_dict(d))
+    def to_notebook(self, d, copy=True, **kwargs):
+        """Convert a dict parsed from JSON to a notebook
+
+        d is copied into NotebookNodes, unless copy is False,
+        in which case it must already be made of NotebookNodes,
+        as when parsed with ``object_pairs_hook=NotebookNode``.
+        Its multiline text is then rejoined in place.
+        """
+        if copy:
+            d = from_dict(d)
+        return rejoin_lines(d)
 
 
 class JSONWriter(NotebookWriter):
 
-    def writes(self, nb, **kwargs):
+    # write to files in chunks of roughly this many characters
+    chunk_size = 1 << 16
+
+    def _prepare(self, nb, kwargs):
+        """Apply the notebook JSON options to kwargs, and split lines in nb"""
         kwargs['cls'] = BytesEncoder
         kwargs['indent'] = 1
         kwargs['sort_keys'] = True
         kwargs['separators'] = (',',': ')
         if kwargs.pop('split_lines', True):
-            nb = split_lines(copy.deepcopy(nb))
+            nb = split_lines_view(nb)
+        return nb, kwargs
+
+    def writes(self, nb, **kwargs):
+        nb, kwargs = self._prepare(nb, kwargs)
         return py3compat.str_to_unicode(json.dumps(nb, **kwargs), 'utf-8')
-    
+
+    def write(self, nb, fp, **kwargs):
+        """Write a notebook to a file like object
+
+        The JSON is encoded and written incrementally,
+        so the whole document is never built as a single string.
+        """
+        nb, kwargs = self._prepare(nb, kwargs)
+        encoder = kwargs.pop('cls')(**kwargs)
+        chunks = []
+        size = 0
+        for chunk in encoder.iterencode(nb):
+            chunks.append(py3compat.cast_unicode(chunk, 'utf-8'))
+            size += len(chunk)
+            if size >= self.chunk_size:
+                fp.write(u''.join(chunks))
+                chunks = []
+                size = 0
+        fp.write(u''.join(chunks))
+
 
 _reader = JSONReader()
 _writer = JSONWriter()
@@ -1,10 +1,15 @@
+import copy
+import io
+import json
 import pprint
 from base64 import decodestring
 from unittest import TestCase
 
 from IPython.utils.py3compat import unicode_type
-from ..nbjson import reads, writes
+from ..nbjson import reads, writes, BytesEncoder
 from .. import nbjson
+from ..nbbase import NotebookNode
+from ..rwbase import split_lines
 from .nbexamples import nb0
 
 from . import formattest
@@ -31,6 +36,41 @@ def test_roundtrip_split(self):
         s = writes(nb0, split_lines=True)
         self.assertEqual(nbjson.reads(s),nb0)
 
+    def test_write_matches_writes(self):
+        """Incremental writing produces the same JSON as writes"""
+        f = io.StringIO()
+        writer = nbjson.JSONWriter()
+        writer.chunk_size = 10
+        writer.write(nb0, f)
+        self.assertEqual(f.getvalue(), writes(nb0))
+
+    def test_split_lines_while_writing(self):
+        """Lines are split while encoding, without modifying the notebook"""
+        nb = copy.deepcopy(nb0)
+        expected = json.dumps(split_lines(copy.deepcopy(nb0)), cls=BytesEncoder,
+            indent=1, sort_keys=True, separators=(',',': '))
+        self.assertEqual(writes(nb), expected)
+        self.assertEqual(nb, nb0)
+
+    def test_reads_notebook_nodes(self):
+        """Every dict read is a NotebookNode"""
+        def check(obj):
+            if isinstance(obj, dict):
+                self.assertIsInstance(obj, NotebookNode)
+                for value in obj.values():
+                    check(value)
+            elif isinstance(obj, list):
+                for value in obj:
+                    check(value)
+        nb = reads(writes(nb0))
+        check(nb)
+        # a dict is copied into NotebookNodes
+        d = json.loads(writes(nb0))
+        nb = nbjson.to_notebook(d)
+        check(nb)
+        self.assertEqual(nb, nb0)
+        self.assertNotIsInstance(d['worksheets'][0], NotebookNode)
+
     def test_read_png(self):
         """PNG output data is b64 unicode"""
         s = writes(nb0)
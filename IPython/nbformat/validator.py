@@ -32,19 +32,80 @@
 schema_path = os.path.join(
     os.path.dirname(__file__), "v%d" % nbformat, nbformat_schema)
 
+# resolved schemas, by nbformat version
+_schemas = {}
+# validators, by nbformat version and pointer to their part of the schema
+_validators = {}
+
+
+def get_schema(version=nbformat):
+    """Load the schema of an nbformat version, with its references resolved.
+
+    The schema is loaded once, and cached.
+    """
+    schema = _schemas.get(version)
+    if schema is None:
+        if version == nbformat:
+            path = schema_path
+        else:
+            path = os.path.join(os.path.dirname(__file__),
+                                "v%d" % version, "v%d.withref.json" % version)
+        # load the schema file
+        with open(path, 'r') as fh:
+            schema_json = json.load(fh)
+
+        # resolve internal references
+        schema = _schemas[version] = resolve_ref(schema_json)
+    return schema
+
+
+def get_validator(version=nbformat, pointer='/notebook'):
+    """Return the validator for a part of the schema of an nbformat version.
+
+    The validators are created once, and cached.
+    """
+    key = (version, pointer)
+    validator = _validators.get(key)
+    if validator is None:
+        schema = jsonpointer.resolve_pointer(get_schema(version), pointer)
+        validator = _validators[key] = Validator(schema)
+    return validator
+
 
 def isvalid(nbjson):
     """Checks whether the given notebook JSON conforms to the current
     notebook format schema. Returns True if the JSON is valid, and
     False otherwise.
 
+    The notebook is validated without its cells, then cell by cell,
+    stopping at the first error.
+
     To see the individual errors that were encountered, please use the
     `validate` function instead.
 
     """
-
-    errors = validate(nbjson)
-    return errors == []
+    worksheets = nbjson.get('worksheets') if isinstance(nbjson, dict) else None
+    if not (isinstance(worksheets, list)
+            and all(isinstance(ws, dict) and isinstance(ws.get('cells'), list)
+                    for ws in worksheets)):
+        # not the expected structure, validate the whole notebook
+        return _first_error(get_validator(), nbjson) is None
+
+    skeleton = dict(nbjson)
+    skeleton['worksheets'] = [ dict(ws, cells=[]) for ws in worksheets ]
+    if _first_error(get_validator(), skeleton) is not None:
+        return False
+    cell_validator = get_validator(pointer='/any_cell')
+    for ws in worksheets:
+        for cell in ws['cells']:
+            if _first_error(cell_validator, cell) is not None:
+                return False
+    return True
+
+
+def _first_error(validator, instance):
+    for error in validator.iter_errors(instance):
+        return error
 
 
 def validate(nbjson):
@@ -52,17 +113,8 @@ def validate(nbjson):
     notebook format schema, and returns the list of errors.
 
     """
-
-    # load the schema file
-    with open(schema_path, 'r') as fh:
-        schema_json = json.load(fh)
-
-    # resolve internal references
-    schema = resolve_ref(schema_json)
-    schema = jsonpointer.resolve_pointer(schema, '/notebook')
-
     # count how many errors there are
-    v = Validator(schema)
+    v = get_validator()
     errors = list(v.iter_errors(nbjson))
     return errors
 
@@ -456,6 +456,48 @@ def __init__(self, i):
         # should raise TypeError if no positional arg given
         self.assertRaises(TypeError, A)
 
+    def test_trait_metadata_missing(self):
+        class A(HasTraits):
+            i = Int()
+            def f(self):
+                pass
+        a = A()
+        self.assertRaises(TraitError, a.trait_metadata, 'j', 'config_key')
+        self.assertRaises(TraitError, a.trait_metadata, 'f', 'config_key')
+
+    def test_traits_set_on_class(self):
+        class A(HasTraits):
+            i = Int()
+        class B(A):
+            pass
+        A.j = Int(5)
+        self.assertEqual(sorted(A.class_trait_names()), ['i', 'j'])
+        self.assertEqual(sorted(B.class_trait_names()), ['i', 'j'])
+        self.assertEqual(B().j, 5)
+        # shadowing a trait with a plain attribute hides it
+        B.i = 1
+        self.assertEqual(sorted(B.class_trait_names()), ['j'])
+        del B.i
+        del A.j
+        self.assertEqual(sorted(B.class_trait_names()), ['i'])
+        self.assertEqual(A().traits(), dict(i=A.i))
+
+    def test_notify_many_instances(self):
+        class A(HasTraits):
+            i = Int()
+            def _i_changed(self, name, new):
+                self.changed = (name, new)
+            def on_i(self):
+                self.count += 1
+        for n in range(3):
+            a = A()
+            a.count = 0
+            a.on_trait_change(a.on_i, 'i')
+            a.i = n + 1
+            a.i = n + 2
+            self.assertEqual(a.changed, ('i', n + 2))
+            self.assertEqual(a.count, 2)
+
 #-----------------------------------------------------------------------------
 # Tests for specific trait types
 #-----------------------------------------------------------------------------
@@ -45,6 +45,7 @@
 import re
 import sys
 import types
+import weakref
 from types import FunctionType
 try:
     from types import ClassType, InstanceType
@@ -500,12 +501,71 @@ def __init__(cls, name, bases, classdict):
         """Finish initializing the HasTraits class.
 
         This sets the :attr:`this_class` attribute of each TraitType in the
-        class dict to the newly created class ``cls``.
+        class dict to the newly created class ``cls``, and builds the class'
+        table of traits.
         """
         for k, v in iteritems(classdict):
             if isinstance(v, TraitType):
                 v.this_class = cls
         super(MetaHasTraits, cls).__init__(name, bases, classdict)
+        cls._update_trait_table()
+
+    def _update_trait_table(cls):
+        """Collect the TraitTypes of the class and its bases.
+
+        The table is a list of (name, trait) pairs sorted by name, which is
+        the order in which the traits are initialized on new instances.
+        It is rebuilt, along with those of the subclasses, whenever an
+        attribute is set or deleted on the class.
+        """
+        table = [ memb for memb in getmembers(cls)
+                  if isinstance(memb[1], TraitType) ]
+        type.__setattr__(cls, '_trait_table', table)
+        type.__setattr__(cls, '_trait_dict', dict(table))
+        for sub in type.__subclasses__(cls):
+            if isinstance(sub, MetaHasTraits):
+                sub._update_trait_table()
+
+    def __setattr__(cls, name, value):
+        if isinstance(value, TraitType):
+            value.name = name
+            value.this_class = cls
+        super(MetaHasTraits, cls).__setattr__(name, value)
+        if isinstance(value, TraitType) or name in cls._trait_dict:
+            cls._update_trait_table()
+
+    def __delattr__(cls, name):
+        super(MetaHasTraits, cls).__delattr__(name)
+        if name in cls._trait_dict:
+            cls._update_trait_table()
+
+
+# The number of positional arguments of trait change handlers,
+# keyed by function (the function underlying bound methods).
+_handler_nargs = weakref.WeakKeyDictionary()
+
+def _get_handler_nargs(c):
+    """Return the number of arguments to pass to a trait change handler"""
+    # Bound methods have an additional 'self' argument
+    # I don't know how to treat unbound methods, but they
+    # can't really be used for callbacks.
+    if isinstance(c, types.MethodType):
+        func = c.__func__
+        offset = -1
+    else:
+        func = c
+        offset = 0
+    try:
+        nargs = _handler_nargs[func]
+    except (KeyError, TypeError):
+        nargs = len(inspect.getargspec(c)[0])
+        try:
+            _handler_nargs[func] = nargs
+        except TypeError:
+            # not weak-referenceable
+            pass
+    return nargs + offset
+
 
 class HasTraits(py3compat.with_metaclass(MetaHasTraits, object)):
 
@@ -522,17 +582,8 @@ def __new__(cls, *args, **kw):
         inst._trait_dyn_inits = {}
         # Here we tell all the TraitType instances to set their default
         # values on the instance.
-        for key in dir(cls):
-            # Some descriptors raise AttributeError like zope.interface's
-            # __provides__ attributes even though they exist.  This causes
-            # AttributeErrors even though they are listed in dir(cls).
-            try:
-                value = getattr(cls, key)
-            except AttributeError:
-                pass
-            else:
-                if isinstance(value, TraitType):
-                    value.instance_init(inst)
+        for key, value in cls._trait_table:
+            value.instance_init(inst)
 
         return inst
 
@@ -562,22 +613,14 @@ def _notify_trait(self, name, old_value, new_value):
         for c in callables:
             # Traits catches and logs errors here.  I allow them to raise
             if callable(c):
-                argspec = inspect.getargspec(c)
-                nargs = len(argspec[0])
-                # Bound methods have an additional 'self' argument
-                # I don't know how to treat unbound methods, but they
-                # can't really be used for callbacks.
-                if isinstance(c, types.MethodType):
-                    offset = -1
-                else:
-                    offset = 0
-                if nargs + offset == 0:
+                nargs = _get_handler_nargs(c)
+                if nargs == 0:
                     c()
-                elif nargs + offset == 1:
+                elif nargs == 1:
                     c(name)
-                elif nargs + offset == 2:
+                elif nargs == 2:
                     c(name, new_value)
-                elif nargs + offset == 3:
+                elif nargs == 3:
                     c(name, old_value, new_value)
                 else:
                     raise TraitError('a trait changed callback '
@@ -668,8 +711,7 @@ def class_traits(cls, **metadata):
         value because get_metadata returns None if a metadata key
         doesn't exist.
         """
-        traits = dict([memb for memb in getmembers(cls) if
-                     isinstance(memb[1], TraitType)])
+        traits = dict(cls._trait_dict)
 
         if len(metadata) == 0:
             return traits
@@ -708,8 +750,7 @@ def traits(self, **metadata):
         value because get_metadata returns None if a metadata key
         doesn't exist.
         """
-        traits = dict([memb for memb in getmembers(self.__class__) if
-                     isinstance(memb[1], TraitType)])
+        traits = dict(self._trait_dict)
 
         if len(metadata) == 0:
             return traits
@@ -731,8 +772,8 @@ def traits(self, **metadata):
     def trait_metadata(self, traitname, key, default=None):
         """Get metadata values for trait by key."""
         try:
-            trait = getattr(self.__class__, traitname)
-        except AttributeError:
+            trait = self._trait_dict[traitname]
+        except KeyError:
             raise TraitError("Class %s does not have a trait named %s" %
                                 (self.__class__.__name__, traitname))
         else:
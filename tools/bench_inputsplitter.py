@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""Benchmark IPythonInputSplitter.transform_cell on large cells.
+
+Cells of increasing numbers of lines are transformed; the time per line
+should stay roughly constant.
+
+Usage:
+
+    python tools/bench_inputsplitter.py [SIZE ...]
+"""
+
+from __future__ import print_function
+
+import sys
+import timeit
+
+from IPython.core.inputsplitter import IPythonInputSplitter
+
+CHUNK = u"""\
+x = 1
+def f(a, b):
+    return (a +
+            b)
+files = !ls
+%time f(x, 2)
+"""
+
+
+def make_cell(nlines):
+    chunk_lines = CHUNK.count(u'\n')
+    return CHUNK * (nlines // chunk_lines)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 2500, 5000, 10000]
+    isp = IPythonInputSplitter(line_input_checker=False)
+    for nlines in sizes:
+        cell = make_cell(nlines)
+        t = min(timeit.repeat(lambda: isp.transform_cell(cell),
+                              number=1, repeat=3))
+        print("%6i lines: %8.3f s  (%6.2f us/line)" % (
+            nlines, t, 1e6 * t / nlines))
+
+if __name__ == '__main__':
+    main()
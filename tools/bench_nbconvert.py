@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Benchmark converting a large notebook to HTML and LaTeX.
+
+A notebook of code cells, some of them repeated, is converted twice by the
+same exporter, with and without the cache of the highlight filters.
+The second conversion shows the benefit of keeping highlighted cells
+across notebooks.
+
+Usage:
+
+    python tools/bench_nbconvert.py [NCELLS]
+"""
+
+from __future__ import print_function
+
+import sys
+import time
+
+from IPython.config import Config
+from IPython.nbconvert.exporters import HTMLExporter, LatexExporter
+from IPython.nbformat.current import new_notebook, new_worksheet, new_code_cell
+
+CELLS = [
+    u"import numpy as np\nx = np.linspace(0, 1, %i)\n",
+    u"def f(a, b=%i):\n    \"\"\"Add a to b\"\"\"\n    return a + b\n",
+    u"%%timeit\nsum(range(%i))\n",
+    u"for i in range(%i):\n    print(i, f(i))\n",
+]
+
+
+def make_notebook(ncells):
+    cells = []
+    for i in range(ncells):
+        # one cell in two is repeated
+        n = i if i % 2 else 0
+        cells.append(new_code_cell(input=CELLS[i % len(CELLS)] % n))
+    return new_notebook(worksheets=[new_worksheet(cells=cells)])
+
+
+def main():
+    ncells = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    nb = make_notebook(ncells)
+    for exporter_class in (HTMLExporter, LatexExporter):
+        for cache_size in (0, 2 * ncells):
+            c = Config()
+            c.Highlight2HTML.cache_size = cache_size
+            c.Highlight2Latex.cache_size = cache_size
+            exporter = exporter_class(config=c)
+            times = []
+            for i in range(2):
+                tic = time.time()
+                exporter.from_notebook_node(nb)
+                times.append(time.time() - tic)
+            print("%-14s cache_size=%-6i first: %6.3f s  second: %6.3f s" % (
+                exporter_class.__name__, cache_size, times[0], times[1]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Benchmark reading and writing back a large notebook.
+
+A notebook of SIZE megabytes, mostly multiline text outputs, is read and
+written back, by the JSON reader and writer of nbformat v3, and by the way
+they used to work: converting the parsed dicts with from_dict, and deep
+copying the notebook to split its lines before writing it.
+
+Each read and write runs in a new process, which reports its time and the
+growth of its peak memory (Linux and OS X only).
+
+Usage:
+
+    python tools/bench_nbroundtrip.py [SIZE]
+"""
+
+from __future__ import print_function
+
+import copy
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from IPython.nbformat.v3 import nbjson
+from IPython.nbformat.v3.nbbase import (
+    from_dict, new_notebook, new_worksheet, new_code_cell, new_output,
+)
+from IPython.nbformat.v3.rwbase import rejoin_lines, split_lines
+from IPython.utils.py3compat import cast_unicode
+from IPython.utils.tempdir import TemporaryDirectory
+
+
+def make_notebook(size):
+    """Make a notebook of about size megabytes of JSON"""
+    text = u"".join(u"line %i of the output\n" % i for i in range(500))
+    cells = []
+    for i in range(int(size * 1e6 / len(text))):
+        output = new_output(u'stream', output_text=text, stream=u'stdout')
+        cells.append(new_code_cell(input=u"for i in range(500):\n    print(i)\n",
+                                   prompt_number=i, outputs=[output]))
+    return new_notebook(name=u'bench', worksheets=[new_worksheet(cells=cells)])
+
+
+def old_reads(s):
+    return rejoin_lines(from_dict(json.loads(s)))
+
+
+def old_write(nb, fp):
+    nb = split_lines(copy.deepcopy(nb))
+    encoder = nbjson.BytesEncoder(indent=1, sort_keys=True, separators=(',',': '))
+    for chunk in encoder.iterencode(nb):
+        fp.write(cast_unicode(chunk, 'utf-8'))
+
+
+def new_write(nb, fp):
+    nbjson.write(nb, fp)
+
+
+def max_rss():
+    """peak memory of this process, in MB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on OS X
+    return rss / (1e6 if sys.platform == 'darwin' else 1e3)
+
+
+def bench_read(how, path):
+    reads = {'old': old_reads, 'new': nbjson.reads}[how]
+    with io.open(path, encoding='utf-8') as f:
+        s = f.read()
+    rss = max_rss()
+    tic = time.time()
+    reads(s)
+    print("%s read:  %6.3f s %+7.1f MB" % (how, time.time() - tic, max_rss() - rss))
+
+
+def bench_write(how, size):
+    write = {'old': old_write, 'new': new_write}[how]
+    nb = make_notebook(size)
+    rss = max_rss()
+    tic = time.time()
+    with io.open(os.devnull, 'w', encoding='utf-8') as f:
+        write(nb, f)
+    print("%s write: %6.3f s %+7.1f MB" % (how, time.time() - tic, max_rss() - rss))
+
+
+def main():
+    if len(sys.argv) > 3 and sys.argv[1] == '--read':
+        bench_read(sys.argv[2], sys.argv[3])
+        return
+    if len(sys.argv) > 3 and sys.argv[1] == '--write':
+        bench_write(sys.argv[2], float(sys.argv[3]))
+        return
+    size = sys.argv[1] if len(sys.argv) > 1 else '100'
+    with TemporaryDirectory() as td:
+        path = os.path.join(td, 'bench.ipynb')
+        with io.open(path, 'w', encoding='utf-8') as f:
+            nbjson.write(make_notebook(float(size)), f)
+        print("%.1f MB notebook" % (os.path.getsize(path) / 1e6))
+        for how in ('old', 'new'):
+            subprocess.check_call([sys.executable, __file__, '--read', how, path])
+        for how in ('old', 'new'):
+            subprocess.check_call([sys.executable, __file__, '--write', how, size])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""Benchmark signing notebooks with large base64 outputs.
+
+Times computing the signature of a notebook by feeding
+:func:`yield_everything` to HMAC, as it used to be computed, and with
+:meth:`NotebookNotary.compute_signature`, then checking the signature of
+a notebook whose source is already known to be trusted. A notebook of NCELLS
+cells with 100 kB figures is timed, then one of 50 * NCELLS cells with 1 kB
+figures.
+
+Usage:
+
+    python tools/bench_nbsign.py [NCELLS [NUMBER]]
+"""
+
+from __future__ import print_function
+
+import base64
+import os
+import sys
+import time
+from hmac import HMAC
+
+from IPython.nbformat import sign
+from IPython.utils.tempdir import TemporaryDirectory
+from IPython.nbformat.current import (
+    new_notebook, new_worksheet, new_code_cell, new_output, writes,
+)
+
+
+def make_notebook(ncells, png_size):
+    """Make a notebook of code cells, each with a base64 PNG of png_size bytes"""
+    cells = []
+    for i in range(ncells):
+        png = base64.encodestring(os.urandom(png_size)).decode('ascii')
+        output = new_output(u'display_data', output_png=png,
+                            output_text=u'<Figure %i>' % i)
+        cells.append(new_code_cell(input=u'plot(%i)' % i, prompt_number=i,
+                                   outputs=[output]))
+    return new_notebook(name=u'bench', worksheets=[new_worksheet(cells=cells)])
+
+
+def old_signature(notary, nb):
+    hmac = HMAC(notary.secret, digestmod=notary.digestmod)
+    with sign.signature_removed(nb):
+        for b in sign.yield_everything(nb):
+            hmac.update(b)
+    return hmac.hexdigest()
+
+
+def timed(f, number):
+    times = []
+    for i in range(number):
+        tic = time.time()
+        f()
+        times.append(time.time() - tic)
+    return min(times)
+
+
+def bench(notary, nb, number):
+    notary.sign(nb)
+    source = writes(nb, u'json')
+    assert old_signature(notary, nb) == notary.compute_signature(nb)
+    print("%i cells, %.1f MB" % (len(nb.worksheets[0].cells), len(source) / 1e6))
+
+    print("  %-22s %8.4f s" % ("yield_everything",
+        timed(lambda: old_signature(notary, nb), number)))
+    print("  %-22s %8.4f s" % ("compute_signature",
+        timed(lambda: notary.compute_signature(nb), number)))
+    notary.forget_all()
+    print("  %-22s %8.4f s" % ("check_signature",
+        timed(lambda: notary.check_signature(nb), number)))
+    notary.check_signature(nb, source)
+    print("  %-22s %8.4f s" % ("check known source",
+        timed(lambda: notary.check_signature(nb, source), number)))
+
+
+def main():
+    ncells = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    number = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with TemporaryDirectory() as td:
+        notary = sign.NotebookNotary(profile_dir=None, db_file=':memory:',
+                                     secret_file=os.path.join(td, 'secret'))
+        notary.secret
+    # a few large figures, then many small ones
+    bench(notary, make_notebook(ncells, 75000), number)
+    bench(notary, make_notebook(ncells * 50, 1000), number)
+
+if __name__ == '__main__':
+    main()
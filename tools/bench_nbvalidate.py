@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""Benchmark validating a large notebook repeatedly.
+
+A notebook of code cells with text outputs, about SIZE megabytes of JSON,
+is validated a number of times with :func:`validate`, which reports all the
+errors, and with :func:`isvalid`, which stops at the first one.
+
+Usage:
+
+    python tools/bench_nbvalidate.py [SIZE [NUMBER]]
+"""
+
+from __future__ import print_function
+
+import json
+import sys
+import time
+
+from IPython.nbformat import current
+from IPython.nbformat.current import (
+    new_notebook, new_worksheet, new_code_cell, new_output,
+)
+from IPython.nbformat.validator import validate, isvalid
+
+
+def make_notebook(size):
+    """Make a notebook of about size megabytes of JSON"""
+    text = u"line of output %i\n" * 50
+    cells = []
+    nbytes = 0
+    i = 0
+    while nbytes < size * 1e6:
+        output = new_output(output_type=u'stream', stream=u'stdout',
+                            output_text=text % tuple(range(i, i + 50)))
+        cell = new_code_cell(input=u"for i in range(50):\n    print(i)\n",
+                             prompt_number=i, outputs=[output])
+        nbytes += len(json.dumps(cell))
+        cells.append(cell)
+        i += 1
+    nb = new_notebook(name=u'bench', worksheets=[new_worksheet(cells=cells)])
+    # validate the JSON form of the notebook, as the notebook server does
+    return json.loads(current.writes(nb, u'json'))
+
+
+def main():
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    number = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    nb = make_notebook(size)
+    print("%i cells, %.1f MB" % (len(nb['worksheets'][0]['cells']),
+                                 len(json.dumps(nb)) / 1e6))
+    for f in (validate, isvalid):
+        times = []
+        for i in range(number):
+            tic = time.time()
+            f(nb)
+            times.append(time.time() - tic)
+        print("%-9s first: %6.3f s  best: %6.3f s" % (
+            f.__name__, times[0], min(times)))
+
+if __name__ == '__main__':
+    main()
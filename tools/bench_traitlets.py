@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Microbenchmarks for IPython.utils.traitlets.
+
+Times instantiation of HasTraits classes, setting traits with change
+notifications, and trait/metadata lookups.
+
+Usage:
+
+    python tools/bench_traitlets.py [-n NUMBER]
+"""
+
+from __future__ import print_function
+
+import argparse
+import timeit
+
+from IPython.utils.traitlets import (
+    HasTraits, Int, Unicode, List, Dict, Instance,
+)
+
+
+class Small(HasTraits):
+    a = Int()
+    b = Unicode()
+
+
+Large = type('Large', (HasTraits,),
+             dict(('t%i' % i, Int(i, config=True)) for i in range(50)))
+
+
+class Notifying(HasTraits):
+    value = Int()
+    items = List()
+    mapping = Dict()
+    parent = Instance(HasTraits)
+
+    def _value_changed(self, name, old, new):
+        pass
+
+
+def _handler(name, new):
+    pass
+
+
+def bench_instantiate_small():
+    Small()
+
+def bench_instantiate_large():
+    Large()
+
+_notifying = Notifying()
+_notifying.on_trait_change(_handler, 'value')
+
+def bench_set_notify():
+    _notifying.value += 1
+
+_large = Large()
+
+def bench_trait_metadata():
+    _large.trait_metadata('t25', 'config')
+
+def bench_traits_filtered():
+    _large.traits(config=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--number', type=int, default=10000,
+                        help="number of calls per benchmark")
+    args = parser.parse_args()
+    benchmarks = sorted(name for name in globals() if name.startswith('bench_'))
+    for name in benchmarks:
+        t = min(timeit.repeat(globals()[name], number=args.number, repeat=3))
+        print("%-25s %8.2f us/call" % (name[6:], 1e6 * t / args.number))
+
+if __name__ == '__main__':
+    main()